@@ -8,3 +8,7 @@ from . import dados       # noqa
 from . import preventiva  # noqa
 from . import plano       # noqa
 from . import offset      # noqa  # <= ROTAS DE AJUSTE DE HORÍMETRO
+from . import stream      # noqa  # <= SSE DO PAINEL
+from . import painel      # noqa  # <= CARGA ÚNICA DO PAINEL (GET CONDICIONAL)
+from . import trajeto     # noqa  # <= TRAJETO SIMPLIFICADO (POLYLINE)
+from . import execucoes   # noqa  # <= LOG DE EXECUÇÕES DA PREVENTIVA
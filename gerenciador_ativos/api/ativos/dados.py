@@ -1,18 +1,17 @@
-import time
-import logging
-from flask import jsonify
+from flask import jsonify, request
 
 from gerenciador_ativos.api.ativos import api_ativos_bp
 from gerenciador_ativos.models import Ativo
-from gerenciador_ativos.extensions import db
 
-from gerenciador_ativos.api.monitoramento.brasilsat import (
-    get_telemetria_por_imei,
-    BrasilSatError,
+from gerenciador_ativos.api.monitoramento.brasilsat import BrasilSatError
+from gerenciador_ativos.telemetria.service import (
+    FORMATOS,
+    FORMATO_PADRAO,
+    LeituraAtivo,
+    ler_ativo,
+    serializar,
 )
 
-logger = logging.getLogger(__name__)
-
 
 # ============================================================
 #               ENDPOINT PRINCIPAL (/dados)
@@ -20,100 +19,35 @@ logger = logging.getLogger(__name__)
 
 @api_ativos_bp.get("/<int:id>/dados")
 def dados_ativo(id: int):
-    ativo = Ativo.query.get_or_404(id)
-
-    # ===============================
-    #   BUSCA TELEMETRIA
-    # ===============================
-    tele = None
-    try:
-        if ativo.imei:
-            tele = get_telemetria_por_imei(ativo.imei)
-    except Exception as exc:
-        logger.error(f"[BRASILSAT] erro telemetria ativo {id}: {exc}")
-        tele = None
-
-    agora_ts = time.time()
+    """
+    Telemetria do ativo pelo serviço único (telemetria/service.py).
 
-    # ===============================
-    #   TELEMETRIA OU MODO OFFLINE
-    # ===============================
-    if tele:
-        monitor_online = True
-        motor_ligado = bool(tele.get("motor_ligado"))
-        horas_motor_externo = float(tele.get("horas_motor") or 0.0)
-        tensao = tele.get("tensao_bateria")
-        ts = float(tele.get("servertime") or agora_ts)
-        lat = tele.get("latitude")
-        lon = tele.get("longitude")
-    else:
-        monitor_online = False
-        motor_ligado = False
-        horas_motor_externo = 0.0
-        tensao = None
-        ts = agora_ts
-        lat = None
-        lon = None
+    ?formato=v2 (padrão, painel) | v1 (horímetro antigo) | monitoramento
+    ?atualizar=1 força a busca ao vivo
+    """
+    formato = request.args.get("formato", FORMATO_PADRAO)
+    if formato not in FORMATOS:
+        return jsonify({"erro": f"Formato inválido. Use: {', '.join(FORMATOS)}"}), 400
 
-    # ===============================
-    #   HORAS DO SISTEMA (V1)
-    # ===============================
-    offset = float(ativo.horas_offset or 0.0)
-    horas_totais = horas_motor_externo + offset   # FORMATO ANTIGO (LANCHA)
+    return _responder(id, formato)
 
-    # ===============================
-    #   HORAS PARADAS
-    # ===============================
-    ultimo_estado = ativo.ultimo_estado_motor
-    ultimo_ts = ativo.timestamp_evento
 
-    if ultimo_ts is None:
-        horas_paradas = 0.0
-    else:
-        if (not motor_ligado) and ultimo_estado == 0:
-            horas_paradas = max(0.0, (ts - float(ultimo_ts)) / 3600.0)
-        else:
-            horas_paradas = 0.0
+def _responder(id: int, formato: str):
+    ativo = Ativo.query.get_or_404(id)
 
-    ativo.ultimo_estado_motor = 1 if motor_ligado else 0
-    ativo.timestamp_evento = ts
+    if not ativo.imei and formato != "v1":
+        return jsonify({"erro": "Ativo não possui IMEI cadastrado"}), 400
 
+    forcar = request.args.get("atualizar") in ("1", "true")
     try:
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-
-    # ===============================
-    #   RESPOSTA FORMATO V1 (EXATO)
-    # ===============================
-    resposta = {
-        "id": ativo.id,
-        "nome": ativo.nome,
-        "imei": ativo.imei,
-
-        "monitor_online": monitor_online,
-        "motor_ligado": motor_ligado,
-
-        "tensao_bateria": tensao,
-        "servertime": ts,
-
-        "latitude": lat,
-        "longitude": lon,
-
-        # HORÍMETRO FORMATO ANTIGO
-        "horas_totais": round(horas_totais, 2),
-        "offset": round(offset, 2),
-        "horimetro": round(horas_totais, 2),
-
-        # PARADAS
-        "horas_paradas": round(horas_paradas, 2),
-
-        # CAMPOS USADOS NA V1
-        "unidade_base": "horas",
-        "medida_base": "h",
-    }
+        leitura = ler_ativo(ativo, forcar=forcar)
+    except BrasilSatError as exc:
+        if formato != "v1":
+            return jsonify({"erro": f"Falha ao obter dados da BrasilSat: {exc}"}), 500
+        # o formato v1 sempre respondeu em modo offline
+        leitura = LeituraAtivo(ativo, None, False)
 
-    return jsonify(resposta)
+    return jsonify(serializar(leitura, formato))
 
 
 # ============================================================
@@ -123,7 +57,7 @@ def dados_ativo(id: int):
 @api_ativos_bp.get("/<int:id>/dados-v2")
 def dados_ativo_v2(id: int):
     """
-    Compatibilidade total com o painel atual.
-    Devolve exatamente o mesmo formato do /dados.
+    Compatibilidade total com o painel antigo: sempre no formato v1
+    (horímetro antigo), que era o que esta URL devolvia.
     """
-    return dados_ativo(id)
+    return _responder(id, "v1")
@@ -0,0 +1,129 @@
+"""
+Execuções de preventiva (tarefa marcada como feita).
+
+POST /api/ativos/<id>/plano/<item_id>/execucoes
+    { "medicao": 1250.0, "observacao": "..." }   (ambos opcionais;
+    sem medicao vale o horímetro / dias do ativo agora)
+GET  /api/ativos/<id>/plano/<item_id>/execucoes   log do item
+GET  /api/ativos/<id>/execucoes                   log do ativo
+
+Todas exigem login; equipe interna acessa qualquer ativo, cliente só os
+próprios.
+"""
+
+from flask import jsonify, request, session
+
+from gerenciador_ativos.api.ativos import api_ativos_bp
+from gerenciador_ativos.auth.decorators import login_required
+from gerenciador_ativos.auth.principal import principal_atual
+from gerenciador_ativos.dashboards.kpis import invalidar_kpis
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.preventiva_fila import registrar_execucao
+from gerenciador_ativos.preventiva_models import PreventivaExecucao, PreventivaItem
+from gerenciador_ativos.preventiva_motor import invalidar_plano
+from gerenciador_ativos.telemetria.eventos import notificador, canal_plano
+
+
+def serializar_execucao(ex):
+    return {
+        "id": ex.id,
+        "item_id": ex.item_id,
+        "ativo_id": ex.ativo_id,
+        "medicao": ex.medicao,
+        "executado_em": ex.executado_em.isoformat() if ex.executado_em else None,
+        "usuario_id": ex.usuario_id,
+        "observacao": ex.observacao,
+    }
+
+
+def _ativo_permitido(id):
+    """Ativo da URL, ou None se o usuário logado não pode mexer nele."""
+    ativo = Ativo.query.get_or_404(id)
+    if not principal_atual().pode_ver_ativo(ativo.id):
+        return None
+    return ativo
+
+
+def _proibido():
+    return jsonify({"erro": "Ativo não pertence ao cliente"}), 403
+
+
+def _limite():
+    return max(1, min(request.args.get("limite", 50, type=int) or 50, 500))
+
+
+@api_ativos_bp.post("/<int:id>/plano/<int:item_id>/execucoes")
+@login_required
+def registrar_execucao_item(id, item_id):
+    """Marca o item como executado e move o próximo vencimento."""
+    ativo = _ativo_permitido(id)
+    if ativo is None:
+        return _proibido()
+
+    it = PreventivaItem.query.filter_by(ativo_id=ativo.id, id=item_id).first()
+    if not it:
+        return jsonify({"erro": "item não encontrado"}), 404
+
+    data = request.get_json(silent=True) or {}
+    medicao = data.get("medicao")
+    if medicao is not None:
+        try:
+            medicao = float(medicao)
+        except (TypeError, ValueError):
+            return jsonify({"erro": "medicao inválida"}), 400
+        if medicao < 0:
+            return jsonify({"erro": "medicao deve ser >= 0"}), 400
+
+    observacao = (data.get("observacao") or "").strip() or None
+
+    ex = registrar_execucao(
+        it, ativo, medicao=medicao, observacao=observacao, usuario_id=session.get("user_id")
+    )
+    db.session.commit()
+    invalidar_kpis()
+    invalidar_plano()
+    notificador.publicar(canal_plano(ativo.id))
+
+    return jsonify(
+        {
+            "mensagem": "execução registrada",
+            "execucao": serializar_execucao(ex),
+            "proxima_execucao": it.proxima_execucao,
+        }
+    ), 201
+
+
+@api_ativos_bp.get("/<int:id>/plano/<int:item_id>/execucoes")
+@login_required
+def listar_execucoes_item(id, item_id):
+    ativo = _ativo_permitido(id)
+    if ativo is None:
+        return _proibido()
+
+    execucoes = (
+        PreventivaExecucao.query
+        .filter_by(ativo_id=ativo.id, item_id=item_id)
+        .order_by(PreventivaExecucao.id.desc())
+        .limit(_limite())
+        .all()
+    )
+    return jsonify({"ativo_id": ativo.id, "item_id": item_id,
+                    "execucoes": [serializar_execucao(ex) for ex in execucoes]})
+
+
+@api_ativos_bp.get("/<int:id>/execucoes")
+@login_required
+def listar_execucoes_ativo(id):
+    ativo = _ativo_permitido(id)
+    if ativo is None:
+        return _proibido()
+
+    execucoes = (
+        PreventivaExecucao.query
+        .filter_by(ativo_id=ativo.id)
+        .order_by(PreventivaExecucao.id.desc())
+        .limit(_limite())
+        .all()
+    )
+    return jsonify({"ativo_id": ativo.id, "execucoes": [serializar_execucao(ex) for ex in execucoes]})
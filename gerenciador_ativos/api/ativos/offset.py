@@ -2,6 +2,9 @@ from flask import request, jsonify
 from gerenciador_ativos.api.ativos import api_ativos_bp
 from gerenciador_ativos.models import Ativo
 from gerenciador_ativos.extensions import db
+from gerenciador_ativos.dashboards.kpis import invalidar_kpis
+from gerenciador_ativos.preventiva_fila import recalcular_ativo
+from gerenciador_ativos.telemetria.eventos import notificador, canal_plano
 
 
 @api_ativos_bp.post("/<int:id>/offset")
@@ -27,7 +30,11 @@ def atualizar_offset(id):
 
     # salva no banco
     ativo.horas_offset = novo_offset
+    # o que falta de cada item por horas muda junto com o horímetro
+    recalcular_ativo(ativo)
     db.session.commit()
+    invalidar_kpis()
+    notificador.publicar(canal_plano(ativo.id))
 
     return jsonify({
         "mensagem": "offset atualizado com sucesso",
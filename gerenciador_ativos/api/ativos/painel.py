@@ -0,0 +1,136 @@
+"""
+Carga inicial do painel num único request: /api/ativos/<id>/painel
+
+Junta o que o painel buscava em três chamadas (/dados, /plano,
+/preventiva) com um só lookup do ativo e uma só consulta do plano.
+
+A resposta sai com ETag (servertime da amostra + versão do plano +
+offset) e Last-Modified (servertime). Com If-None-Match igual, volta 304
+sem corpo e sem montar o payload, então o polling de 30s só paga o
+lookup do ativo e a contagem do plano quando nada mudou.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from flask import Response, jsonify, request
+from sqlalchemy import case, func
+
+from gerenciador_ativos.api.ativos import api_ativos_bp
+from gerenciador_ativos.api.ativos.plano import serializar_plano
+from gerenciador_ativos.api.ativos.preventiva import calcular_tarefas
+from gerenciador_ativos.api.monitoramento.brasilsat import BrasilSatError
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.preventiva_models import PreventivaExecucao, PreventivaItem
+from gerenciador_ativos.telemetria.service import aplicar_leitura, formato_v2
+from gerenciador_ativos.telemetria.snapshot import obter_telemetria
+
+# as tarefas por dias andam com o relógio, não com a telemetria:
+# a ETag muda a cada janela para o "faltam" não ficar congelado
+JANELA_DIAS_S = 3600
+
+
+def _versao_plano(ativo_id):
+    """
+    (quantidade, maior id, itens por dias, última execução) do plano do ativo.
+    O plano só tem inclusão e exclusão, então o par quantidade/maior id
+    muda a cada alteração; uma execução registrada muda o vencimento.
+    """
+    qtd, maior_id, por_dias = (
+        db.session.query(
+            func.count(PreventivaItem.id),
+            func.max(PreventivaItem.id),
+            func.sum(case((func.lower(PreventivaItem.base) == "dias", 1), else_=0)),
+        )
+        .filter(PreventivaItem.ativo_id == ativo_id)
+        .one()
+    )
+    ultima_execucao = (
+        db.session.query(func.max(PreventivaExecucao.id))
+        .filter(PreventivaExecucao.ativo_id == ativo_id)
+        .scalar()
+    )
+    return int(qtd or 0), int(maior_id or 0), int(por_dias or 0), int(ultima_execucao or 0)
+
+
+def _etag_painel(ativo, servertime, versao_plano, agora):
+    qtd, maior_id, por_dias, ultima_execucao = versao_plano
+    partes = [
+        ativo.id,
+        # sem amostra (sem IMEI / BrasilSat fora) a ETag não casa com a de dados
+        servertime if servertime is not None else "-",
+        qtd,
+        maior_id,
+        ultima_execucao,
+        ativo.horas_offset or 0,
+        # cadastro exibido no cabeçalho do painel
+        ativo.nome,
+        ativo.categoria,
+        ativo.imei,
+    ]
+    # sem plano cadastrado o fallback também é só por horas
+    if por_dias:
+        partes.append(int(agora // JANELA_DIAS_S))
+
+    chave = ":".join(str(p) for p in partes)
+    return hashlib.sha1(chave.encode()).hexdigest()[:20]
+
+
+@api_ativos_bp.get("/<int:id>/painel")
+def painel_ativo(id):
+    """
+    Telemetria + plano + preventiva (ordenada) do ativo, com GET condicional.
+    ?atualizar=1 força a busca ao vivo, como no /dados.
+
+    Plano, preventiva e cadastro vêm sempre; se a telemetria não puder ser
+    obtida, "dados" é null e "erro_telemetria" explica o motivo.
+    """
+    ativo = Ativo.query.get_or_404(id)
+
+    # plano e preventiva não dependem da BrasilSat: sem IMEI ou com a
+    # BrasilSat fora, o painel recebe dados=null e erro_telemetria
+    amostra = None
+    erro_telemetria = None
+    if not ativo.imei:
+        erro_telemetria = "Ativo não possui IMEI cadastrado"
+    else:
+        forcar = request.args.get("atualizar") in ("1", "true")
+        try:
+            amostra = obter_telemetria(ativo.imei, forcar=forcar)
+        except BrasilSatError as exc:
+            erro_telemetria = f"Falha ao obter dados da BrasilSat: {exc}"
+
+    servertime = amostra.telemetria.get("servertime") if amostra is not None else None
+    etag = _etag_painel(ativo, servertime, _versao_plano(ativo.id), time.time())
+
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        itens = (
+            PreventivaItem.query.filter_by(ativo_id=ativo.id)
+            .order_by(PreventivaItem.id)
+            .all()
+        )
+        corpo = {
+            "ativo_id": ativo.id,
+            "cadastro": {
+                "nome": ativo.nome,
+                "categoria": ativo.categoria,
+                "imei": ativo.imei,
+            },
+            "dados": formato_v2(aplicar_leitura(ativo, amostra)) if amostra is not None else None,
+            "plano": serializar_plano(ativo.id, itens),
+            "tarefas": calcular_tarefas(ativo, itens),
+        }
+        if erro_telemetria:
+            corpo["erro_telemetria"] = erro_telemetria
+        resp = jsonify(corpo)
+
+    resp.set_etag(etag)
+    if servertime:
+        resp.last_modified = datetime.fromtimestamp(int(servertime), tz=timezone.utc)
+    # o navegador guarda a resposta, mas revalida sempre com If-None-Match
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
@@ -3,14 +3,24 @@ from flask import request, jsonify
 from gerenciador_ativos.api.ativos import api_ativos_bp
 from gerenciador_ativos.models import Ativo
 from gerenciador_ativos.preventiva_models import PreventivaItem
+from gerenciador_ativos.preventiva_fila import atualizar_item
+from gerenciador_ativos.preventiva_motor import invalidar_plano
 from gerenciador_ativos.extensions import db
+from gerenciador_ativos.dashboards.kpis import invalidar_kpis
+from gerenciador_ativos.telemetria.eventos import notificador, canal_plano
 
 
 @api_ativos_bp.get("/<int:id>/plano")
 def listar_plano(id):
     """Lista o plano de preventiva cadastrado para o ativo."""
     ativo = Ativo.query.get_or_404(id)
-    itens = PreventivaItem.query.filter_by(ativo_id=ativo.id).order_by(PreventivaItem.id).all()
+    return jsonify({"ativo_id": ativo.id, "plano": serializar_plano(ativo.id)})
+
+
+def serializar_plano(ativo_id, itens=None):
+    """Itens do plano do ativo no formato da API (itens já carregados, se vierem)."""
+    if itens is None:
+        itens = PreventivaItem.query.filter_by(ativo_id=ativo_id).order_by(PreventivaItem.id).all()
 
     data = []
     for it in itens:
@@ -22,10 +32,12 @@ def listar_plano(id):
                 "intervalo": it.intervalo,
                 "primeira_execucao": it.primeira_execucao,
                 "avisar_antes": it.avisar_antes,
+                "ultima_execucao": it.ultima_execucao,
+                "proxima_execucao": it.proxima_execucao,
             }
         )
 
-    return jsonify({"ativo_id": ativo.id, "plano": data})
+    return data
 
 
 @api_ativos_bp.post("/<int:id>/plano")
@@ -82,8 +94,13 @@ def criar_item_plano(id):
         primeira_execucao=primeira,
         avisar_antes=avisar,
     )
+    # já entra na fila de vencimentos com a próxima execução calculada
+    atualizar_item(it, ativo)
     db.session.add(it)
     db.session.commit()
+    invalidar_kpis()
+    invalidar_plano()
+    notificador.publicar(canal_plano(ativo.id))
 
     return jsonify({"mensagem": "item criado com sucesso", "id": it.id}), 201
 
@@ -99,5 +116,8 @@ def excluir_item_plano(id, item_id):
 
     db.session.delete(it)
     db.session.commit()
+    invalidar_kpis()
+    invalidar_plano()
+    notificador.publicar(canal_plano(ativo.id))
 
     return jsonify({"mensagem": "item excluído com sucesso"})
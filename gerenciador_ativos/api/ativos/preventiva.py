@@ -1,121 +1,96 @@
-import time
-from flask import jsonify
+from flask import jsonify, request
 
 from gerenciador_ativos.api.ativos import api_ativos_bp
+from gerenciador_ativos.auth.decorators import login_required
+from gerenciador_ativos.auth.principal import principal_atual
 from gerenciador_ativos.models import Ativo
-from gerenciador_ativos.preventiva_models import PreventivaItem
+from gerenciador_ativos.preventiva_fila import fila_vencimentos
+from gerenciador_ativos.preventiva_motor import tarefas_do_ativo, vencimentos_frota
 
-# Regras padrão (fallback) caso o ativo não tenha plano cadastrado
-FALLBACK_REGRAS = [
-    {"nome": "Drenar separador de água/combustível", "intervalo": 50.0, "base": "horas"},
-    {"nome": "Troca de óleo do motor", "intervalo": 100.0, "base": "horas"},
-    {"nome": "Troca do filtro de óleo", "intervalo": 200.0, "base": "horas"},
-]
 
+@api_ativos_bp.get("/<int:id>/preventiva")
+def preventiva_ativo(id):
+    """
+    Retorna as próximas atividades de preventiva do ativo, usando:
 
-def _horas_totais_ativo(ativo: Ativo) -> float:
-    """Horas totais atuais (acumulado + ciclo ligado)."""
-    horas_total = float(getattr(ativo, "horas_sistema_total", 0.0) or 0.0)
-    ts_ligado = getattr(ativo, "timestamp_ligado", None)
+    - plano cadastrado em banco (PreventivaItem), se existir
+    - ou regras padrão (fallback) se não houver plano
+    """
+    ativo = Ativo.query.get_or_404(id)
+    return jsonify({"tarefas": calcular_tarefas(ativo)})
 
-    if ts_ligado is not None:
-        agora_ts = time.time()
-        ciclo_h = max(0.0, (agora_ts - float(ts_ligado)) / 3600.0)
-        horas_total += ciclo_h
 
-    return horas_total
+def calcular_tarefas(ativo, itens=None):
+    """Lista de tarefas de preventiva do ativo, ordenada pelo que falta."""
+    return tarefas_do_ativo(ativo, itens)
 
 
-def _dias_totais_ativo(ativo: Ativo) -> float:
+def _escopo_cliente(cliente_pedido):
+    """
+    Cliente a filtrar, pelo usuário logado (principal), não pela sessão:
+    equipe interna escolhe (?cliente_id ou todos); os demais ficam sempre
+    no próprio cliente. Retorna (cliente_id, None) ou (None, resposta 403).
     """
-    Dias de uso do ativo.
-    Se tiver um campo de data (ex: data_cadastro), usamos ele.
-    Senão, cai pra zero e o plano por dias só não anda.
+    principal = principal_atual()
+    if principal.is_interno():
+        return cliente_pedido, None
+    if principal.cliente_id is None:
+        return None, (jsonify({"erro": "Usuário sem cliente vinculado"}), 403)
+    return principal.cliente_id, None
+
+
+@api_ativos_bp.get("/preventiva/vencimentos")
+@login_required
+def vencimentos_preventiva():
     """
-    # tenta usar algum campo de data se existir
-    data_ref = getattr(ativo, "data_cadastro", None) or getattr(ativo, "criado_em", None)
+    Itens de preventiva da frota ordenados por urgência (vencidos primeiro).
 
-    if not data_ref:
-        return 0.0
+    ?limite=100       quantos itens devolver (0 = todos)
+    ?alertas=1        só vencidos ou dentro do avisar_antes
+    ?cliente_id=N     só os ativos de um cliente (gerente)
 
+    Usuário cliente sempre recebe só os próprios ativos.
+    """
     try:
-        ts_ref = data_ref.timestamp()
-    except Exception:
-        return 0.0
+        limite = max(0, int(request.args.get("limite", 100)))
+        cliente_id = request.args.get("cliente_id", type=int)
+    except ValueError:
+        return jsonify({"erro": "limite inválido"}), 400
 
-    dias = max(0.0, (time.time() - ts_ref) / 86400.0)
-    return dias
+    cliente_id, negado = _escopo_cliente(cliente_id)
+    if negado:
+        return negado
 
+    so_alertas = request.args.get("alertas") in ("1", "true")
+    return jsonify(vencimentos_frota(limite=limite, so_alertas=so_alertas, cliente_id=cliente_id))
 
-@api_ativos_bp.get("/<int:id>/preventiva")
-def preventiva_ativo(id):
-    """
-    Retorna as próximas atividades de preventiva do ativo, usando:
 
-    - plano cadastrado em banco (PreventivaItem), se existir
-    - ou regras padrão (fallback) se não houver plano
+@api_ativos_bp.get("/preventiva/fila")
+@login_required
+def fila_preventiva():
     """
-    ativo = Ativo.query.get_or_404(id)
+    O que vence nos próximos N horas / dias, em todos os clientes.
+
+    ?horas=50         itens por horas com faltam <= 50 (vencidos inclusos)
+    ?dias=15          itens por dias que vencem até daqui a 15 dias
+    ?limite=200       quantos itens devolver (0 = todos)
+    ?cliente_id=N     só os ativos de um cliente (gerente)
+
+    Lê a fila materializada (preventiva_fila.py): uma faixa de índice por
+    base, sem calcular o plano da frota inteira.
 
-    horas_total = _horas_totais_ativo(ativo)
-    dias_total = _dias_totais_ativo(ativo)
-
-    itens = PreventivaItem.query.filter_by(ativo_id=ativo.id).all()
-
-    tarefas = []
-
-    if itens:
-        # Usa plano cadastrado
-        for it in itens:
-            base = (it.base or "horas").lower()
-            intervalo = float(it.intervalo or 0.0)
-            primeira = float(it.primeira_execucao or 0.0)
-
-            if intervalo <= 0:
-                continue
-
-            if base == "dias":
-                medicao = dias_total
-            else:
-                base = "horas"
-                medicao = horas_total
-
-            if medicao < primeira:
-                faltam = primeira - medicao
-            else:
-                med_eff = max(0.0, medicao - primeira)
-                resto = med_eff % intervalo
-                faltam = intervalo - resto if resto > 0 else intervalo
-
-            tarefas.append(
-                {
-                    "id": it.id,
-                    "nome": it.nome,
-                    "base": base,
-                    "faltam": round(faltam, 1),
-                }
-            )
-    else:
-        # Fallback simples (igual ao que já estava)
-        for regra in FALLBACK_REGRAS:
-            base = regra.get("base", "horas").lower()
-            intervalo = float(regra.get("intervalo", 0.0) or 0.0)
-            if intervalo <= 0:
-                continue
-
-            medicao = horas_total if base == "horas" else dias_total
-            resto = medicao % intervalo
-            faltam = intervalo - resto if resto > 0 else intervalo
-
-            tarefas.append(
-                {
-                    "id": None,
-                    "nome": regra["nome"],
-                    "base": base,
-                    "faltam": round(faltam, 1),
-                }
-            )
-
-    tarefas.sort(key=lambda t: t["faltam"])
-
-    return jsonify({"tarefas": tarefas})
+    Usuário cliente sempre recebe só os próprios ativos.
+    """
+    try:
+        horas = float(request.args.get("horas", 50))
+        dias = float(request.args.get("dias", 15))
+        limite = max(0, int(request.args.get("limite", 200)))
+        cliente_id = request.args.get("cliente_id", type=int)
+    except ValueError:
+        return jsonify({"erro": "horas, dias e limite devem ser números"}), 400
+
+    cliente_id, negado = _escopo_cliente(cliente_id)
+    if negado:
+        return negado
+
+    return jsonify(fila_vencimentos(horas=horas, dias=dias, cliente_id=cliente_id, limite=limite))
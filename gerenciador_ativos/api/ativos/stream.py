@@ -0,0 +1,156 @@
+"""
+Stream SSE do painel: /api/ativos/<id>/stream
+
+Substitui as três consultas a cada 30s (/dados, /plano, /preventiva):
+
+- event: telemetria  -> mesmo JSON do /dados, só quando chega amostra nova
+- event: plano       -> mesmo JSON do /plano, só quando o plano muda
+- event: preventiva  -> mesmo JSON do /preventiva, só quando as tarefas mudam
+
+Os painéis abertos num ativo compartilham a mesma amostra do snapshot
+(alimentado pelo poller) e esperam no mesmo notificador, sem chamadas
+extras à BrasilSat. Um stream só é acordado quando muda um canal dele
+(telemetria do seu IMEI ou plano do seu ativo); nos heartbeats não há
+consulta nem recálculo.
+
+Cada conexão ocupa uma thread do waitress enquanto estiver aberta, por
+isso há um limite de streams simultâneos (acima dele: 503 e o painel
+volta a consultar por polling) e cada stream dura no máximo
+PAINEL_STREAM_DURACAO segundos antes de o navegador reconectar sozinho.
+
+Dimensionamento: WAITRESS_THREADS = PAINEL_STREAM_MAX + PAINEL_STREAM_RESERVA,
+onde a reserva são as threads que os streams nunca ocupam (páginas,
+login, /dados dos painéis em polling). Para N painéis abertos por
+processo, suba WAITRESS_THREADS para N + reserva; o padrão do Procfile
+(16 threads, reserva 4) comporta 12 painéis em stream.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from flask import Response, current_app, jsonify
+
+from gerenciador_ativos.api.ativos import api_ativos_bp
+from gerenciador_ativos.api.ativos.plano import serializar_plano
+from gerenciador_ativos.api.ativos.preventiva import calcular_tarefas
+from gerenciador_ativos.api.monitoramento.brasilsat import BrasilSatError
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.telemetria.eventos import notificador, canal_plano, canal_telemetria
+from gerenciador_ativos.telemetria.service import aplicar_leitura, formato_v2
+from gerenciador_ativos.telemetria.snapshot import obter_telemetria, snapshot
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_conexoes = 0
+
+
+def _evento(nome, dados):
+    return f"event: {nome}\ndata: {json.dumps(dados, separators=(',', ':'))}\n\n"
+
+
+def _reservar_conexao(maximo):
+    global _conexoes
+    with _lock:
+        if _conexoes >= maximo:
+            return False
+        _conexoes += 1
+        return True
+
+
+def _liberar_conexao():
+    global _conexoes
+    with _lock:
+        _conexoes -= 1
+
+
+@api_ativos_bp.get("/<int:id>/stream")
+def stream_ativo(id):
+    ativo = Ativo.query.get_or_404(id)
+    imei = ativo.imei
+
+    app = current_app._get_current_object()
+    maximo = int(app.config.get("PAINEL_STREAM_MAX", 2))
+    duracao = float(app.config.get("PAINEL_STREAM_DURACAO", 300))
+    heartbeat = float(app.config.get("PAINEL_STREAM_HEARTBEAT", 15))
+    idade_max = float(app.config.get("TELEMETRIA_IDADE_MAX", 90))
+
+    if not _reservar_conexao(maximo):
+        return jsonify({"erro": "limite de streams atingido, use polling"}), 503
+
+    def gerar():
+        ultimo_servertime = object()
+        ultimas_tarefas = None
+        versoes = {canal_telemetria(imei): -1, canal_plano(id): -1}
+        fim = time.monotonic() + duracao
+        recalcular = True
+
+        try:
+            # navegador reconecta 3s depois do fim do stream
+            yield "retry: 3000\n\n"
+
+            while time.monotonic() < fim:
+                if recalcular:
+                    mudou_plano = versoes[canal_plano(id)] != notificador.versao(canal_plano(id))
+                    versoes = {c: notificador.versao(c) for c in versoes}
+
+                    eventos = []
+                    with app.app_context():
+                        ativo = db.session.get(Ativo, id)
+                        if ativo is None:
+                            yield _evento("fim", {"erro": "ativo não encontrado"})
+                            return
+
+                        # telemetria: só quando o servertime muda (ou o offset foi ajustado)
+                        nova_telemetria = False
+                        if imei:
+                            try:
+                                amostra = obter_telemetria(imei)
+                            except BrasilSatError as exc:
+                                logger.warning(f"[STREAM] telemetria ativo {id}: {exc}")
+                                amostra = None
+
+                            if amostra is not None:
+                                servertime = amostra.telemetria.get("servertime")
+                                if servertime != ultimo_servertime or mudou_plano:
+                                    ultimo_servertime = servertime
+                                    nova_telemetria = True
+                                    leitura = aplicar_leitura(ativo, amostra)
+                                    eventos.append(_evento("telemetria", formato_v2(leitura)))
+
+                        if mudou_plano:
+                            eventos.append(_evento("plano", {"ativo_id": id, "plano": serializar_plano(id)}))
+
+                        # preventiva depende só das horas (telemetria) e do plano
+                        if ultimas_tarefas is None or nova_telemetria or mudou_plano:
+                            tarefas = calcular_tarefas(ativo)
+                            if tarefas != ultimas_tarefas:
+                                ultimas_tarefas = tarefas
+                                eventos.append(_evento("preventiva", {"tarefas": tarefas}))
+
+                    for evento in eventos:
+                        yield evento
+
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    break
+
+                recalcular = notificador.aguardar(versoes, min(heartbeat, restante))
+                if not recalcular:
+                    # comentário SSE: mantém proxies e a conexão vivos
+                    yield ": ping\n\n"
+                    # sem poller (ou poller parado) ninguém publica: a amostra
+                    # velha é buscada de novo como no polling
+                    amostra = snapshot.obter(imei) if imei else None
+                    recalcular = bool(imei) and (amostra is None or amostra.idade() > idade_max)
+        finally:
+            _liberar_conexao()
+
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    }
+    return Response(gerar(), mimetype="text/event-stream", headers=headers)
@@ -0,0 +1,104 @@
+"""
+Trajeto do ativo: /api/ativos/<id>/trajeto?de=&ate=&zoom=
+
+- de / ate: epoch (s) ou data ISO (2026-10-01 ou 2026-10-01T08:00);
+  padrão: últimas 24h, janela máxima TRAJETO_JANELA_MAX_DIAS
+- zoom: zoom do mapa que vai desenhar (define a tolerância da simplificação)
+
+As amostras são lidas do histórico em blocos (yield_per) e os pontos
+repetidos são descartados durante a leitura. A simplificação
+(telemetria/trajeto.py) precisa do caminho inteiro, então a resposta não
+é enviada aos pedaços: sai de uma vez, como uma encoded polyline de
+poucos KB.
+
+Exige login: equipe interna vê qualquer ativo, os demais só os do
+próprio cliente.
+"""
+
+import time
+
+from flask import current_app, jsonify, request
+from sqlalchemy import select
+
+from gerenciador_ativos.api.ativos import api_ativos_bp
+from gerenciador_ativos.auth.principal import principal_atual
+from gerenciador_ativos.banco import executar_leitura
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.telemetria.historico import ler_instante
+from gerenciador_ativos.telemetria.trajeto import codificar_polyline, simplificar_trajeto
+from gerenciador_ativos.telemetria_models import TelemetriaAmostra
+
+
+@api_ativos_bp.get("/<int:id>/trajeto")
+def trajeto_ativo(id):
+    ativo = Ativo.query.get_or_404(id)
+
+    principal = principal_atual()
+    if principal is None or not principal.ativo:
+        return jsonify({"erro": "Faça login"}), 401
+    # só a equipe interna vê ativos de qualquer cliente
+    if not principal.pode_ver_ativo(ativo.id):
+        return jsonify({"erro": "Ativo não pertence ao cliente"}), 403
+
+    agora = int(time.time())
+    try:
+        ate = ler_instante(request.args.get("ate"), agora)
+        de = ler_instante(request.args.get("de"), ate - 86400)
+        zoom = max(0, min(int(request.args.get("zoom", 14)), 22))
+    except ValueError:
+        return jsonify({"erro": "Use de/ate em epoch ou ISO e zoom inteiro"}), 400
+
+    if de > ate:
+        return jsonify({"erro": "'de' maior que 'ate'"}), 400
+
+    max_dias = float(current_app.config.get("TRAJETO_JANELA_MAX_DIAS", 31))
+    if ate - de > max_dias * 86400:
+        return jsonify({"erro": f"Janela máxima de {max_dias:g} dias"}), 400
+
+    # histórico só de leitura: vai para a réplica, se houver
+    consulta = executar_leitura(
+        select(
+            TelemetriaAmostra.servertime,
+            TelemetriaAmostra.latitude,
+            TelemetriaAmostra.longitude,
+        )
+        .where(
+            TelemetriaAmostra.ativo_id == ativo.id,
+            TelemetriaAmostra.servertime >= de,
+            TelemetriaAmostra.servertime <= ate,
+            TelemetriaAmostra.latitude.isnot(None),
+            TelemetriaAmostra.longitude.isnot(None),
+        )
+        .order_by(TelemetriaAmostra.servertime)
+        .execution_options(yield_per=5000)
+    )
+
+    contagem = {"brutos": 0, "inicio": None, "fim": None}
+
+    def _posicoes():
+        for servertime, lat, lon in consulta:
+            # 0,0 = rastreador sem fix de GPS
+            if lat == 0 and lon == 0:
+                continue
+            contagem["brutos"] += 1
+            if contagem["inicio"] is None:
+                contagem["inicio"] = servertime
+            contagem["fim"] = servertime
+            yield lat, lon
+
+    # só os pontos sem repetição ficam em memória (barco parado não pesa)
+    simplificado = simplificar_trajeto(_posicoes(), zoom)
+
+    return jsonify(
+        {
+            "ativo_id": ativo.id,
+            "de": de,
+            "ate": ate,
+            "zoom": zoom,
+            "inicio": contagem["inicio"],
+            "fim": contagem["fim"],
+            "pontos_brutos": contagem["brutos"],
+            "pontos": len(simplificado),
+            "polyline": codificar_polyline(simplificado),
+        }
+    )
@@ -2,8 +2,9 @@
 Integração com a API da BrasilSat para telemetria de ativos.
 
 Responsabilidades deste módulo:
-- autenticar na BrasilSat
-- buscar o último track por IMEI
+- manter uma sessão HTTP compartilhada (keep-alive, pool, retry/backoff)
+- autenticar na BrasilSat (com cache do access_token por processo)
+- buscar o último track por IMEI (ou em lote para a frota inteira)
 - normalizar os dados em um dicionário amigável
 
 Uso típico dentro da app:
@@ -14,15 +15,23 @@ Uso típico dentro da app:
     )
 
     dados = get_telemetria_por_imei(imei="355468593059041")
+
+    # frota: uma chamada /track para cada lote de IMEIs
+    por_imei, ausentes = get_telemetria_por_imeis(["355468593059041", ...])
 """
 
 import os
 import time
 import hashlib
-from typing import Dict, Any
+import logging
+import random
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
+logger = logging.getLogger(__name__)
 
 # --------------------------------------------------
 # Configuração básica
@@ -32,6 +41,31 @@ BASE_URL = os.getenv("BRASILSAT_BASE_URL", "https://gps.brasilsatgps.com.br")
 ACCOUNT = os.getenv("BRASILSAT_ACCOUNT")
 PASSWORD = os.getenv("BRASILSAT_PASSWORD")
 
+# Renova o token alguns segundos antes do expire_time informado pela BrasilSat
+TOKEN_MARGEM_RENOVACAO_S = float(os.getenv("BRASILSAT_TOKEN_MARGEM", "120"))
+# Validade assumida quando a autorização não devolve expire_time
+TOKEN_VALIDADE_PADRAO_S = float(os.getenv("BRASILSAT_TOKEN_VALIDADE", "1800"))
+
+# Conexões HTTP: o pool acompanha o número de threads do waitress (+1 do poller)
+HTTP_POOL_TAMANHO = int(os.getenv(
+    "BRASILSAT_POOL",
+    str(int(os.getenv("WAITRESS_THREADS", "16")) + 1),
+))
+HTTP_TIMEOUT_CONEXAO_S = float(os.getenv("BRASILSAT_TIMEOUT_CONEXAO", "3.05"))
+HTTP_TIMEOUT_LEITURA_S = float(os.getenv("BRASILSAT_TIMEOUT_LEITURA", "10"))
+# Novas tentativas em falhas transitórias (rede, timeout, 429/5xx)
+HTTP_TENTATIVAS_EXTRAS = int(os.getenv("BRASILSAT_RETRIES", "2"))
+HTTP_BACKOFF_BASE_S = float(os.getenv("BRASILSAT_BACKOFF_BASE", "0.3"))
+HTTP_BACKOFF_MAX_S = float(os.getenv("BRASILSAT_BACKOFF_MAX", "3"))
+
+# Máximo de IMEIs aceitos pela BrasilSat em uma única chamada /track
+TRACK_LOTE_MAX = int(os.getenv("BRASILSAT_TRACK_LOTE", "100"))
+
+# Códigos da API que indicam access_token inválido/expirado (só estes renovam o token)
+CODIGOS_TOKEN_INVALIDO = frozenset(
+    int(c) for c in os.getenv("BRASILSAT_CODIGOS_TOKEN", "10011,10012").split(",") if c.strip()
+)
+
 
 class BrasilSatError(Exception):
     """Erro genérico de integração com a BrasilSat."""
@@ -41,13 +75,113 @@ def _md5(s: str) -> str:
     return hashlib.md5(s.encode("utf-8")).hexdigest()
 
 
+# --------------------------------------------------
+# Cliente HTTP compartilhado
+# --------------------------------------------------
+
+_STATUS_TRANSITORIOS = {429, 500, 502, 503, 504}
+
+
+class _ClienteHTTP:
+    """
+    Sessão requests única por processo.
+
+    - keep-alive: reaproveita conexões TCP/TLS entre chamadas
+    - pool com HTTP_POOL_TAMANHO conexões (threads do waitress + poller)
+    - timeouts separados de conexão e leitura
+    - retry limitado com backoff exponencial + jitter
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessao: Optional[requests.Session] = None
+        self._adapter: Optional[HTTPAdapter] = None
+
+        self.requisicoes = 0
+        self.retentativas = 0
+        self.falhas = 0
+
+    def _obter_sessao(self) -> requests.Session:
+        if self._sessao is None:
+            with self._lock:
+                if self._sessao is None:
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=HTTP_POOL_TAMANHO,
+                        pool_block=False,
+                        max_retries=0,
+                    )
+                    sessao = requests.Session()
+                    sessao.mount("https://", adapter)
+                    sessao.mount("http://", adapter)
+                    self._adapter = adapter
+                    self._sessao = sessao
+        return self._sessao
+
+    def _espera_backoff(self, tentativa: int) -> float:
+        teto = min(HTTP_BACKOFF_MAX_S, HTTP_BACKOFF_BASE_S * (2 ** tentativa))
+        # "full jitter": espalha as novas tentativas das várias threads
+        return random.uniform(0, teto)
+
+    def get(self, url: str, params: Dict[str, Any]) -> requests.Response:
+        sessao = self._obter_sessao()
+        timeout = (HTTP_TIMEOUT_CONEXAO_S, HTTP_TIMEOUT_LEITURA_S)
+
+        tentativa = 0
+        while True:
+            self.requisicoes += 1
+            try:
+                resp = sessao.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if tentativa >= HTTP_TENTATIVAS_EXTRAS:
+                    self.falhas += 1
+                    raise
+            else:
+                if resp.status_code not in _STATUS_TRANSITORIOS or tentativa >= HTTP_TENTATIVAS_EXTRAS:
+                    return resp
+
+            self.retentativas += 1
+            time.sleep(self._espera_backoff(tentativa))
+            tentativa += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        novas = 0
+        usos = 0
+
+        if self._adapter is not None:
+            pools = self._adapter.poolmanager.pools
+            for chave in list(pools.keys()):
+                pool = pools.get(chave)
+                if pool is None:
+                    continue
+                novas += pool.num_connections
+                usos += pool.num_requests
+
+        return {
+            "pool_tamanho": HTTP_POOL_TAMANHO,
+            "requisicoes": self.requisicoes,
+            "retentativas": self.retentativas,
+            "falhas": self.falhas,
+            "conexoes_novas": novas,
+            "conexoes_reutilizadas": max(0, usos - novas),
+        }
+
+
+_http = _ClienteHTTP()
+
+
+def estatisticas_http() -> Dict[str, Any]:
+    """Contadores do cliente HTTP (reuso de conexões, retentativas)."""
+    return _http.estatisticas()
+
+
 # --------------------------------------------------
 # Autenticação
 # --------------------------------------------------
 
-def _obter_access_token() -> str:
+def _autorizar() -> Dict[str, Any]:
     """
-    Obtém um access_token na BrasilSat.
+    Chama /api/authorization e devolve o record com access_token e expire_time.
 
     Endpoint típico:
         GET /api/authorization?time=...&account=...&signature=...
@@ -56,6 +190,23 @@ def _obter_access_token() -> str:
         {"code": 0, "record": {"access_token": "...", "expire_time": 1710000000}}
     """
 
+    url, params = _requisicao_autorizacao()
+
+    try:
+        resp = _http.get(url, params)
+    except requests.RequestException as exc:
+        raise BrasilSatError(f"Falha de rede ao autenticar na BrasilSat: {exc}") from exc
+
+    try:
+        data = resp.json()
+    except ValueError as exc:
+        raise BrasilSatError(f"Resposta inválida da BrasilSat em /authorization: {resp.text}") from exc
+
+    return _extrair_record_autorizacao(data)
+
+
+def _requisicao_autorizacao() -> Tuple[str, Dict[str, Any]]:
+    """URL e parâmetros assinados de /api/authorization."""
     if not ACCOUNT or not PASSWORD:
         raise BrasilSatError("BRASILSAT_ACCOUNT ou BRASILSAT_PASSWORD não definidos no ambiente.")
 
@@ -68,17 +219,11 @@ def _obter_access_token() -> str:
         "account": ACCOUNT,
         "signature": signature,
     }
+    return url, params
 
-    try:
-        resp = requests.get(url, params=params, timeout=10)
-    except requests.RequestException as exc:
-        raise BrasilSatError(f"Falha de rede ao autenticar na BrasilSat: {exc}") from exc
-
-    try:
-        data = resp.json()
-    except ValueError as exc:
-        raise BrasilSatError(f"Resposta inválida da BrasilSat em /authorization: {resp.text}") from exc
 
+def _extrair_record_autorizacao(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Valida a resposta de /api/authorization e devolve o record."""
     if data.get("code") != 0:
         raise BrasilSatError(f"Erro na autorização BrasilSat: {data}")
 
@@ -88,50 +233,239 @@ def _obter_access_token() -> str:
     if not token:
         raise BrasilSatError(f"access_token não encontrado na resposta de autorização: {data}")
 
-    return token
+    return record
 
 
-# --------------------------------------------------
-# Track por IMEI
-# --------------------------------------------------
+def _calcular_expiracao(record: Dict[str, Any], agora: float) -> float:
+    """
+    Converte o expire_time do record em timestamp absoluto.
 
-def _buscar_track_bruto(imei: str) -> Dict[str, Any]:
+    A BrasilSat devolve normalmente um epoch (ex: 1710000000); valores
+    pequenos são tratados como "segundos de validade" por segurança.
     """
-    Busca o último track da BrasilSat para o IMEI informado e retorna o JSON bruto.
+    try:
+        expire_time = float(record.get("expire_time"))
+    except (TypeError, ValueError):
+        return agora + TOKEN_VALIDADE_PADRAO_S
+
+    if expire_time < 1_000_000_000:
+        return agora + expire_time
+
+    return expire_time
+
+
+class _TokenCache:
     """
+    Cache do access_token compartilhado por todas as threads do processo.
+
+    - reaproveita o token enquanto ele for válido
+    - renova proativamente dentro da margem antes do expire_time
+    - single-flight: só uma thread chama /api/authorization por vez;
+      durante a renovação proativa as demais seguem com o token atual
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expira_em = 0.0
+        self._renovar_em = 0.0
+
+        self.acertos = 0
+        self.renovacoes = 0
+        self.falhas = 0
+
+    def obter(self) -> str:
+        agora = time.time()
+        token, expira_em = self._token, self._expira_em
+
+        # token válido e fora da janela de renovação
+        if token and agora < self._renovar_em:
+            self.acertos += 1
+            return token
+
+        # dentro da janela de renovação: quem pegar o lock renova,
+        # os outros continuam usando o token ainda válido
+        if token and agora < expira_em:
+            if not self._lock.acquire(blocking=False):
+                self.acertos += 1
+                return token
+            try:
+                return self._renovar_se_preciso()
+            except BrasilSatError:
+                # a renovação falhou, mas o token atual ainda vale
+                self.acertos += 1
+                return token
+            finally:
+                self._lock.release()
+
+        # sem token ou já expirado: todos esperam a mesma renovação
+        with self._lock:
+            return self._renovar_se_preciso()
+
+    def _renovar_se_preciso(self) -> str:
+        """Executa com o lock adquirido."""
+        agora = time.time()
+
+        # outra thread pode ter renovado enquanto esperávamos o lock
+        if self._token and agora < self._renovar_em:
+            self.acertos += 1
+            return self._token
+
+        try:
+            record = _autorizar()
+        except BrasilSatError:
+            self.falhas += 1
+            raise
+
+        return self.guardar(record, agora)
+
+    def token_fresco(self) -> Optional[str]:
+        """Token atual se ainda estiver fora da janela de renovação (sem I/O)."""
+        token = self._token
+        if token and time.time() < self._renovar_em:
+            self.acertos += 1
+            return token
+        return None
+
+    def guardar(self, record: Dict[str, Any], agora: float) -> str:
+        """Registra o record de uma autorização bem-sucedida."""
+        expira_em = _calcular_expiracao(record, agora)
+        # tokens de vida curta: renova na metade da validade
+        margem = min(TOKEN_MARGEM_RENOVACAO_S, max(0.0, expira_em - agora) / 2)
+
+        self._token = record["access_token"]
+        self._expira_em = expira_em
+        self._renovar_em = expira_em - margem
+        self.renovacoes += 1
+        return self._token
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._token = None
+            self._expira_em = 0.0
+            self._renovar_em = 0.0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "acertos": self.acertos,
+            "renovacoes": self.renovacoes,
+            "falhas": self.falhas,
+            "token_valido": bool(self._token) and time.time() < self._expira_em,
+            "expira_em": self._expira_em or None,
+        }
+
+
+_token_cache = _TokenCache()
 
-    if not imei:
-        raise BrasilSatError("IMEI não informado para busca de track.")
 
-    access_token = _obter_access_token()
+def _obter_access_token() -> str:
+    """Devolve um access_token válido, usando o cache do processo."""
+    return _token_cache.obter()
+
+
+def invalidar_access_token() -> None:
+    """Descarta o token em cache (ex: BrasilSat recusou o token)."""
+    _token_cache.invalidar()
+
+
+def estatisticas_token() -> Dict[str, Any]:
+    """Contadores do cache de token (acertos x renovações)."""
+    return _token_cache.estatisticas()
+
+
+# --------------------------------------------------
+# Track por IMEI
+# --------------------------------------------------
 
+def _requisicao_track(access_token: str, imeis: List[str]) -> Tuple[str, Dict[str, Any]]:
+    """URL e parâmetros de /api/track para um lote de IMEIs."""
     url = f"{BASE_URL}/api/track"
     params = {
         "access_token": access_token,
-        "imeis": imei,
+        "imeis": ",".join(imeis),
     }
+    return url, params
 
+
+def _token_recusado(data: Dict[str, Any]) -> bool:
+    """True quando a BrasilSat recusou o access_token (revogado/expirado)."""
     try:
-        resp = requests.get(url, params=params, timeout=15)
+        return int(data.get("code")) in CODIGOS_TOKEN_INVALIDO
+    except (TypeError, ValueError):
+        return False
+
+
+def _extrair_records_track(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Valida a resposta de /api/track e devolve a lista de records."""
+    if data.get("code") != 0:
+        raise BrasilSatError(f"Erro na chamada /track BrasilSat: {data}")
+
+    records = data.get("record") or []
+    if isinstance(records, dict):
+        records = [records]
+
+    return records
+
+
+def _chamar_track(imeis: List[str]) -> Dict[str, Any]:
+    """Faz o GET em /api/track com o token em cache e devolve o JSON."""
+    url, params = _requisicao_track(_obter_access_token(), imeis)
+
+    try:
+        resp = _http.get(url, params)
     except requests.RequestException as exc:
         raise BrasilSatError(f"Falha de rede ao buscar track da BrasilSat: {exc}") from exc
 
     try:
-        data = resp.json()
+        return resp.json()
     except ValueError as exc:
         raise BrasilSatError(f"Resposta inválida da BrasilSat em /track: {resp.text}") from exc
 
-    if data.get("code") != 0:
-        raise BrasilSatError(f"Erro na chamada /track BrasilSat: {data}")
 
-    records = data.get("record") or []
+def _buscar_tracks_brutos(imeis: List[str]) -> List[Dict[str, Any]]:
+    """
+    Busca o último track de um lote de IMEIs (uma única chamada /track)
+    e retorna a lista de records brutos.
+    """
+    data = _chamar_track(imeis)
+
+    if _token_recusado(data):
+        # token pode ter sido revogado antes do expire_time: renova e tenta de novo
+        invalidar_access_token()
+        data = _chamar_track(imeis)
+
+    return _extrair_records_track(data)
+
+
+def _buscar_track_bruto(imei: str) -> Dict[str, Any]:
+    """
+    Busca o último track da BrasilSat para o IMEI informado e retorna o JSON bruto.
+    """
+
+    if not imei:
+        raise BrasilSatError("IMEI não informado para busca de track.")
+
+    records = _buscar_tracks_brutos([imei])
     if not records:
-        raise BrasilSatError(f"Nenhum registro de track retornado para IMEI {imei}: {data}")
+        raise BrasilSatError(f"Nenhum registro de track retornado para IMEI {imei}")
 
     # A BrasilSat costuma devolver uma lista, pegamos o primeiro
     return records[0]
 
 
+def _imeis_unicos(imeis: Iterable[str]) -> List[str]:
+    """Remove vazios e duplicados mantendo a ordem."""
+    return list(dict.fromkeys(
+        str(imei).strip() for imei in imeis if imei and str(imei).strip()
+    ))
+
+
+def _lotes(imeis: List[str], tamanho: int) -> Iterable[List[str]]:
+    tamanho = max(1, tamanho)
+    for i in range(0, len(imeis), tamanho):
+        yield imeis[i:i + tamanho]
+
+
 # --------------------------------------------------
 # Normalização do track
 # --------------------------------------------------
@@ -212,6 +546,17 @@ def _normalizar_track_bruto(record: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _normalizar_lote(lote: List[str], records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Normaliza os records de um lote, mantendo só os IMEIs pedidos."""
+    solicitados = set(lote)
+    telemetrias = {}
+    for record in records:
+        imei = str(record.get("imei") or "").strip()
+        if imei in solicitados:
+            telemetrias[imei] = _normalizar_track_bruto(record)
+    return telemetrias
+
+
 # --------------------------------------------------
 # Função pública
 # --------------------------------------------------
@@ -232,6 +577,49 @@ def get_telemetria_por_imei(imei: str) -> Dict[str, Any]:
     return _normalizar_track_bruto(bruto)
 
 
+def get_telemetria_por_imeis(
+    imeis: Iterable[str],
+    tamanho_lote: Optional[int] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Versão para a frota: busca vários IMEIs com o menor número de chamadas.
+
+    Os IMEIs são agrupados em lotes de até TRACK_LOTE_MAX (uma chamada
+    /track por lote) e cada record passa por _normalizar_track_bruto.
+
+    Retorna (telemetrias, ausentes):
+      - telemetrias: {imei: dicionário normalizado}
+      - ausentes: IMEIs sem registro na resposta ou cujo lote falhou
+
+    Lança BrasilSatError apenas se nenhum lote puder ser consultado.
+    """
+    pedidos = _imeis_unicos(imeis)
+
+    telemetrias: Dict[str, Dict[str, Any]] = {}
+    if not pedidos:
+        return telemetrias, []
+
+    ultimo_erro = None
+    lotes_ok = 0
+
+    for lote in _lotes(pedidos, tamanho_lote or TRACK_LOTE_MAX):
+        try:
+            records = _buscar_tracks_brutos(lote)
+        except BrasilSatError as exc:
+            logger.warning(f"[BRASILSAT] lote de {len(lote)} IMEIs falhou: {exc}")
+            ultimo_erro = exc
+            continue
+
+        lotes_ok += 1
+        telemetrias.update(_normalizar_lote(lote, records))
+
+    if lotes_ok == 0 and ultimo_erro is not None:
+        raise ultimo_erro
+
+    ausentes = [imei for imei in pedidos if imei not in telemetrias]
+    return telemetrias, ausentes
+
+
 # --------------------------------------------------
 # Execução direta para teste manual
 # --------------------------------------------------
@@ -0,0 +1,241 @@
+"""
+Variante assíncrona (asyncio + aiohttp) da integração com a BrasilSat.
+
+Pensada para operações de frota (poller, jobs, views assíncronas): um único
+event loop consulta centenas de IMEIs em paralelo, limitado por um semáforo,
+em vez de ocupar centenas de threads bloqueadas.
+
+Compartilha com brasilsat.py:
+- o cache de access_token (um token por processo, seja qual for o caminho)
+- a montagem das requisições e a validação das respostas
+- a normalização (_normalizar_track_bruto), então os dois caminhos
+  devolvem exatamente os mesmos dicionários
+
+Uso típico:
+
+    from gerenciador_ativos.api.monitoramento.brasilsat_async import (
+        buscar_frota,
+    )
+
+    por_imei, ausentes = buscar_frota(imeis)      # código síncrono
+
+    por_imei, ausentes = await get_telemetria_por_imeis_async(imeis)
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # dependência opcional: só o caminho assíncrono precisa
+    aiohttp = None
+
+from gerenciador_ativos.api.monitoramento import brasilsat
+from gerenciador_ativos.api.monitoramento.brasilsat import (
+    BrasilSatError,
+    _STATUS_TRANSITORIOS,
+    _extrair_record_autorizacao,
+    _extrair_records_track,
+    _imeis_unicos,
+    _lotes,
+    _normalizar_lote,
+    _normalizar_track_bruto,
+    _requisicao_autorizacao,
+    _requisicao_track,
+    _token_cache,
+    _token_recusado,
+)
+
+logger = logging.getLogger(__name__)
+
+# Chamadas simultâneas à BrasilSat por event loop
+CONCORRENCIA_PADRAO = 10
+
+
+def aiohttp_disponivel() -> bool:
+    return aiohttp is not None
+
+
+class ClienteBrasilSatAsync:
+    """
+    Cliente assíncrono com sessão aiohttp própria (use com `async with`).
+
+    A sessão mantém conexões keep-alive limitadas a `concorrencia`, e o
+    semáforo garante o mesmo limite de chamadas em voo.
+    """
+
+    def __init__(self, concorrencia: int = CONCORRENCIA_PADRAO):
+        if aiohttp is None:
+            raise BrasilSatError("aiohttp não instalado: cliente assíncrono indisponível.")
+
+        self.concorrencia = max(1, int(concorrencia))
+        self._semaforo = asyncio.Semaphore(self.concorrencia)
+        self._lock_token = asyncio.Lock()
+        self._sessao = None
+
+    async def __aenter__(self):
+        timeout = aiohttp.ClientTimeout(
+            connect=brasilsat.HTTP_TIMEOUT_CONEXAO_S,
+            sock_read=brasilsat.HTTP_TIMEOUT_LEITURA_S,
+        )
+        conector = aiohttp.TCPConnector(limit=self.concorrencia)
+        self._sessao = aiohttp.ClientSession(timeout=timeout, connector=conector)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._sessao.close()
+
+    # --------------------------------------------------
+    # HTTP com retry/backoff (mesmas regras do cliente síncrono)
+    # --------------------------------------------------
+
+    async def _get_json(self, url: str, params: Dict[str, Any], contexto: str) -> Dict[str, Any]:
+        params = {k: str(v) for k, v in params.items()}
+
+        tentativa = 0
+        while True:
+            try:
+                async with self._semaforo:
+                    async with self._sessao.get(url, params=params) as resp:
+                        if (resp.status not in _STATUS_TRANSITORIOS
+                                or tentativa >= brasilsat.HTTP_TENTATIVAS_EXTRAS):
+                            texto = await resp.text()
+                            try:
+                                return await resp.json(content_type=None)
+                            except ValueError as exc:
+                                raise BrasilSatError(
+                                    f"Resposta inválida da BrasilSat em {contexto}: {texto}"
+                                ) from exc
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                if tentativa >= brasilsat.HTTP_TENTATIVAS_EXTRAS:
+                    raise BrasilSatError(f"Falha de rede na BrasilSat em {contexto}: {exc}") from exc
+
+            teto = min(brasilsat.HTTP_BACKOFF_MAX_S, brasilsat.HTTP_BACKOFF_BASE_S * (2 ** tentativa))
+            await asyncio.sleep(random.uniform(0, teto))
+            tentativa += 1
+
+    # --------------------------------------------------
+    # Token (cache compartilhado com o caminho síncrono)
+    # --------------------------------------------------
+
+    async def _obter_access_token(self) -> str:
+        token = _token_cache.token_fresco()
+        if token:
+            return token
+
+        # single-flight dentro do event loop
+        async with self._lock_token:
+            token = _token_cache.token_fresco()
+            if token:
+                return token
+
+            agora = time.time()
+            url, params = _requisicao_autorizacao()
+            try:
+                data = await self._get_json(url, params, "/authorization")
+                record = _extrair_record_autorizacao(data)
+            except BrasilSatError:
+                _token_cache.falhas += 1
+                raise
+
+            return _token_cache.guardar(record, agora)
+
+    # --------------------------------------------------
+    # Track
+    # --------------------------------------------------
+
+    async def _chamar_track(self, imeis: List[str]) -> Dict[str, Any]:
+        url, params = _requisicao_track(await self._obter_access_token(), imeis)
+        return await self._get_json(url, params, "/track")
+
+    async def buscar_tracks_brutos(self, imeis: List[str]) -> List[Dict[str, Any]]:
+        data = await self._chamar_track(imeis)
+
+        if _token_recusado(data):
+            # token pode ter sido revogado antes do expire_time
+            _token_cache.invalidar()
+            data = await self._chamar_track(imeis)
+
+        return _extrair_records_track(data)
+
+    async def telemetria_por_imei(self, imei: str) -> Dict[str, Any]:
+        if not imei:
+            raise BrasilSatError("IMEI não informado para busca de track.")
+
+        records = await self.buscar_tracks_brutos([imei])
+        if not records:
+            raise BrasilSatError(f"Nenhum registro de track retornado para IMEI {imei}")
+
+        return _normalizar_track_bruto(records[0])
+
+    async def telemetria_por_imeis(
+        self,
+        imeis: Iterable[str],
+        tamanho_lote: Optional[int] = None,
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Mesmo contrato de brasilsat.get_telemetria_por_imeis, com lotes em paralelo."""
+        pedidos = _imeis_unicos(imeis)
+        if not pedidos:
+            return {}, []
+
+        lotes = list(_lotes(pedidos, tamanho_lote or brasilsat.TRACK_LOTE_MAX))
+        resultados = await asyncio.gather(
+            *(self.buscar_tracks_brutos(lote) for lote in lotes),
+            return_exceptions=True,
+        )
+
+        telemetrias: Dict[str, Dict[str, Any]] = {}
+        ultimo_erro = None
+        lotes_ok = 0
+
+        for lote, resultado in zip(lotes, resultados):
+            if isinstance(resultado, BaseException):
+                if not isinstance(resultado, BrasilSatError):
+                    raise resultado
+                logger.warning(f"[BRASILSAT] lote de {len(lote)} IMEIs falhou: {resultado}")
+                ultimo_erro = resultado
+                continue
+
+            lotes_ok += 1
+            telemetrias.update(_normalizar_lote(lote, resultado))
+
+        if lotes_ok == 0 and ultimo_erro is not None:
+            raise ultimo_erro
+
+        ausentes = [imei for imei in pedidos if imei not in telemetrias]
+        return telemetrias, ausentes
+
+
+# --------------------------------------------------
+# Funções públicas
+# --------------------------------------------------
+
+async def get_telemetria_por_imei_async(imei: str) -> Dict[str, Any]:
+    async with ClienteBrasilSatAsync(concorrencia=1) as cliente:
+        return await cliente.telemetria_por_imei(imei)
+
+
+async def get_telemetria_por_imeis_async(
+    imeis: Iterable[str],
+    concorrencia: int = CONCORRENCIA_PADRAO,
+    tamanho_lote: Optional[int] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    async with ClienteBrasilSatAsync(concorrencia=concorrencia) as cliente:
+        return await cliente.telemetria_por_imeis(imeis, tamanho_lote=tamanho_lote)
+
+
+def buscar_frota(
+    imeis: Iterable[str],
+    concorrencia: int = CONCORRENCIA_PADRAO,
+    tamanho_lote: Optional[int] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Ponte para código síncrono (threads de poller/jobs): roda a busca
+    assíncrona da frota em um event loop próprio.
+    """
+    return asyncio.run(
+        get_telemetria_por_imeis_async(imeis, concorrencia=concorrencia, tamanho_lote=tamanho_lote)
+    )
@@ -1,58 +1,29 @@
 """
 Rotas de monitoramento: entrega dados de telemetria para o painel.
 
-Integração 100% alinhada com brasilsat.py
+A telemetria vem do serviço único (telemetria/service.py), no formato
+"monitoramento".
 """
 
-from flask import Blueprint, jsonify
+import math
+
+from flask import Blueprint, current_app, jsonify, request
 from gerenciador_ativos.api.monitoramento.brasilsat import (
-    get_telemetria_por_imei,
+    estatisticas_token,
+    estatisticas_http,
     BrasilSatError,
 )
+from gerenciador_ativos.auth.decorators import login_required, role_required
 from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.telemetria.poller import estatisticas_poller
+from gerenciador_ativos.telemetria.historico import estatisticas_historico
+from gerenciador_ativos.telemetria.estado import estatisticas_estado
+from gerenciador_ativos.telemetria.service import ler_ativo, serializar
+from gerenciador_ativos.telemetria.mapa import posicoes_frota
 
 monitoramento_bp = Blueprint("monitoramento_bp", __name__, url_prefix="/api/monitoramento")
 
 
-# ------------------------------------------------------------
-# FUNÇÃO: transformar telemetria crua em JSON para o painel
-# ------------------------------------------------------------
-
-def montar_resposta_painel(telem):
-    """
-    telem = retorno direto de get_telemetria_por_imei()
-    """
-
-    # Agora todas as chaves estão corretas:
-    # "motor_ligado", "horas_motor", "tensao_bateria",
-    # "latitude", "longitude", "velocidade", "direcao", "servertime"
-
-    return {
-        "imei": telem.get("imei"),
-
-        # MOTOR
-        "motor_ligado": telem.get("motor_ligado") or False,
-
-        # HORAS
-        "horas_motor": round(telem.get("horas_motor") or 0, 2),
-
-        # TENSÃO
-        "tensao_bateria": telem.get("tensao_bateria"),
-
-        # LOCALIZAÇÃO
-        "latitude": telem.get("latitude"),
-        "longitude": telem.get("longitude"),
-        "velocidade": telem.get("velocidade"),
-        "direcao": telem.get("direcao"),
-
-        # TEMPO
-        "servertime": telem.get("servertime"),
-
-        # DEBUG opcional
-        # "raw": telem,
-    }
-
-
 # ------------------------------------------------------------
 # ROTA: pegar dados de um ativo por IMEI
 # ------------------------------------------------------------
@@ -68,12 +39,65 @@ def obter_dados(ativo_id):
         return jsonify({"error": "Ativo não possui IMEI cadastrado."}), 400
 
     try:
-        telem = get_telemetria_por_imei(ativo.imei)
+        leitura = ler_ativo(ativo)
     except BrasilSatError as exc:
         return jsonify({
             "error": "Falha ao obter telemetria.",
             "detail": str(exc)
         }), 500
 
-    resposta = montar_resposta_painel(telem)
-    return jsonify(resposta)
+    return jsonify(serializar(leitura, "monitoramento"))
+
+
+# ------------------------------------------------------------
+# ROTA: posições da frota para o mapa do gerente
+# ?bbox=oeste,sul,leste,norte&zoom=N
+# ------------------------------------------------------------
+
+def _ler_bbox(texto):
+    if not texto:
+        return None
+    oeste, sul, leste, norte = (float(v) for v in texto.split(","))
+    # inf / nan estouram no cálculo das células do índice
+    if not all(math.isfinite(v) for v in (oeste, sul, leste, norte)):
+        raise ValueError("bbox com valor não finito")
+    if sul > norte:
+        raise ValueError("sul maior que norte")
+    return oeste, sul, leste, norte
+
+
+@monitoramento_bp.route("/frota", methods=["GET"])
+@login_required
+@role_required(["admin", "gerente"])
+def posicoes_da_frota():
+    try:
+        bbox = _ler_bbox(request.args.get("bbox"))
+        zoom = int(request.args.get("zoom", 3))
+    except ValueError:
+        return jsonify({"error": "Use bbox=oeste,sul,leste,norte e zoom inteiro."}), 400
+
+    zoom = max(0, min(zoom, 22))
+    geojson = posicoes_frota(
+        bbox,
+        zoom,
+        ttl=float(current_app.config.get("MAPA_FROTA_TTL", 10)),
+        zoom_pontos=int(current_app.config.get("MAPA_ZOOM_PONTOS", 12)),
+    )
+    return jsonify(geojson)
+
+
+# ------------------------------------------------------------
+# ROTA: contadores da integração (token, HTTP, poller, histórico, estado)
+# ------------------------------------------------------------
+
+@monitoramento_bp.route("/estatisticas", methods=["GET"])
+@login_required
+@role_required(["admin", "gerente"])
+def estatisticas():
+    return jsonify({
+        "token": estatisticas_token(),
+        "http": estatisticas_http(),
+        "poller": estatisticas_poller(),
+        "historico": estatisticas_historico(),
+        "estado": estatisticas_estado(),
+    })
@@ -0,0 +1,411 @@
+"""
+Importação de ativos em massa a partir de CSV.
+
+Colunas (cabeçalho obrigatório, separador ";" ou ","):
+
+    cliente;nome;categoria;imei;offset;observacoes
+
+- cliente: id, nome ou CPF/CNPJ de um cliente já cadastrado
+- imei: opcional; 15 dígitos com dígito verificador (Luhn), sem repetir
+  no arquivo nem nos ativos já cadastrados (consulta pelo ix_ativos_imei)
+- offset: horas iniciais do horímetro (aceita vírgula decimal)
+
+O arquivo é lido linha a linha (não vai inteiro para a memória). As linhas
+válidas são inseridas em lotes de IMPORTACAO_LOTE, cada lote num
+savepoint e confirmado antes do próximo; se o INSERT do lote falhar, o
+lote é refeito linha a linha para apontar qual linha causou o erro.
+
+Com verificar_brasilsat, os IMEIs de cada lote são consultados numa
+chamada /track em lote e IMEI sem registro na BrasilSat vira erro.
+
+O resultado traz o relatório de erros por linha (número da linha no
+arquivo, campo e mensagem). Entradas: /ativos/importar e
+
+    flask --app server importar-ativos frota.csv [--lote 200] [--simular]
+          [--verificar-brasilsat] [--relatorio erros.csv]
+"""
+
+import csv
+import io
+import itertools
+import re
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import click
+from flask import current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo, Cliente
+from gerenciador_ativos.api.monitoramento.brasilsat import BrasilSatError, get_telemetria_por_imeis
+from gerenciador_ativos.auth.principal import invalidar_clientes
+from gerenciador_ativos.dashboards.kpis import invalidar_kpis
+
+# nome aceito no cabeçalho -> campo
+COLUNAS = {
+    "cliente": "cliente",
+    "cliente_id": "cliente",
+    "nome": "nome",
+    "categoria": "categoria",
+    "imei": "imei",
+    "offset": "offset",
+    "horas_offset": "offset",
+    "observacoes": "observacoes",
+    "observações": "observacoes",
+    "obs": "observacoes",
+}
+OBRIGATORIAS = ("cliente", "nome")
+
+_SO_DIGITOS = re.compile(r"\D")
+
+
+class ErroLinha(NamedTuple):
+    linha: int
+    campo: str
+    mensagem: str
+    valor: str = ""
+
+
+class ErroImportacao(ValueError):
+    """Arquivo que não dá para importar (cabeçalho, codificação)."""
+
+
+class ResultadoImportacao:
+    def __init__(self, simulado: bool = False):
+        self.simulado = simulado
+        self.lidas = 0
+        self.criados = 0
+        self.lotes = 0
+        self.erros: List[ErroLinha] = []
+
+    @property
+    def rejeitadas(self) -> int:
+        return len({e.linha for e in self.erros})
+
+    def como_dict(self, erros_max: Optional[int] = None) -> Dict:
+        erros = self.erros if erros_max is None else self.erros[:erros_max]
+        return {
+            "simulado": self.simulado,
+            "lidas": self.lidas,
+            "criados": self.criados,
+            "rejeitadas": self.rejeitadas,
+            "lotes": self.lotes,
+            "total_erros": len(self.erros),
+            "erros": [e._asdict() for e in erros],
+        }
+
+    def escrever_erros(self, saida):
+        """Relatório de erros em CSV (linha;campo;mensagem;valor)."""
+        escritor = csv.writer(saida, delimiter=";")
+        escritor.writerow(ErroLinha._fields)
+        escritor.writerows(self.erros)
+
+
+# ============================================================
+# VALIDAÇÃO
+# ============================================================
+
+def imei_valido(imei: str) -> bool:
+    """15 dígitos com o último conferindo pelo algoritmo de Luhn."""
+    if len(imei) != 15 or not imei.isdigit():
+        return False
+    total = 0
+    for i, c in enumerate(reversed(imei)):
+        d = int(c)
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def _float_br(valor: str) -> float:
+    valor = valor.strip().replace(" ", "")
+    if "," in valor:
+        valor = valor.replace(".", "").replace(",", ".")
+    return float(valor)
+
+
+class _Clientes:
+    """Clientes por id, nome e CPF/CNPJ (carregados uma vez por importação)."""
+
+    def __init__(self):
+        self.por_id: Dict[int, int] = {}
+        self.por_nome: Dict[str, Optional[int]] = {}
+        self.por_documento: Dict[str, int] = {}
+
+        linhas = db.session.execute(select(Cliente.id, Cliente.nome, Cliente.cpf_cnpj))
+        for id_, nome, documento in linhas:
+            self.por_id[id_] = id_
+            chave = (nome or "").strip().lower()
+            # nome repetido não identifica o cliente
+            self.por_nome[chave] = None if chave in self.por_nome else id_
+            digitos = _SO_DIGITOS.sub("", documento or "")
+            if digitos:
+                self.por_documento[digitos] = id_
+
+    def resolver(self, valor: str):
+        """(cliente_id, mensagem de erro)."""
+        if valor.isdigit() and int(valor) in self.por_id:
+            return int(valor), None
+        chave = valor.lower()
+        if chave in self.por_nome:
+            if self.por_nome[chave] is None:
+                return None, "nome de cliente repetido; use o id ou o CPF/CNPJ"
+            return self.por_nome[chave], None
+        digitos = _SO_DIGITOS.sub("", valor)
+        if digitos and digitos in self.por_documento:
+            return self.por_documento[digitos], None
+        return None, "cliente não encontrado"
+
+
+def _validar(numero: int, bruto: Dict[str, str], clientes: _Clientes, erros: List[ErroLinha]):
+    """Linha do CSV -> valores do INSERT (None se a linha tem erro)."""
+    antes = len(erros)
+    campo = {k: (bruto.get(k) or "").strip() for k in set(COLUNAS.values())}
+
+    cliente_id = None
+    if not campo["cliente"]:
+        erros.append(ErroLinha(numero, "cliente", "obrigatório"))
+    else:
+        cliente_id, problema = clientes.resolver(campo["cliente"])
+        if problema:
+            erros.append(ErroLinha(numero, "cliente", problema, campo["cliente"]))
+
+    nome = campo["nome"]
+    if not nome:
+        erros.append(ErroLinha(numero, "nome", "obrigatório"))
+    elif len(nome) > 120:
+        erros.append(ErroLinha(numero, "nome", "mais de 120 caracteres", nome[:40]))
+
+    categoria = campo["categoria"] or None
+    if categoria and len(categoria) > 120:
+        erros.append(ErroLinha(numero, "categoria", "mais de 120 caracteres", categoria[:40]))
+
+    imei = _SO_DIGITOS.sub("", campo["imei"]) or None
+    if campo["imei"] and not (imei and imei_valido(imei)):
+        erros.append(ErroLinha(numero, "imei", "IMEI inválido (15 dígitos com verificador)", campo["imei"]))
+
+    offset = 0.0
+    if campo["offset"]:
+        try:
+            offset = _float_br(campo["offset"])
+        except ValueError:
+            erros.append(ErroLinha(numero, "offset", "número inválido", campo["offset"]))
+        else:
+            if offset < 0:
+                erros.append(ErroLinha(numero, "offset", "não pode ser negativo", campo["offset"]))
+
+    if len(erros) > antes:
+        return None
+
+    return {
+        "cliente_id": cliente_id,
+        "nome": nome,
+        "categoria": categoria,
+        "imei": imei,
+        "horas_offset": offset,
+        "observacoes": campo["observacoes"] or None,
+        "ativo": True,
+    }
+
+
+# ============================================================
+# LEITURA
+# ============================================================
+
+def abrir_texto(arquivo_binario) -> io.TextIOWrapper:
+    """Arquivo binário (upload ou disco) como texto UTF-8, com ou sem BOM."""
+    return io.TextIOWrapper(arquivo_binario, encoding="utf-8-sig", newline="")
+
+
+def _linhas(texto) -> Iterable:
+    """(número da linha, dict por campo) de cada linha do CSV."""
+    try:
+        cabecalho = texto.readline()
+    except UnicodeDecodeError:
+        raise ErroImportacao("o arquivo precisa estar em UTF-8") from None
+    if not cabecalho.strip():
+        raise ErroImportacao("arquivo vazio")
+
+    delimitador = ";" if cabecalho.count(";") >= cabecalho.count(",") else ","
+    leitor = csv.reader(itertools.chain([cabecalho], texto), delimiter=delimitador)
+
+    nomes = [COLUNAS.get(n.strip().lower()) for n in next(leitor)]
+    faltando = [c for c in OBRIGATORIAS if c not in nomes]
+    if faltando:
+        raise ErroImportacao(f"colunas obrigatórias ausentes no cabeçalho: {', '.join(faltando)}")
+
+    try:
+        for celulas in leitor:
+            if not any(c.strip() for c in celulas):
+                continue
+            # leitor.line_num: linha física (conta quebras dentro de aspas)
+            yield leitor.line_num, {n: v for n, v in zip(nomes, celulas) if n}
+    except UnicodeDecodeError:
+        raise ErroImportacao(f"codificação inválida depois da linha {leitor.line_num}; use UTF-8") from None
+
+
+# ============================================================
+# GRAVAÇÃO
+# ============================================================
+
+def _imeis_cadastrados(imeis: List[str]) -> set:
+    return set(db.session.execute(select(Ativo.imei).where(Ativo.imei.in_(imeis))).scalars())
+
+
+def _verificar_brasilsat(lote, resultado: ResultadoImportacao):
+    imeis = [valores["imei"] for _, valores in lote if valores["imei"]]
+    if not imeis:
+        return lote
+    try:
+        _, ausentes = get_telemetria_por_imeis(imeis)
+        mensagem = "IMEI sem registro na BrasilSat"
+    except BrasilSatError as exc:
+        ausentes, mensagem = imeis, f"não foi possível consultar a BrasilSat: {exc}"
+
+    ausentes = set(ausentes)
+    aceitos = []
+    for numero, valores in lote:
+        if valores["imei"] in ausentes:
+            resultado.erros.append(ErroLinha(numero, "imei", mensagem, valores["imei"]))
+        else:
+            aceitos.append((numero, valores))
+    return aceitos
+
+
+def _gravar_lote(lote, resultado: ResultadoImportacao):
+    """INSERT do lote num savepoint; se falhar, linha a linha."""
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(Ativo), [valores for _, valores in lote])
+        resultado.criados += len(lote)
+        return
+    except SQLAlchemyError:
+        pass
+
+    for numero, valores in lote:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Ativo), [valores])
+            resultado.criados += 1
+        except SQLAlchemyError as exc:
+            causa = getattr(exc, "orig", None) or exc
+            resultado.erros.append(ErroLinha(numero, "", f"erro do banco: {causa}"))
+
+
+def importar_ativos(texto, tamanho_lote: Optional[int] = None,
+                    verificar_brasilsat: bool = False, simular: bool = False,
+                    ao_lote: Optional[Callable[[ResultadoImportacao], None]] = None) -> ResultadoImportacao:
+    """
+    Importa o CSV de `texto` (arquivo texto). Levanta ErroImportacao se o
+    arquivo não puder ser lido; erros de linha vão para o resultado.
+    `ao_lote` é chamado depois de cada lote (progresso da tarefa).
+    """
+    tamanho_lote = max(1, tamanho_lote or int(current_app.config.get("IMPORTACAO_LOTE", 200)))
+    resultado = ResultadoImportacao(simulado=simular)
+    clientes = _Clientes()
+    vistos = {}             # imei -> linha em que apareceu no arquivo
+    tocados = set()         # clientes com ativo novo
+    lote = []
+
+    def _descarregar():
+        nonlocal lote
+        pendentes, lote = lote, []
+
+        # duplicados contra o banco: uma consulta pelo índice por lote
+        imeis = [valores["imei"] for _, valores in pendentes if valores["imei"]]
+        cadastrados = _imeis_cadastrados(imeis) if imeis else set()
+        aceitos = []
+        for numero, valores in pendentes:
+            if valores["imei"] in cadastrados:
+                resultado.erros.append(ErroLinha(numero, "imei", "IMEI já cadastrado", valores["imei"]))
+            else:
+                aceitos.append((numero, valores))
+
+        if verificar_brasilsat:
+            aceitos = _verificar_brasilsat(aceitos, resultado)
+        if not aceitos:
+            return
+
+        resultado.lotes += 1
+        if simular:
+            resultado.criados += len(aceitos)
+            return
+
+        _gravar_lote(aceitos, resultado)
+        db.session.commit()
+        tocados.update(valores["cliente_id"] for _, valores in aceitos)
+
+    try:
+        for numero, bruto in _linhas(texto):
+            resultado.lidas += 1
+            valores = _validar(numero, bruto, clientes, resultado.erros)
+            if valores is None:
+                continue
+
+            imei = valores["imei"]
+            if imei:
+                if imei in vistos:
+                    resultado.erros.append(
+                        ErroLinha(numero, "imei", f"IMEI repetido no arquivo (linha {vistos[imei]})", imei)
+                    )
+                    continue
+                vistos[imei] = numero
+
+            lote.append((numero, valores))
+            if len(lote) >= tamanho_lote:
+                _descarregar()
+                if ao_lote is not None:
+                    ao_lote(resultado)
+
+        if lote:
+            _descarregar()
+    finally:
+        # lotes já gravados contam mesmo se a importação parar no meio
+        if tocados:
+            invalidar_kpis()
+            invalidar_clientes(*tocados)
+
+    resultado.erros.sort(key=lambda e: e.linha)
+    return resultado
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def registrar_cli(app):
+    @app.cli.command("importar-ativos")
+    @click.argument("arquivo", type=click.File("rb"))
+    @click.option("--lote", type=int, default=None, help="Linhas por INSERT (padrão: IMPORTACAO_LOTE).")
+    @click.option("--verificar-brasilsat", is_flag=True, help="Recusa IMEIs sem registro na BrasilSat.")
+    @click.option("--simular", is_flag=True, help="Só valida, sem gravar.")
+    @click.option("--relatorio", type=click.File("w", encoding="utf-8"), default=None,
+                  help="Grava os erros por linha neste CSV.")
+    def importar(arquivo, lote, verificar_brasilsat, simular, relatorio):
+        """Importa ativos de um CSV (cliente;nome;categoria;imei;offset;observacoes)."""
+        try:
+            resultado = importar_ativos(
+                abrir_texto(arquivo),
+                tamanho_lote=lote,
+                verificar_brasilsat=verificar_brasilsat,
+                simular=simular,
+            )
+        except ErroImportacao as exc:
+            raise click.ClickException(str(exc))
+
+        verbo = "seriam criados" if simular else "criados"
+        click.echo(
+            f"{resultado.lidas} linha(s) lida(s), {resultado.criados} ativo(s) {verbo}, "
+            f"{resultado.rejeitadas} linha(s) com erro."
+        )
+        if relatorio is not None:
+            resultado.escrever_erros(relatorio)
+        else:
+            for erro in resultado.erros[:50]:
+                click.echo(f"  linha {erro.linha} [{erro.campo or '-'}]: {erro.mensagem} {erro.valor}".rstrip())
+            if len(resultado.erros) > 50:
+                click.echo(f"  ... mais {len(resultado.erros) - 50} erro(s); use --relatorio")
@@ -1,8 +1,18 @@
-from flask import Blueprint, render_template, request, redirect, url_for
+import io
+import os
+import uuid
+
+from flask import Blueprint, Response, current_app, jsonify, render_template, request, redirect, url_for
+from sqlalchemy import func, or_
+from sqlalchemy.orm import contains_eager, load_only
 from gerenciador_ativos.extensions import db
 from gerenciador_ativos.models import Ativo, Cliente
+from gerenciador_ativos.paginacao import paginar
 from gerenciador_ativos.ativos.service import criar_ativo, atualizar_ativo, excluir_ativo
+from gerenciador_ativos.ativos.importacao import ErroImportacao, abrir_texto, importar_ativos
 from gerenciador_ativos.auth.decorators import login_required, gerente_required
+from gerenciador_ativos.auth.principal import principal_atual
+from gerenciador_ativos.tarefas.fila import enfileirar
 
 ativos_bp = Blueprint("ativos", __name__, url_prefix="/ativos")
 
@@ -12,8 +22,59 @@ ativos_bp = Blueprint("ativos", __name__, url_prefix="/ativos")
 @login_required
 @gerente_required
 def lista():
-    ativos = Ativo.query.all()
-    return render_template("ativos/lista.html", ativos=ativos)
+    """
+    Lista paginada (keyset) com o cliente no mesmo SELECT.
+
+    ?q=texto          nome, categoria ou IMEI
+    ?cliente_id=N     só os ativos de um cliente
+    ?status=ativo|inativo
+    ?ordem=nome|-nome|categoria|cliente|id
+    """
+    consulta = (
+        Ativo.query
+        .join(Ativo.cliente)
+        .options(
+            # só o que a tabela mostra (sem observacoes / telemetria)
+            load_only(Ativo.id, Ativo.nome, Ativo.categoria, Ativo.ativo, Ativo.cliente_id),
+            contains_eager(Ativo.cliente).load_only(Cliente.id, Cliente.nome),
+        )
+    )
+
+    q = (request.args.get("q") or "").strip()
+    if q:
+        termo = f"%{q.lower()}%"
+        consulta = consulta.filter(
+            or_(
+                func.lower(Ativo.nome).like(termo),
+                func.lower(func.coalesce(Ativo.categoria, "")).like(termo),
+                func.coalesce(Ativo.imei, "").like(f"%{q}%"),
+            )
+        )
+
+    cliente_id = request.args.get("cliente_id", type=int)
+    if cliente_id:
+        consulta = consulta.filter(Ativo.cliente_id == cliente_id)
+
+    status = request.args.get("status")
+    if status in ("ativo", "inativo"):
+        consulta = consulta.filter(Ativo.ativo.is_(status == "ativo"))
+
+    pagina = paginar(
+        consulta,
+        Ativo.id,
+        ordens={
+            "nome": Ativo.nome,
+            "categoria": func.coalesce(Ativo.categoria, ""),
+            "cliente": Cliente.nome,
+            "id": Ativo.id,
+        },
+        ordem_padrao="nome",
+    )
+
+    clientes = (
+        Cliente.query.options(load_only(Cliente.id, Cliente.nome)).order_by(Cliente.nome).all()
+    )
+    return render_template("ativos/lista.html", ativos=pagina, pagina=pagina, clientes=clientes)
 
 
 # PAINEL (AGORA EXISTE!)
@@ -45,6 +106,85 @@ def novo():
     return render_template("ativos/novo.html", clientes=clientes)
 
 
+# IMPORTAR CSV
+@ativos_bp.route("/importar", methods=["GET", "POST"])
+@login_required
+@gerente_required
+def importar():
+    """
+    Upload do CSV de ativos (ativos/importacao.py).
+
+    ?formato=json       resultado em JSON (integrações)
+    relatorio=csv       (campo do form) baixa o relatório de erros em CSV
+    segundo_plano=1     (campo do form) salva o arquivo e enfileira a
+                        importação; responde na hora com a tarefa
+    """
+    if request.method == "GET":
+        return render_template("ativos/importar.html", resultado=None, erro=None)
+
+    como_json = request.args.get("formato") == "json"
+    arquivo = request.files.get("arquivo")
+    if arquivo is None or not arquivo.filename:
+        erro = "Selecione um arquivo CSV."
+        if como_json:
+            return jsonify({"erro": erro}), 400
+        return render_template("ativos/importar.html", resultado=None, erro=erro), 400
+
+    verificar = request.form.get(
+        "verificar_brasilsat",
+        "1" if current_app.config.get("IMPORTACAO_VERIFICAR_BRASILSAT") else "0",
+    ) == "1"
+
+    if request.form.get("segundo_plano") == "1":
+        # o upload é gravado aos pedaços em TAREFAS_DIR; a tarefa lê e apaga
+        pasta = current_app.config["TAREFAS_DIR"]
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, f"importacao_{uuid.uuid4().hex}.csv")
+        arquivo.save(caminho)
+
+        tarefa_id = enfileirar(
+            "importar_ativos",
+            usuario_id=principal_atual().user_id,
+            caminho=caminho,
+            tamanho_lote=request.form.get("lote", type=int),
+            verificar_brasilsat=verificar,
+            simular=request.form.get("simular") == "1",
+        )
+        if como_json:
+            return jsonify({
+                "tarefa_id": tarefa_id,
+                "status_url": url_for("tarefas.status_tarefa", id=tarefa_id),
+            }), 202
+        return redirect(url_for("tarefas.detalhe", id=tarefa_id))
+
+    try:
+        # lido do stream do upload, linha a linha
+        resultado = importar_ativos(
+            abrir_texto(arquivo.stream),
+            tamanho_lote=request.form.get("lote", type=int),
+            verificar_brasilsat=verificar,
+            simular=request.form.get("simular") == "1",
+        )
+    except ErroImportacao as exc:
+        if como_json:
+            return jsonify({"erro": str(exc)}), 400
+        return render_template("ativos/importar.html", resultado=None, erro=str(exc)), 400
+
+    if como_json:
+        return jsonify(resultado.como_dict())
+
+    if request.form.get("relatorio") == "csv":
+        saida = io.StringIO()
+        resultado.escrever_erros(saida)
+        return Response(
+            saida.getvalue(),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=erros_importacao.csv"},
+        )
+
+    return render_template("ativos/importar.html", resultado=resultado.como_dict(erros_max=500), erro=None)
+
+
 # EDITAR
 @ativos_bp.route("/editar/<int:id>", methods=["GET", "POST"])
 @login_required
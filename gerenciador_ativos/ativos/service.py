@@ -1,5 +1,7 @@
 from gerenciador_ativos.extensions import db
 from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.dashboards.kpis import invalidar_kpis
+from gerenciador_ativos.auth.principal import invalidar_clientes
 
 
 def criar_ativo(nome, categoria, imei, cliente_id, observacoes=None):
@@ -14,10 +16,13 @@ def criar_ativo(nome, categoria, imei, cliente_id, observacoes=None):
 
     db.session.add(ativo)
     db.session.commit()
+    invalidar_kpis()
+    invalidar_clientes(cliente_id)
     return ativo
 
 
 def atualizar_ativo(ativo, nome, categoria, imei, cliente_id, observacoes=None):
+    cliente_anterior = ativo.cliente_id
     ativo.nome = nome
     ativo.categoria = categoria
     ativo.imei = imei or None
@@ -25,9 +30,14 @@ def atualizar_ativo(ativo, nome, categoria, imei, cliente_id, observacoes=None):
     ativo.cliente_id = cliente_id
 
     db.session.commit()
+    invalidar_kpis()
+    invalidar_clientes(cliente_anterior, cliente_id)
     return ativo
 
 
 def excluir_ativo(ativo):
+    cliente_id = ativo.cliente_id
     db.session.delete(ativo)
     db.session.commit()
+    invalidar_kpis()
+    invalidar_clientes(cliente_id)
@@ -1,6 +1,8 @@
 from functools import wraps
 from flask import session, redirect, url_for, flash
 
+from gerenciador_ativos.auth.principal import principal_atual
+
 
 def login_required(view_func):
     @wraps(view_func)
@@ -8,6 +10,13 @@ def login_required(view_func):
         if "user_id" not in session:
             flash("Faça login para acessar esta página.", "warning")
             return redirect(url_for("auth.login"))
+
+        # usuário excluído ou desativado depois do login
+        principal = principal_atual()
+        if principal is None or not principal.ativo:
+            session.clear()
+            flash("Faça login para acessar esta página.", "warning")
+            return redirect(url_for("auth.login"))
         return view_func(*args, **kwargs)
 
     return wrapped_view
@@ -19,7 +28,8 @@ def role_required(roles):
     def decorator(view_func):
         @wraps(view_func)
         def wrapped_view(*args, **kwargs):
-            user_tipo = session.get("user_tipo")
+            principal = principal_atual()
+            user_tipo = principal.tipo if principal else session.get("user_tipo")
             if user_tipo not in roles:
                 flash("Você não tem permissão para acessar esta área.", "danger")
                 return redirect(url_for("dashboards.home"))
@@ -0,0 +1,144 @@
+"""
+Usuário logado (principal) em cache: por requisição (flask.g) e por
+processo, com TTL curto (PRINCIPAL_TTL).
+
+O principal guarda o que as verificações de acesso precisam: id, nome,
+tipo, cliente vinculado e o conjunto de ids dos ativos do cliente. Assim
+"este ativo é do cliente logado?" vira uma busca no set, sem consultar
+usuário, ativo e cliente a cada requisição do portal.
+
+É montado no login e descartado por:
+- invalidar_principal(user_id): edição, ativação e exclusão de usuário;
+- invalidar_clientes(*ids): ativo criado, movido ou excluído, cliente
+  editado.
+Em outros processos, a mudança aparece quando o TTL vence.
+"""
+
+import threading
+import time
+from typing import Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from flask import current_app, g, has_app_context, session
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo, Cliente, Usuario
+
+
+class ClienteResumo(NamedTuple):
+    id: int
+    nome: str
+
+
+class Principal(NamedTuple):
+    user_id: int
+    nome: str
+    tipo: str
+    ativo: bool
+    cliente: Optional[ClienteResumo]
+    ativos: FrozenSet[int]
+
+    @property
+    def cliente_id(self) -> Optional[int]:
+        return self.cliente.id if self.cliente else None
+
+    def is_interno(self) -> bool:
+        return self.tipo in ("admin", "gerente")
+
+    def pode_ver_ativo(self, ativo_id: int) -> bool:
+        return self.is_interno() or ativo_id in self.ativos
+
+
+_lock = threading.Lock()
+_cache: Dict[int, Tuple[Principal, float]] = {}
+
+
+def _montar(usuario: Usuario) -> Principal:
+    cliente = None
+    ativos: FrozenSet[int] = frozenset()
+
+    if usuario.cliente_id:
+        linha = db.session.execute(
+            select(Cliente.id, Cliente.nome).where(Cliente.id == usuario.cliente_id)
+        ).first()
+        if linha is not None:
+            cliente = ClienteResumo(linha.id, linha.nome)
+            ativos = frozenset(
+                db.session.execute(select(Ativo.id).where(Ativo.cliente_id == cliente.id)).scalars()
+            )
+
+    return Principal(
+        user_id=usuario.id,
+        nome=usuario.nome,
+        tipo=usuario.tipo,
+        ativo=bool(usuario.ativo),
+        cliente=cliente,
+        ativos=ativos,
+    )
+
+
+def _guardar(principal: Principal) -> Principal:
+    with _lock:
+        _cache[principal.user_id] = (principal, time.time())
+    return principal
+
+
+def registrar_principal(usuario: Usuario) -> Principal:
+    """Login: monta o principal a partir do usuário já carregado."""
+    principal = _guardar(_montar(usuario))
+    g.principal = principal
+    return principal
+
+
+def carregar_principal(user_id: int) -> Optional[Principal]:
+    """Principal do cache do processo ou do banco (None se o usuário sumiu)."""
+    ttl = float(current_app.config.get("PRINCIPAL_TTL", 60))
+
+    guardado = _cache.get(user_id)
+    if guardado is not None and time.time() - guardado[1] < ttl:
+        return guardado[0]
+
+    usuario = (
+        Usuario.query
+        .options(load_only(Usuario.id, Usuario.nome, Usuario.tipo, Usuario.ativo, Usuario.cliente_id))
+        .filter_by(id=user_id)
+        .first()
+    )
+    if usuario is None:
+        invalidar_principal(user_id)
+        return None
+
+    return _guardar(_montar(usuario))
+
+
+def principal_atual() -> Optional[Principal]:
+    """Principal da sessão, carregado no máximo uma vez por requisição."""
+    if "principal" in g:
+        return g.principal
+
+    user_id = session.get("user_id")
+    principal = carregar_principal(user_id) if user_id else None
+    g.principal = principal
+    return principal
+
+
+def invalidar_principal(user_id: int):
+    with _lock:
+        _cache.pop(user_id, None)
+    atual = g.get("principal") if has_app_context() else None
+    if atual is not None and atual.user_id == user_id:
+        g.pop("principal")
+
+
+def invalidar_clientes(*cliente_ids: Optional[int]):
+    """Descarta os principais vinculados aos clientes (ativos ou cadastro mudaram)."""
+    alvo = {c for c in cliente_ids if c}
+    if not alvo:
+        return
+    with _lock:
+        for user_id in [u for u, (p, _) in _cache.items() if p.cliente_id in alvo]:
+            del _cache[user_id]
+    atual = g.get("principal") if has_app_context() else None
+    if atual is not None and atual.cliente_id in alvo:
+        g.pop("principal")
@@ -1,8 +1,10 @@
 from flask import render_template, request, redirect, url_for, flash, session
 from gerenciador_ativos.auth import auth_bp
 from gerenciador_ativos.auth.service import autenticar_usuario
+from gerenciador_ativos.auth.principal import registrar_principal
 from gerenciador_ativos.extensions import db
 from gerenciador_ativos.models import Usuario, Cliente
+from gerenciador_ativos.senhas import SenhasOcupadas
 
 
 # ============================================================
@@ -24,7 +26,12 @@ def login():
         email = request.form.get("email")
         senha = request.form.get("senha")
 
-        usuario = autenticar_usuario(email, senha)
+        try:
+            usuario = autenticar_usuario(email, senha)
+        except SenhasOcupadas:
+            flash("Muitos acessos neste momento. Tente novamente em alguns segundos.", "warning")
+            return render_template("auth/login.html"), 503
+
         if not usuario:
             flash("Usuário ou senha inválidos.", "danger")
             return render_template("auth/login.html")
@@ -34,6 +41,8 @@ def login():
         session["user_nome"] = usuario.nome
         session["user_tipo"] = usuario.tipo
         session["cliente_id"] = usuario.cliente_id
+        # cache do usuário logado (tipo, cliente, ativos do cliente)
+        registrar_principal(usuario)
 
         flash(f"Bem-vindo(a), {usuario.nome}!", "success")
 
@@ -106,7 +115,12 @@ def register():
         ativo=True,
         cliente_id=cliente.id
     )
-    usuario.set_password(senha)
+    try:
+        usuario.set_password(senha)
+    except SenhasOcupadas:
+        db.session.rollback()
+        flash("Muitos acessos neste momento. Tente novamente em alguns segundos.", "warning")
+        return redirect(url_for("auth.login"))
 
     db.session.add(usuario)
     db.session.commit()
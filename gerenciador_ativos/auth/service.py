@@ -1,5 +1,7 @@
 from typing import Optional
+from gerenciador_ativos.extensions import db
 from gerenciador_ativos.models import Usuario
+from gerenciador_ativos.senhas import SenhasOcupadas
 
 
 def autenticar_usuario(email: str, senha: str) -> Optional[Usuario]:
@@ -15,4 +17,14 @@ def autenticar_usuario(email: str, senha: str) -> Optional[Usuario]:
     if not usuario.check_password(senha):
         return None
 
+    # SENHA_HASH mudou: refaz o hash agora que temos a senha em claro;
+    # com o pool cheio fica para o próximo login (a senha já conferiu)
+    if usuario.senha_desatualizada():
+        try:
+            usuario.set_password(senha)
+        except SenhasOcupadas:
+            pass
+        else:
+            db.session.commit()
+
     return usuario
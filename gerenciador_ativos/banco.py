@@ -0,0 +1,173 @@
+"""
+Perfis do engine do banco (DB_PERFIL) e réplica de leitura opcional.
+
+- sqlite: pool do tamanho das threads do waitress e, em cada conexão,
+  PRAGMA journal_mode=WAL, synchronous=NORMAL, busy_timeout, mmap_size e
+  cache_size. Com WAL as leituras não esperam a escrita, e o busy_timeout
+  troca o "database is locked" imediato por uma espera curta.
+- postgres: pool_size / max_overflow / pool_timeout / pool_recycle,
+  pre-ping e statement_timeout por conexão.
+- padrao: opções do SQLAlchemy sem ajuste.
+- auto (padrão): sqlite ou postgres conforme o DATABASE_URL.
+
+Com DATABASE_REPLICA_URL, consultas pesadas só de leitura (trajeto, mapa
+da frota) usam executar_leitura() e vão para a réplica; sem ela, para o
+banco principal.
+"""
+
+from typing import Any, Dict
+
+from sqlalchemy import event
+
+from gerenciador_ativos.extensions import db
+
+BIND_LEITURA = "leitura"
+
+
+def _dialeto(uri: str) -> str:
+    if uri.startswith("sqlite"):
+        return "sqlite"
+    if uri.startswith(("postgresql", "postgres")):
+        return "postgres"
+    return "padrao"
+
+
+def perfil_de(config) -> str:
+    perfil = (config.get("DB_PERFIL") or "auto").lower()
+    if perfil == "auto":
+        return _dialeto(config["SQLALCHEMY_DATABASE_URI"])
+    return perfil
+
+
+def _opcoes_postgres(config) -> Dict[str, Any]:
+    timeout_ms = int(config["DB_STATEMENT_TIMEOUT_MS"])
+    return {
+        "pool_size": int(config["DB_POOL_TAMANHO"]),
+        "max_overflow": int(config["DB_POOL_EXTRA"]),
+        "pool_timeout": float(config["DB_POOL_TIMEOUT"]),
+        "pool_recycle": int(config["DB_POOL_RECICLAR"]),
+        "pool_pre_ping": True,
+        "connect_args": {"options": f"-c statement_timeout={timeout_ms}"},
+    }
+
+
+def _opcoes_sqlite(config) -> Dict[str, Any]:
+    return {
+        "pool_size": int(config["DB_POOL_TAMANHO"]),
+        "max_overflow": int(config["DB_POOL_EXTRA"]),
+        "pool_timeout": float(config["DB_POOL_TIMEOUT"]),
+        # a conexão é usada pelas threads do waitress e pelos workers
+        "connect_args": {
+            "check_same_thread": False,
+            "timeout": int(config["SQLITE_BUSY_TIMEOUT_MS"]) / 1000.0,
+        },
+    }
+
+
+def _pragmas_sqlite(config):
+    return (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_MB']) * 1024 * 1024}",
+        # negativo = tamanho em KiB
+        f"PRAGMA cache_size={-int(config['SQLITE_CACHE_MB']) * 1024}",
+    )
+
+
+def _em_memoria(uri: str) -> bool:
+    return uri in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in uri
+
+
+def opcoes_engine(config, uri: str) -> Dict[str, Any]:
+    perfil = perfil_de(config)
+    dialeto = _dialeto(uri)
+    if perfil == "sqlite" and dialeto == "sqlite" and not _em_memoria(uri):
+        return _opcoes_sqlite(config)
+    if perfil == "postgres" and dialeto == "postgres":
+        return _opcoes_postgres(config)
+    return {}
+
+
+def _ligar_pragmas(engine, config):
+    pragmas = _pragmas_sqlite(config)
+
+    @event.listens_for(engine, "connect")
+    def _ao_conectar(conexao_dbapi, _registro):
+        cursor = conexao_dbapi.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def iniciar_banco(app):
+    """Aplica o perfil ao config, inicia o Flask-SQLAlchemy e mostra o perfil."""
+    config = app.config
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+    perfil = perfil_de(config)
+
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **opcoes_engine(config, uri),
+        **config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+
+    replica = config.get("DATABASE_REPLICA_URL")
+    if replica:
+        binds = dict(config.get("SQLALCHEMY_BINDS") or {})
+        binds[BIND_LEITURA] = {"url": replica, **opcoes_engine(config, replica)}
+        config["SQLALCHEMY_BINDS"] = binds
+
+    db.init_app(app)
+
+    with app.app_context():
+        engines = [(None, db.engine)]
+        if replica:
+            engines.append((BIND_LEITURA, db.engines[BIND_LEITURA]))
+
+        for nome, engine in engines:
+            sqlite_ajustado = (
+                perfil == "sqlite"
+                and engine.dialect.name == "sqlite"
+                and not _em_memoria(str(engine.url))
+            )
+            if sqlite_ajustado:
+                _ligar_pragmas(engine, config)
+
+    print(f">>> Banco: {descrever_perfil(config, perfil)}")
+
+
+def descrever_perfil(config, perfil: str) -> str:
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+    if perfil == "sqlite" and _dialeto(uri) == "sqlite" and not _em_memoria(uri):
+        texto = (
+            f"perfil sqlite (WAL, synchronous=NORMAL, "
+            f"busy_timeout={config['SQLITE_BUSY_TIMEOUT_MS']}ms, "
+            f"mmap={config['SQLITE_MMAP_MB']}MB, cache={config['SQLITE_CACHE_MB']}MB, "
+            f"pool={config['DB_POOL_TAMANHO']}+{config['DB_POOL_EXTRA']})"
+        )
+    elif perfil == "postgres" and _dialeto(uri) == "postgres":
+        texto = (
+            f"perfil postgres (pool={config['DB_POOL_TAMANHO']}+{config['DB_POOL_EXTRA']}, "
+            f"pre-ping, statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}ms, "
+            f"recycle={config['DB_POOL_RECICLAR']}s)"
+        )
+    else:
+        texto = f"perfil padrao ({_dialeto(uri)}, sem ajustes)"
+
+    if config.get("DATABASE_REPLICA_URL"):
+        texto += " + réplica de leitura"
+    return texto
+
+
+def engine_leitura():
+    """Engine da réplica, se configurada; senão o do banco principal."""
+    if BIND_LEITURA in db.engines:
+        return db.engines[BIND_LEITURA]
+    return db.engine
+
+
+def executar_leitura(stmt):
+    """Executa um SELECT na réplica de leitura (ou no principal, sem réplica)."""
+    return db.session.execute(stmt, bind_arguments={"bind": engine_leitura()})
@@ -1,10 +1,13 @@
 from flask import render_template, request, redirect, url_for, flash
+from sqlalchemy import func, or_
+from sqlalchemy.orm import load_only
 from gerenciador_ativos.clientes import clientes_bp
 from gerenciador_ativos.models import Cliente, Ativo
 from gerenciador_ativos.auth.decorators import login_required, role_required
+from gerenciador_ativos.paginacao import paginar
 from gerenciador_ativos.clientes.service import (
     criar_cliente, atualizar_cliente,
-    desativar_cliente, ativar_cliente
+    desativar_cliente, ativar_cliente, excluir_cliente
 )
 
 
@@ -16,8 +19,44 @@ from gerenciador_ativos.clientes.service import (
 @login_required
 @role_required(["admin", "gerente"])
 def lista():
-    clientes = Cliente.query.order_by(Cliente.nome).all()
-    return render_template("clientes/lista.html", clientes=clientes)
+    """
+    Lista paginada (keyset), só com as colunas da tabela.
+
+    ?q=texto          nome, CPF/CNPJ ou e-mail
+    ?tipo=PF|PJ
+    ?status=ativo|inativo
+    ?ordem=nome|-nome|tipo|id
+    """
+    consulta = Cliente.query.options(
+        load_only(Cliente.id, Cliente.tipo, Cliente.nome, Cliente.cpf_cnpj, Cliente.ativo)
+    )
+
+    q = (request.args.get("q") or "").strip()
+    if q:
+        termo = f"%{q.lower()}%"
+        consulta = consulta.filter(
+            or_(
+                func.lower(Cliente.nome).like(termo),
+                func.coalesce(Cliente.cpf_cnpj, "").like(f"%{q}%"),
+                func.lower(func.coalesce(Cliente.email, "")).like(termo),
+            )
+        )
+
+    tipo = request.args.get("tipo")
+    if tipo:
+        consulta = consulta.filter(Cliente.tipo == tipo)
+
+    status = request.args.get("status")
+    if status in ("ativo", "inativo"):
+        consulta = consulta.filter(Cliente.ativo.is_(status == "ativo"))
+
+    pagina = paginar(
+        consulta,
+        Cliente.id,
+        ordens={"nome": Cliente.nome, "tipo": Cliente.tipo, "id": Cliente.id},
+        ordem_padrao="nome",
+    )
+    return render_template("clientes/lista.html", clientes=pagina, pagina=pagina)
 
 
 # ============================================================
@@ -105,15 +144,13 @@ def excluir(id):
     cliente = Cliente.query.get_or_404(id)
 
     # (Opcional) Impedir excluir cliente com ativos vinculados
-    ativos = Ativo.query.filter_by(cliente_id=id).all()
-    if ativos:
+    tem_ativos = Ativo.query.with_entities(Ativo.id).filter_by(cliente_id=id).first()
+    if tem_ativos:
         flash("Este cliente possui ativos cadastrados. Remova ou transfira antes de excluir.", "danger")
         return redirect(url_for("clientes.lista"))
 
     # Exclusão definitiva
-    from gerenciador_ativos.extensions import db
-    db.session.delete(cliente)
-    db.session.commit()
+    excluir_cliente(cliente)
 
     flash("Cliente excluído permanentemente.", "danger")
     return redirect(url_for("clientes.lista"))
@@ -1,5 +1,7 @@
 from gerenciador_ativos.extensions import db
 from gerenciador_ativos.models import Cliente
+from gerenciador_ativos.dashboards.kpis import invalidar_kpis
+from gerenciador_ativos.auth.principal import invalidar_clientes
 
 
 def criar_cliente(tipo, nome, cpf_cnpj, telefone, email, endereco, observacoes):
@@ -15,6 +17,7 @@ def criar_cliente(tipo, nome, cpf_cnpj, telefone, email, endereco, observacoes):
     )
     db.session.add(cliente)
     db.session.commit()
+    invalidar_kpis()
     return cliente
 
 
@@ -27,14 +30,28 @@ def atualizar_cliente(cliente, tipo, nome, cpf_cnpj, telefone, email, endereco,
     cliente.endereco = endereco
     cliente.observacoes = observacoes
     db.session.commit()
+    invalidar_kpis()
+    invalidar_clientes(cliente.id)
     return cliente
 
 
 def desativar_cliente(cliente):
     cliente.ativo = False
     db.session.commit()
+    invalidar_kpis()
+    invalidar_clientes(cliente.id)
 
 
 def ativar_cliente(cliente):
     cliente.ativo = True
     db.session.commit()
+    invalidar_kpis()
+    invalidar_clientes(cliente.id)
+
+
+def excluir_cliente(cliente):
+    cliente_id = cliente.id
+    db.session.delete(cliente)
+    db.session.commit()
+    invalidar_kpis()
+    invalidar_clientes(cliente_id)
@@ -3,6 +3,10 @@ import os
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 INSTANCE_DIR = os.path.join(os.path.dirname(BASE_DIR), "instance")
 
+# threads do waitress (Procfile: --threads=${WAITRESS_THREADS:-16}); os
+# limites de streams, hash de senha e pools abaixo são derivados daqui
+WAITRESS_THREADS = int(os.environ.get("WAITRESS_THREADS", "16"))
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-change-me")
 
@@ -14,3 +18,107 @@ class Config:
         SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(INSTANCE_DIR, 'gerenciador_ativos.db')}"
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    WAITRESS_THREADS = WAITRESS_THREADS
+
+    # Perfil do engine (gerenciador_ativos/banco.py): auto | sqlite | postgres | padrao
+    DB_PERFIL = os.environ.get("DB_PERFIL", "auto")
+    # pool: uma conexão por thread do waitress + poller, estado e histórico
+    DB_POOL_TAMANHO = int(os.environ.get(
+        "DB_POOL_TAMANHO", str(WAITRESS_THREADS + 3)
+    ))
+    DB_POOL_EXTRA = int(os.environ.get("DB_POOL_EXTRA", "5"))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECICLAR = int(os.environ.get("DB_POOL_RECICLAR", "1800"))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "15000"))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_MB = int(os.environ.get("SQLITE_MMAP_MB", "64"))
+    SQLITE_CACHE_MB = int(os.environ.get("SQLITE_CACHE_MB", "16"))
+    # réplica só de leitura para trajeto e mapa da frota (opcional)
+    DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL") or None
+
+    # Migrações (gerenciador_ativos/migracoes.py) na subida do app;
+    # com 0, rodar antes do deploy: flask --app server migrar
+    MIGRAR_NA_SUBIDA = os.environ.get("MIGRAR_NA_SUBIDA", "1") == "1"
+
+    # Telemetria: poller em segundo plano + snapshot em memória
+    TELEMETRIA_POLLER = os.environ.get("TELEMETRIA_POLLER", "1") == "1"
+    TELEMETRIA_INTERVALO = float(os.environ.get("TELEMETRIA_INTERVALO", "30"))
+    # busca os lotes da frota em paralelo (asyncio/aiohttp)
+    TELEMETRIA_POLLER_ASYNC = os.environ.get("TELEMETRIA_POLLER_ASYNC", "0") == "1"
+    TELEMETRIA_POLLER_CONCORRENCIA = int(os.environ.get("TELEMETRIA_POLLER_CONCORRENCIA", "10"))
+    # idade máxima (s) de uma amostra servida pelos endpoints /dados;
+    # acima disso a requisição busca ao vivo na BrasilSat
+    TELEMETRIA_IDADE_MAX = float(os.environ.get("TELEMETRIA_IDADE_MAX", "90"))
+
+    # Stream SSE do painel: cada conexão ocupa uma thread do waitress.
+    # PAINEL_STREAM_RESERVA threads ficam sempre livres para o resto
+    # (páginas, login, polling); os streams usam as demais.
+    # Para N painéis em stream: WAITRESS_THREADS = N + PAINEL_STREAM_RESERVA
+    PAINEL_STREAM_RESERVA = int(os.environ.get("PAINEL_STREAM_RESERVA", "4"))
+    PAINEL_STREAM_MAX = int(os.environ.get(
+        "PAINEL_STREAM_MAX",
+        str(max(1, WAITRESS_THREADS - PAINEL_STREAM_RESERVA)),
+    ))
+    PAINEL_STREAM_DURACAO = float(os.environ.get("PAINEL_STREAM_DURACAO", "300"))
+    PAINEL_STREAM_HEARTBEAT = float(os.environ.get("PAINEL_STREAM_HEARTBEAT", "15"))
+
+    # Histórico de telemetria: buffer gravado em INSERTs de várias linhas
+    TELEMETRIA_HISTORICO = os.environ.get("TELEMETRIA_HISTORICO", "1") == "1"
+    TELEMETRIA_HISTORICO_LOTE = int(os.environ.get("TELEMETRIA_HISTORICO_LOTE", "500"))
+    TELEMETRIA_HISTORICO_FLUSH = float(os.environ.get("TELEMETRIA_HISTORICO_FLUSH", "5"))
+
+    # Estado dos ativos (horímetro, posição): write-behind em UPDATE em lote
+    TELEMETRIA_ESTADO = os.environ.get("TELEMETRIA_ESTADO", "1") == "1"
+    TELEMETRIA_ESTADO_FLUSH = float(os.environ.get("TELEMETRIA_ESTADO_FLUSH", "2"))
+
+    # Mapa da frota: índice de posições refeito a cada MAPA_FROTA_TTL s;
+    # a partir de MAPA_ZOOM_PONTOS o mapa mostra cada ativo (sem cluster)
+    MAPA_FROTA_TTL = float(os.environ.get("MAPA_FROTA_TTL", "10"))
+    MAPA_ZOOM_PONTOS = int(os.environ.get("MAPA_ZOOM_PONTOS", "12"))
+
+    # Hash de senha (senhas.py): método:custo no formato do Werkzeug, e pool
+    # limitado para o cálculo (SENHA_WORKERS em paralelo, SENHA_FILA esperando).
+    # Cada login no pool prende uma thread do waitress: workers + fila cabem
+    # nas threads que os streams não usam, menos uma (reduzido na subida)
+    SENHA_HASH = os.environ.get("SENHA_HASH", "scrypt:32768:8:1")
+    SENHA_WORKERS = int(os.environ.get("SENHA_WORKERS", "2"))
+    SENHA_FILA = int(os.environ.get(
+        "SENHA_FILA",
+        str(max(0, WAITRESS_THREADS - PAINEL_STREAM_MAX - 1 - SENHA_WORKERS)),
+    ))
+
+    # Usuário logado em cache por processo (auth/principal.py)
+    PRINCIPAL_TTL = float(os.environ.get("PRINCIPAL_TTL", "60"))
+
+    # Painel gerencial: KPIs em cache por DASHBOARD_KPI_TTL s; "sem sinal" =
+    # ativo com IMEI sem amostra há mais de DASHBOARD_OFFLINE_S s
+    DASHBOARD_KPI_TTL = float(os.environ.get("DASHBOARD_KPI_TTL", "30"))
+    DASHBOARD_OFFLINE_S = float(os.environ.get("DASHBOARD_OFFLINE_S", "1800"))
+
+    # Importação de ativos por CSV (ativos/importacao.py): linhas por INSERT
+    # e consulta dos IMEIs na BrasilSat antes de gravar
+    IMPORTACAO_LOTE = int(os.environ.get("IMPORTACAO_LOTE", "200"))
+    IMPORTACAO_VERIFICAR_BRASILSAT = os.environ.get("IMPORTACAO_VERIFICAR_BRASILSAT", "0") == "1"
+
+    # Tarefas em segundo plano (tarefas/fila.py): trabalhadores no próprio
+    # processo web, fila no banco. TAREFAS_ORFA_S: tarefa "executando" sem
+    # heartbeat há esse tempo volta para a fila; concluídas ficam
+    # TAREFAS_RETER_DIAS dias. Uploads esperando a tarefa ficam em TAREFAS_DIR.
+    TAREFAS = os.environ.get("TAREFAS", "1") == "1"
+    TAREFAS_WORKERS = int(os.environ.get("TAREFAS_WORKERS", "2"))
+    TAREFAS_INTERVALO = float(os.environ.get("TAREFAS_INTERVALO", "2"))
+    TAREFAS_BACKOFF_S = float(os.environ.get("TAREFAS_BACKOFF_S", "30"))
+    TAREFAS_ORFA_S = float(os.environ.get("TAREFAS_ORFA_S", "120"))
+    TAREFAS_RETER_DIAS = float(os.environ.get("TAREFAS_RETER_DIAS", "7"))
+    TAREFAS_DIR = os.environ.get("TAREFAS_DIR", os.path.join(INSTANCE_DIR, "tarefas"))
+
+    # Exportações do portal (exportacao.py): linhas por busca no cursor,
+    # nível do gzip (0 desliga), fuso das datas e janela padrão
+    EXPORTACAO_LOTE = int(os.environ.get("EXPORTACAO_LOTE", "2000"))
+    EXPORTACAO_GZIP_NIVEL = int(os.environ.get("EXPORTACAO_GZIP_NIVEL", "6"))
+    EXPORTACAO_FUSO = os.environ.get("EXPORTACAO_FUSO", "America/Sao_Paulo")
+    EXPORTACAO_JANELA_PADRAO_DIAS = float(os.environ.get("EXPORTACAO_JANELA_PADRAO_DIAS", "30"))
+
+    # Trajeto (/api/ativos/<id>/trajeto): janela máxima por consulta
+    TRAJETO_JANELA_MAX_DIAS = float(os.environ.get("TRAJETO_JANELA_MAX_DIAS", "31"))
@@ -0,0 +1,94 @@
+"""
+KPIs do painel gerencial numa consulta agregada só, com cache curto.
+
+Uma varredura de ativos (contagens por estado) com subconsultas escalares
+para clientes e preventiva; motores ligados vêm do snapshot em memória,
+que mantém o total a cada amostra. O resultado fica em cache por
+DASHBOARD_KPI_TTL segundos e é descartado na hora por invalidar_kpis(),
+chamado pelos services de ativos e clientes e pelas rotas do plano.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from sqlalchemy import case, func, or_, select
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo, Cliente
+from gerenciador_ativos.preventiva_models import PreventivaItem
+from gerenciador_ativos.telemetria.snapshot import snapshot
+
+_lock = threading.Lock()
+_cache: Optional[Dict[str, Any]] = None
+_calculado_em = 0.0
+_geracao = 0
+
+
+def _soma(condicao):
+    return func.coalesce(func.sum(case((condicao, 1), else_=0)), 0)
+
+
+def _consulta(agora: float, offline_s: float):
+    corte = int(agora - offline_s)
+    em_operacao = Ativo.ativo.is_(True)
+    com_imei = Ativo.imei.isnot(None) & (Ativo.imei != "")
+    sem_sinal = or_(Ativo.ultima_atualizacao.is_(None), Ativo.ultima_atualizacao < corte)
+
+    itens_vencidos = (
+        select(func.count(PreventivaItem.id))
+        .join(Ativo, Ativo.id == PreventivaItem.ativo_id)
+        .where(em_operacao)
+        .where(or_(PreventivaItem.faltam <= 0, PreventivaItem.vence_em <= int(agora)))
+        .scalar_subquery()
+    )
+
+    return select(
+        select(func.count(Cliente.id)).scalar_subquery().label("clientes"),
+        func.count(Ativo.id).label("ativos"),
+        _soma(em_operacao).label("ativos_ativos"),
+        _soma(em_operacao & com_imei & sem_sinal).label("offline"),
+        _soma(em_operacao & com_imei & ~sem_sinal & (Ativo.ultimo_estado_motor == 1)).label("motores_banco"),
+        select(func.count(PreventivaItem.id)).scalar_subquery().label("itens_plano"),
+        itens_vencidos.label("itens_vencidos"),
+    ).select_from(Ativo)
+
+
+def _calcular() -> Dict[str, Any]:
+    agora = time.time()
+    offline_s = float(current_app.config.get("DASHBOARD_OFFLINE_S", 1800))
+    linha = db.session.execute(_consulta(agora, offline_s)).mappings().one()
+
+    kpis = {k: int(v or 0) for k, v in linha.items()}
+    vivo = snapshot.resumo()
+    # sem poller o snapshot fica vazio: vale o último estado gravado
+    kpis["motores_ligados"] = vivo["motores_ligados"] if vivo["imeis"] else kpis["motores_banco"]
+    del kpis["motores_banco"]
+    kpis["calculado_em"] = agora
+    return kpis
+
+
+def obter_kpis() -> Dict[str, Any]:
+    global _cache, _calculado_em
+
+    ttl = float(current_app.config.get("DASHBOARD_KPI_TTL", 30))
+    if _cache is not None and time.time() - _calculado_em < ttl:
+        return _cache
+
+    with _lock:
+        if _cache is not None and time.time() - _calculado_em < ttl:
+            return _cache
+        geracao = _geracao
+        kpis = _calcular()
+        # invalidado durante o cálculo: entrega, mas não guarda
+        if geracao == _geracao:
+            _cache, _calculado_em = kpis, kpis["calculado_em"]
+        return kpis
+
+
+def invalidar_kpis():
+    """Descarta o cache (cadastro de cliente, ativo ou item de plano mudou)."""
+    global _cache, _geracao
+    _geracao += 1
+    _cache = None
@@ -1,8 +1,7 @@
 from flask import render_template
 from gerenciador_ativos.dashboards import dashboards_bp
-from gerenciador_ativos.auth.decorators import login_required
-from gerenciador_ativos.models import Cliente, Ativo
-from gerenciador_ativos.preventiva_models import PreventivaItem
+from gerenciador_ativos.auth.decorators import login_required, gerente_required
+from gerenciador_ativos.dashboards.kpis import obter_kpis
 
 
 @dashboards_bp.route("/dashboard/gerente")
@@ -10,22 +9,23 @@ from gerenciador_ativos.preventiva_models import PreventivaItem
 def dashboard_gerente():
 
     # =======================
-    # CONTAGENS DO SISTEMA
+    # KPIs (uma consulta agregada, em cache — dashboards/kpis.py)
     # =======================
-    total_clientes = Cliente.query.count()
-    total_ativos = Ativo.query.count()
-    total_ativos_ativos = Ativo.query.filter_by(ativo=True).count()
+    kpis = obter_kpis()
 
-    # conta itens de preventiva cadastrados
-    total_preventivas = PreventivaItem.query.count()
-
-    # =======================
-    # Renderiza com dados reais
-    # =======================
     return render_template(
         "dashboards/gerente.html",
-        total_clientes=total_clientes,
-        total_ativos=total_ativos,
-        total_ativos_ativos=total_ativos_ativos,
-        total_preventivas=total_preventivas
+        kpis=kpis,
+        total_clientes=kpis["clientes"],
+        total_ativos=kpis["ativos"],
+        total_ativos_ativos=kpis["ativos_ativos"],
+        total_preventivas=kpis["itens_plano"]
     )
+
+
+@dashboards_bp.route("/dashboard/gerente/mapa")
+@login_required
+@gerente_required
+def mapa_frota():
+    """Mapa com a última posição de toda a frota (dados de /api/monitoramento/frota)."""
+    return render_template("dashboards/mapa_frota.html")
@@ -0,0 +1,335 @@
+"""
+Exportação da frota de um cliente em arquivos (portal: /portal/exportar/...).
+
+- frota.csv     situação atual de cada ativo (horímetro, posição, bateria)
+- amostras.csv  histórico de telemetria da janela pedida
+- horas.csv     resumo diário: horas de motor, ignições e amostras
+- trajeto.gpx / trajeto.kml   trajetos da janela, um por ativo
+
+Nada é montado inteiro na memória: as consultas usam cursor no servidor
+(yield_per = EXPORTACAO_LOTE; no Postgres, stream_results), cada linha
+vira texto num gerador e a resposta é enviada aos pedaços, comprimida em
+gzip na hora quando o cliente aceita (Accept-Encoding). O uso de memória
+é o mesmo para um dia ou para um ano.
+
+CSV com ";" e vírgula decimal, com BOM, para abrir direto no Excel em
+português. Datas no fuso EXPORTACAO_FUSO.
+"""
+
+import csv
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from flask import Response, current_app, request, stream_with_context
+from sqlalchemy import select
+
+from gerenciador_ativos.banco import executar_leitura
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.telemetria.horimetro import delta_acctime
+from gerenciador_ativos.telemetria_models import TelemetriaAmostra
+
+# pedaço mínimo enviado por vez quando não há gzip
+_BLOCO = 64 * 1024
+
+
+def _config(chave, padrao):
+    return current_app.config.get(chave, padrao)
+
+
+def fuso():
+    try:
+        return ZoneInfo(_config("EXPORTACAO_FUSO", "America/Sao_Paulo"))
+    except ZoneInfoNotFoundError:
+        return timezone.utc
+
+
+def _data_hora(epoch, tz) -> str:
+    if epoch is None:
+        return ""
+    return datetime.fromtimestamp(epoch, tz).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _num(valor, casas: int = 2) -> str:
+    if valor is None:
+        return ""
+    return f"{float(valor):.{casas}f}".replace(".", ",")
+
+
+class _Eco:
+    """'Arquivo' do csv.writer que devolve a linha em vez de guardar."""
+
+    def write(self, texto):
+        return texto
+
+
+def _csv(cabecalho: List[str], linhas: Iterable[List]) -> Iterator[str]:
+    escritor = csv.writer(_Eco(), delimiter=";", lineterminator="\r\n")
+    yield "\ufeff" + escritor.writerow(cabecalho)
+    for linha in linhas:
+        yield escritor.writerow(linha)
+
+
+# ============================================================
+# CONSULTAS (cursor no servidor)
+# ============================================================
+
+def ativos_do_cliente(cliente_id: int) -> Dict[int, str]:
+    """{id: nome} dos ativos do cliente, direto do banco (dono atual)."""
+    linhas = executar_leitura(
+        select(Ativo.id, Ativo.nome).where(Ativo.cliente_id == cliente_id).order_by(Ativo.id)
+    )
+    return {id_: nome for id_, nome in linhas}
+
+
+def _amostras(colunas, ativo_ids: List[int], de: int, ate: int, so_com_posicao: bool = False):
+    stmt = (
+        select(TelemetriaAmostra.ativo_id, TelemetriaAmostra.servertime, *colunas)
+        .where(
+            TelemetriaAmostra.ativo_id.in_(ativo_ids),
+            TelemetriaAmostra.servertime >= de,
+            TelemetriaAmostra.servertime <= ate,
+        )
+        # ordem da chave primária: varredura do índice, sem sort
+        .order_by(TelemetriaAmostra.ativo_id, TelemetriaAmostra.servertime)
+        .execution_options(yield_per=int(_config("EXPORTACAO_LOTE", 2000)))
+    )
+    if so_com_posicao:
+        stmt = stmt.where(TelemetriaAmostra.latitude.isnot(None), TelemetriaAmostra.longitude.isnot(None))
+    return executar_leitura(stmt)
+
+
+# ============================================================
+# FORMATOS
+# ============================================================
+
+def csv_frota(cliente_id: int) -> Iterator[str]:
+    tz = fuso()
+    stmt = (
+        select(
+            Ativo.id, Ativo.nome, Ativo.categoria, Ativo.imei, Ativo.ativo,
+            Ativo.ultimo_estado_motor, Ativo.horas_sistema, Ativo.horas_offset,
+            Ativo.horas_paradas, Ativo.total_ignicoes, Ativo.tensao_bateria,
+            Ativo.latitude, Ativo.longitude, Ativo.ultima_atualizacao,
+        )
+        .where(Ativo.cliente_id == cliente_id)
+        .order_by(Ativo.nome, Ativo.id)
+        .execution_options(yield_per=int(_config("EXPORTACAO_LOTE", 2000)))
+    )
+
+    def _linhas():
+        for a in executar_leitura(stmt):
+            horas = float(a.horas_sistema or 0.0)
+            offset = float(a.horas_offset or 0.0)
+            yield [
+                a.id, a.nome, a.categoria or "", a.imei or "",
+                "sim" if a.ativo else "não",
+                "ligado" if a.ultimo_estado_motor else "desligado",
+                _num(horas), _num(offset), _num(horas + offset), _num(a.horas_paradas or 0.0),
+                a.total_ignicoes or 0, _num(a.tensao_bateria),
+                _num(a.latitude, 6), _num(a.longitude, 6), _data_hora(a.ultima_atualizacao, tz),
+            ]
+
+    return _csv(
+        [
+            "ativo_id", "ativo", "categoria", "imei", "em_operacao", "motor",
+            "horas_motor", "offset", "horas_totais", "horas_paradas", "ignicoes",
+            "tensao_bateria", "latitude", "longitude", "ultima_atualizacao",
+        ],
+        _linhas(),
+    )
+
+
+def csv_amostras(ativos: Dict[int, str], de: int, ate: int) -> Iterator[str]:
+    tz = fuso()
+    T = TelemetriaAmostra
+    consulta = _amostras(
+        (T.motor_ligado, T.acctime_s, T.tensao_bateria, T.latitude, T.longitude, T.velocidade, T.direcao),
+        list(ativos), de, ate,
+    )
+
+    def _linhas():
+        for r in consulta:
+            yield [
+                r.ativo_id, ativos.get(r.ativo_id, ""), _data_hora(r.servertime, tz), r.servertime,
+                "ligado" if r.motor_ligado else "desligado",
+                _num(r.acctime_s / 3600.0 if r.acctime_s is not None else None, 3),
+                _num(r.tensao_bateria), _num(r.latitude, 6), _num(r.longitude, 6),
+                _num(r.velocidade, 1), _num(r.direcao, 0),
+            ]
+
+    return _csv(
+        [
+            "ativo_id", "ativo", "data_hora", "servertime", "motor", "contador_horas",
+            "tensao_bateria", "latitude", "longitude", "velocidade", "direcao",
+        ],
+        _linhas(),
+    )
+
+
+def csv_horas(ativos: Dict[int, str], de: int, ate: int) -> Iterator[str]:
+    """
+    Uma linha por ativo e dia: horas de motor (soma dos deltas do acctime,
+    mesma regra do horímetro), ignições (desligado -> ligado) e amostras.
+    As amostras chegam em ordem (ativo, servertime), então cada dia é
+    fechado assim que a chave muda: só um dia fica em memória.
+    """
+    tz = fuso()
+    T = TelemetriaAmostra
+    consulta = _amostras((T.motor_ligado, T.acctime_s), list(ativos), de, ate)
+
+    def _linha(chave, soma):
+        ativo_id, dia = chave
+        return [
+            ativo_id, ativos.get(ativo_id, ""), dia, _num(soma["segundos"] / 3600.0, 3),
+            soma["ignicoes"], soma["amostras"],
+            _data_hora(soma["primeira"], tz)[11:], _data_hora(soma["ultima"], tz)[11:],
+        ]
+
+    def _linhas():
+        chave = soma = None
+        ativo_ant = acctime_ant = servertime_ant = None
+        ligado_ant = False
+
+        for r in consulta:
+            if r.ativo_id != ativo_ant:
+                ativo_ant, acctime_ant, servertime_ant, ligado_ant = r.ativo_id, None, None, False
+
+            dia = datetime.fromtimestamp(r.servertime, tz).strftime("%Y-%m-%d")
+            if (r.ativo_id, dia) != chave:
+                if chave is not None:
+                    yield _linha(chave, soma)
+                chave = (r.ativo_id, dia)
+                soma = {"segundos": 0.0, "ignicoes": 0, "amostras": 0, "primeira": r.servertime}
+
+            if r.acctime_s is not None:
+                decorrido = r.servertime - servertime_ant if servertime_ant is not None else None
+                soma["segundos"] += delta_acctime(acctime_ant, r.acctime_s, decorrido)
+                acctime_ant = r.acctime_s
+            if r.motor_ligado and not ligado_ant and servertime_ant is not None:
+                soma["ignicoes"] += 1
+
+            ligado_ant = bool(r.motor_ligado)
+            servertime_ant = r.servertime
+            soma["amostras"] += 1
+            soma["ultima"] = r.servertime
+
+        if chave is not None:
+            yield _linha(chave, soma)
+
+    return _csv(
+        ["ativo_id", "ativo", "dia", "horas_motor", "ignicoes", "amostras", "primeira", "ultima"],
+        _linhas(),
+    )
+
+
+def _pontos(ativos: Dict[int, str], de: int, ate: int):
+    T = TelemetriaAmostra
+    consulta = _amostras((T.latitude, T.longitude), list(ativos), de, ate, so_com_posicao=True)
+    for r in consulta:
+        # 0,0 = rastreador sem fix de GPS
+        if r.latitude == 0 and r.longitude == 0:
+            continue
+        yield r
+
+
+def gpx_trajeto(ativos: Dict[int, str], de: int, ate: int) -> Iterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gpx version="1.1" creator="Gerenciador de Ativos" xmlns="http://www.topografix.com/GPX/1/1">\n'
+    )
+    atual = None
+    for r in _pontos(ativos, de, ate):
+        if r.ativo_id != atual:
+            if atual is not None:
+                yield "</trkseg></trk>\n"
+            atual = r.ativo_id
+            yield f"<trk><name>{escape(ativos.get(atual, str(atual)))}</name><trkseg>\n"
+        quando = datetime.fromtimestamp(r.servertime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        yield f'<trkpt lat="{r.latitude:.6f}" lon="{r.longitude:.6f}"><time>{quando}</time></trkpt>\n'
+    if atual is not None:
+        yield "</trkseg></trk>\n"
+    yield "</gpx>\n"
+
+
+def kml_trajeto(ativos: Dict[int, str], de: int, ate: int) -> Iterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n'
+        f"<name>Trajetos {_data_hora(de, fuso())[:10]} a {_data_hora(ate, fuso())[:10]}</name>\n"
+    )
+    atual = None
+    for r in _pontos(ativos, de, ate):
+        if r.ativo_id != atual:
+            if atual is not None:
+                yield "</coordinates></LineString></Placemark>\n"
+            atual = r.ativo_id
+            yield (
+                f"<Placemark><name>{escape(ativos.get(atual, str(atual)))}</name>"
+                "<LineString><tessellate>1</tessellate><coordinates>\n"
+            )
+        # KML: longitude,latitude
+        yield f"{r.longitude:.6f},{r.latitude:.6f},0\n"
+    if atual is not None:
+        yield "</coordinates></LineString></Placemark>\n"
+    yield "</Document></kml>\n"
+
+
+# ============================================================
+# RESPOSTA
+# ============================================================
+
+def _agrupar(pedacos: Iterable[str], tamanho: int) -> Iterator[bytes]:
+    """Junta os pedaços pequenos (uma linha cada) em blocos de ~tamanho bytes."""
+    buffer: List[bytes] = []
+    acumulado = 0
+    for pedaco in pedacos:
+        dados = pedaco.encode("utf-8")
+        buffer.append(dados)
+        acumulado += len(dados)
+        if acumulado >= tamanho:
+            yield b"".join(buffer)
+            buffer, acumulado = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _gzip(blocos: Iterable[bytes], nivel: int) -> Iterator[bytes]:
+    # wbits 31 = formato gzip (cabeçalho + CRC)
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    for bloco in blocos:
+        saida = compressor.compress(bloco)
+        if saida:
+            yield saida
+    yield compressor.flush()
+
+
+def _aceita_gzip() -> bool:
+    return "gzip" in (request.headers.get("Accept-Encoding") or "").lower()
+
+
+def resposta_exportacao(pedacos: Iterable[str], nome_arquivo: str, mimetype: str) -> Response:
+    """Response em streaming (gzip se o cliente aceitar) com download do arquivo."""
+    blocos = _agrupar(pedacos, _BLOCO)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{nome_arquivo}"',
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-store",
+    }
+    nivel = int(_config("EXPORTACAO_GZIP_NIVEL", 6))
+    if nivel > 0 and _aceita_gzip():
+        blocos = _gzip(blocos, nivel)
+        headers["Content-Encoding"] = "gzip"
+
+    # o contexto da requisição (sessão do banco) continua vivo enquanto o gerador roda
+    return Response(stream_with_context(blocos), mimetype=mimetype, headers=headers)
+
+
+def janela(de: Optional[int], ate: Optional[int], agora: int):
+    """(de, ate) com o padrão de EXPORTACAO_JANELA_PADRAO_DIAS até agora."""
+    ate = agora if ate is None else ate
+    dias = float(_config("EXPORTACAO_JANELA_PADRAO_DIAS", 30))
+    de = int(ate - dias * 86400) if de is None else de
+    return de, ate
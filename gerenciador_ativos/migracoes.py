@@ -0,0 +1,196 @@
+"""
+Migrações versionadas do banco (SQLite e Postgres).
+
+Cada migração é uma função numerada em MIGRACOES; a tabela schema_versao
+guarda as que já rodaram. Na subida (MIGRAR_NA_SUBIDA=1) ou pelo comando
+
+    flask --app server migrar            aplica as pendentes
+    flask --app server migrar --status   só lista
+
+as pendentes rodam em ordem, cada uma na sua transação. As operações são
+idempotentes (checam coluna / índice antes), porque bancos antigos podem
+ter recebido parte delas pelo /fix-db ou pelo create_all.
+
+Banco novo: db.create_all() já cria tudo no formato dos modelos, então
+as migrações são só marcadas como aplicadas.
+
+Para mudar o schema: altere o modelo e acrescente uma migração no fim da
+lista que leve os bancos existentes até ele.
+"""
+
+from datetime import datetime
+
+import click
+from sqlalchemy import inspect, text
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo, Usuario
+from gerenciador_ativos.preventiva_models import PreventivaItem
+
+# chave do pg_advisory_xact_lock: vários workers subindo juntos
+_LOCK_POSTGRES = 72_018
+
+
+class SchemaVersao(db.Model):
+    __tablename__ = "schema_versao"
+
+    versao = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    descricao = db.Column(db.String(200), nullable=False)
+    aplicada_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# ============================================================
+# OPERAÇÕES
+# ============================================================
+
+def _default_sql(coluna, dialect):
+    default = coluna.default
+    if default is None or not default.is_scalar:
+        return ""
+
+    valor = default.arg
+    if isinstance(valor, bool):
+        if dialect.name == "postgresql":
+            return " DEFAULT TRUE" if valor else " DEFAULT FALSE"
+        return f" DEFAULT {int(valor)}"
+    if isinstance(valor, (int, float)):
+        return f" DEFAULT {valor}"
+    if isinstance(valor, str):
+        return " DEFAULT '" + valor.replace("'", "''") + "'"
+    return ""
+
+
+def adicionar_coluna(conn, coluna):
+    """ALTER TABLE ... ADD COLUMN a partir da coluna do modelo, se faltar."""
+    tabela = coluna.table.name
+    existentes = {c["name"] for c in inspect(conn).get_columns(tabela)}
+    if coluna.name in existentes:
+        return False
+
+    tipo = coluna.type.compile(dialect=conn.dialect)
+    conn.execute(text(
+        f"ALTER TABLE {tabela} ADD COLUMN {coluna.name} {tipo}{_default_sql(coluna, conn.dialect)}"
+    ))
+    print(f">>> Coluna criada: {tabela}.{coluna.name}")
+    return True
+
+
+def criar_indice(conn, tabela, nome):
+    """Cria o índice `nome` declarado no modelo, se faltar."""
+    indice = next(i for i in tabela.indexes if i.name == nome)
+    existentes = {i["name"] for i in inspect(conn).get_indexes(tabela.name)}
+    if nome in existentes:
+        return False
+
+    indice.create(conn)
+    print(f">>> Índice criado: {nome}")
+    return True
+
+
+# ============================================================
+# MIGRAÇÕES (não reordenar; só acrescentar no fim)
+# ============================================================
+
+def _m001_horas_offset(conn):
+    adicionar_coluna(conn, Ativo.__table__.c.horas_offset)
+
+
+def _m002_horimetro_acctime(conn):
+    adicionar_coluna(conn, Ativo.__table__.c.ultimo_acctime_s)
+    adicionar_coluna(conn, Ativo.__table__.c.motor_desligado_em)
+
+
+def _m003_fila_preventiva(conn):
+    tabela = PreventivaItem.__table__
+    for nome in ("ultima_execucao", "proxima_execucao", "faltam", "vence_em"):
+        adicionar_coluna(conn, tabela.c[nome])
+    criar_indice(conn, tabela, "ix_preventiva_itens_faltam")
+    criar_indice(conn, tabela, "ix_preventiva_itens_vence_em")
+
+
+def _m004_indices_ativos_usuarios(conn):
+    for nome in ("ix_ativos_imei", "ix_ativos_cliente_nome", "ix_ativos_ativos"):
+        criar_indice(conn, Ativo.__table__, nome)
+    criar_indice(conn, Usuario.__table__, "ix_usuarios_cliente_id")
+
+
+MIGRACOES = [
+    (1, "ativos.horas_offset (antigo /fix-db)", _m001_horas_offset),
+    (2, "ativos.ultimo_acctime_s e motor_desligado_em", _m002_horimetro_acctime),
+    (3, "fila de preventiva: colunas e índices de vencimento", _m003_fila_preventiva),
+    (4, "índices de IMEI, cliente e ativos em operação", _m004_indices_ativos_usuarios),
+]
+
+
+# ============================================================
+# EXECUÇÃO
+# ============================================================
+
+def versoes_aplicadas(conn):
+    return {v for (v,) in conn.execute(text("SELECT versao FROM schema_versao"))}
+
+
+def pendentes(engine):
+    """Versões ainda não aplicadas neste banco."""
+    SchemaVersao.__table__.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        aplicadas = versoes_aplicadas(conn)
+    return [versao for versao, _, _ in MIGRACOES if versao not in aplicadas]
+
+
+def _registrar(conn, versao, descricao):
+    conn.execute(
+        SchemaVersao.__table__.insert(),
+        {"versao": versao, "descricao": descricao, "aplicada_em": datetime.utcnow()},
+    )
+
+
+def _travar(conn):
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:chave)"), {"chave": _LOCK_POSTGRES})
+
+
+def marcar_todas(engine):
+    """Banco recém-criado pelo create_all: já está na última versão."""
+    SchemaVersao.__table__.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        _travar(conn)
+        aplicadas = versoes_aplicadas(conn)
+        for versao, descricao, _ in MIGRACOES:
+            if versao not in aplicadas:
+                _registrar(conn, versao, descricao)
+
+
+def aplicar_migracoes(engine):
+    """Roda as migrações pendentes em ordem. Retorna as versões aplicadas."""
+    SchemaVersao.__table__.create(engine, checkfirst=True)
+    aplicadas_agora = []
+
+    for versao, descricao, funcao in MIGRACOES:
+        with engine.begin() as conn:
+            _travar(conn)
+            # outro worker pode ter aplicado enquanto esperávamos o lock
+            if versao in versoes_aplicadas(conn):
+                continue
+            print(f">>> Migração {versao:03d}: {descricao}")
+            funcao(conn)
+            _registrar(conn, versao, descricao)
+        aplicadas_agora.append(versao)
+
+    return aplicadas_agora
+
+
+def registrar_cli(app):
+    @app.cli.command("migrar")
+    @click.option("--status", is_flag=True, help="Só lista as migrações, sem aplicar.")
+    def migrar(status):
+        """Aplica as migrações pendentes do banco."""
+        if status:
+            faltando = pendentes(db.engine)
+            for versao, descricao, _ in MIGRACOES:
+                marca = " " if versao in faltando else "x"
+                click.echo(f"[{marca}] {versao:03d} {descricao}")
+            return
+
+        aplicadas = aplicar_migracoes(db.engine)
+        click.echo(f"{len(aplicadas)} migração(ões) aplicada(s).")
@@ -1,5 +1,5 @@
 from gerenciador_ativos.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from gerenciador_ativos.senhas import gerar_hash, precisa_rehash, verificar_senha
 from datetime import datetime
 
 
@@ -24,11 +24,15 @@ class Usuario(db.Model):
     # --------------------------
     # Métodos de senha corretos
     # --------------------------
+    # (método e custo em SENHA_HASH; cálculo no pool de senhas.py)
     def set_password(self, senha):
-        self.senha_hash = generate_password_hash(senha)
+        self.senha_hash = gerar_hash(senha)
 
     def check_password(self, senha):
-        return check_password_hash(self.senha_hash, senha)
+        return verificar_senha(self.senha_hash, senha)
+
+    def senha_desatualizada(self):
+        return precisa_rehash(self.senha_hash)
 
     # --------------------------
     # Auxiliar
@@ -86,7 +90,9 @@ class Ativo(db.Model):
     horas_paradas = db.Column(db.Float, default=0.0)
     ultimo_estado_motor = db.Column(db.Integer, default=0)  # 0 desligado / 1 ligado
     total_ignicoes = db.Column(db.Integer, default=0)
-    ultima_atualizacao = db.Column(db.Integer, nullable=True)
+    ultima_atualizacao = db.Column(db.Integer, nullable=True)   # servertime da última amostra
+    ultimo_acctime_s = db.Column(db.Float, nullable=True)       # contador acctime da última amostra
+    motor_desligado_em = db.Column(db.Integer, nullable=True)   # servertime do último desligamento
 
 
     # localização
@@ -102,3 +108,22 @@ class Ativo(db.Model):
     def __repr__(self):
         return f"<Ativo {self.nome}>"
 
+
+
+# --------------------------------------------------------
+# ÍNDICES DAS CONSULTAS FREQUENTES
+# (parciais no SQLite e no Postgres; em bancos antigos são
+#  criados pela migração 4 — gerenciador_ativos/migracoes.py)
+# --------------------------------------------------------
+_COM_IMEI = Ativo.imei.isnot(None)
+_ATIVOS = Ativo.ativo.is_(True)
+_COM_CLIENTE = Usuario.cliente_id.isnot(None)
+
+# busca por IMEI (poller, importação)
+db.Index("ix_ativos_imei", Ativo.imei, sqlite_where=_COM_IMEI, postgresql_where=_COM_IMEI)
+# ativos de um cliente, em ordem de nome (portal, lista filtrada)
+db.Index("ix_ativos_cliente_nome", Ativo.cliente_id, Ativo.nome)
+# só os ativos em operação (mapa da frota, preventiva, poller)
+db.Index("ix_ativos_ativos", Ativo.cliente_id, sqlite_where=_ATIVOS, postgresql_where=_ATIVOS)
+# usuários do portal de um cliente
+db.Index("ix_usuarios_cliente_id", Usuario.cliente_id, sqlite_where=_COM_CLIENTE, postgresql_where=_COM_CLIENTE)
@@ -0,0 +1,118 @@
+"""
+Paginação por chave (keyset) das listas do painel administrativo.
+
+Em vez de OFFSET, cada página continua a partir da última linha vista:
+WHERE (coluna, id) > (valor, id) ORDER BY coluna, id LIMIT n. O custo de
+qualquer página é o de uma faixa de índice, não cresce com a posição.
+
+- ?ordem=nome / ?ordem=-nome   coluna (da lista permitida pela rota)
+- ?depois=<cursor>             página seguinte
+- ?antes=<cursor>              página anterior
+- ?por_pagina=50               limitado a POR_PAGINA_MAX
+
+O cursor é (valor da coluna, id) em JSON base64, opaco para o template.
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional
+
+from flask import request
+from sqlalchemy import tuple_
+
+POR_PAGINA = 50
+POR_PAGINA_MAX = 200
+
+
+def _codificar(valor, id_) -> str:
+    bruto = json.dumps([valor, id_], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def _decodificar(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valor, id_ = json.loads(bruto)
+        return valor, int(id_)
+    except (ValueError, TypeError):
+        # cursor inválido (URL editada à mão): volta para a primeira página
+        return None
+
+
+class Pagina:
+    def __init__(self, itens: List[Any], ordem: str, por_pagina: int,
+                 anterior: Optional[str], proxima: Optional[str]):
+        self.itens = itens
+        self.ordem = ordem
+        self.por_pagina = por_pagina
+        self.anterior = anterior
+        self.proxima = proxima
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+    def args(self, **extra) -> Dict[str, Any]:
+        """Parâmetros atuais da URL (filtros e ordem) sem os cursores."""
+        atuais = {k: v for k, v in request.args.items() if k not in ("depois", "antes") and v != ""}
+        atuais.update({k: v for k, v in extra.items() if v is not None})
+        return atuais
+
+
+def paginar(consulta, coluna_id, ordens: Dict[str, Any], ordem_padrao: str) -> Pagina:
+    """
+    Aplica ordem e cursor da requisição à `consulta` (Query do modelo).
+
+    `ordens` mapeia o nome aceito em ?ordem= para a expressão SQL; colunas
+    que aceitam NULL devem vir com coalesce para a comparação por tupla
+    funcionar.
+    """
+    ordem = request.args.get("ordem") or ordem_padrao
+    nome = ordem.lstrip("-")
+    if nome not in ordens:
+        ordem, nome = ordem_padrao, ordem_padrao.lstrip("-")
+    decrescente = ordem.startswith("-")
+
+    por_pagina = request.args.get("por_pagina", POR_PAGINA, type=int) or POR_PAGINA
+    por_pagina = max(1, min(por_pagina, POR_PAGINA_MAX))
+
+    expr = ordens[nome]
+    depois = _decodificar(request.args.get("depois"))
+    antes = None if depois else _decodificar(request.args.get("antes"))
+
+    # página anterior = mesma consulta no sentido contrário, invertida depois
+    sentido_desc = decrescente != (antes is not None)
+    cursor = depois or antes
+
+    consulta = consulta.add_columns(expr.label("_chave"))
+    if cursor is not None:
+        chave = tuple_(expr, coluna_id)
+        valor = tuple_(*cursor)
+        consulta = consulta.filter(chave < valor if sentido_desc else chave > valor)
+
+    if sentido_desc:
+        consulta = consulta.order_by(expr.desc(), coluna_id.desc())
+    else:
+        consulta = consulta.order_by(expr.asc(), coluna_id.asc())
+
+    linhas = consulta.limit(por_pagina + 1).all()
+    tem_mais = len(linhas) > por_pagina
+    linhas = linhas[:por_pagina]
+    if antes is not None:
+        linhas.reverse()
+
+    itens = [obj for obj, _ in linhas]
+    primeira = _codificar(linhas[0][1], linhas[0][0].id) if linhas else None
+    ultima = _codificar(linhas[-1][1], linhas[-1][0].id) if linhas else None
+
+    if antes is not None:
+        anterior, proxima = (primeira if tem_mais else None), ultima
+    else:
+        anterior = primeira if depois is not None else None
+        proxima = ultima if tem_mais else None
+
+    return Pagina(itens, ordem, por_pagina, anterior, proxima)
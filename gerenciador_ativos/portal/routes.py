@@ -1,32 +1,30 @@
-from flask import Blueprint, render_template, abort, session
+import time
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, render_template, abort, request
+from gerenciador_ativos import exportacao
 from gerenciador_ativos.auth.decorators import login_required
-from gerenciador_ativos.models import Ativo, Cliente, Usuario
+from gerenciador_ativos.auth.principal import principal_atual
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.telemetria.historico import ler_instante
 
 portal_bp = Blueprint("portal", __name__, url_prefix="/portal")
 
 
 def _get_usuario_cliente():
     """
-    Carrega o usuário logado a partir da sessão
-    e garante que ele é do tipo 'cliente' e tem cliente_id vinculado.
+    Usuário logado (principal em cache, auth/principal.py); garante que
+    ele é do tipo 'cliente' e tem cliente vinculado.
     """
-    user_id = session.get("user_id")
-    user_tipo = session.get("user_tipo")
-
-    if not user_id:
-        abort(401)
+    principal = principal_atual()
 
-    if user_tipo != "cliente":
-        abort(403)
-
-    usuario = Usuario.query.get(user_id)
-    if not usuario:
+    if principal is None:
         abort(401)
 
-    if not usuario.cliente_id:
+    if principal.tipo != "cliente" or principal.cliente is None:
         abort(403)
 
-    return usuario
+    return principal
 
 
 @portal_bp.route("/dashboard")
@@ -38,8 +36,7 @@ def dashboard_cliente():
     - Lista apenas os ativos desse cliente
     """
     usuario = _get_usuario_cliente()
-
-    cliente = Cliente.query.get_or_404(usuario.cliente_id)
+    cliente = usuario.cliente
 
     ativos = (
         Ativo.query
@@ -69,16 +66,129 @@ def painel_ativo_cliente(ativo_id: int):
     """
     usuario = _get_usuario_cliente()
 
-    ativo = Ativo.query.get_or_404(ativo_id)
+    # Garante que o ativo é do cliente logado (set em memória, sem consulta)
+    if not usuario.pode_ver_ativo(ativo_id):
+        abort(403)
 
-    # Garante que o ativo é do cliente logado
+    ativo = Ativo.query.get_or_404(ativo_id)
+    # ativo transferido em outro processo, antes do TTL do cache vencer
     if ativo.cliente_id != usuario.cliente_id:
         abort(403)
 
-    cliente = Cliente.query.get_or_404(usuario.cliente_id)
-
     return render_template(
         "portal/ativo_painel.html",
-        cliente=cliente,
+        cliente=usuario.cliente,
         ativo=ativo,
     )
+
+
+# ============================================================
+# EXPORTAÇÕES (CSV / GPX / KML em streaming, exportacao.py)
+# ============================================================
+
+def _escopo_exportacao():
+    """
+    (cliente_id, {ativo_id: nome}) que o usuário pode exportar.
+
+    Cliente: só os próprios ativos; equipe interna escolhe ?cliente_id=.
+    ?ativo_id= restringe a um ativo, que precisa ser do cliente.
+    """
+    principal = principal_atual()
+    if principal is None:
+        abort(401)
+
+    if principal.is_interno():
+        cliente_id = request.args.get("cliente_id", type=int)
+        if not cliente_id:
+            abort(400)
+    elif principal.tipo == "cliente" and principal.cliente is not None:
+        cliente_id = principal.cliente_id
+    else:
+        abort(403)
+
+    # dono atual direto do banco (o set do principal pode estar no TTL)
+    ativos = exportacao.ativos_do_cliente(cliente_id)
+
+    ativo_id = request.args.get("ativo_id", type=int)
+    if ativo_id is not None:
+        if not principal.pode_ver_ativo(ativo_id) or ativo_id not in ativos:
+            abort(403)
+        ativos = {ativo_id: ativos[ativo_id]}
+
+    return cliente_id, ativos
+
+
+def _janela():
+    # datas sem fuso (campos de data do formulário) valem no fuso da
+    # exportação, o mesmo das linhas e dos dias do horas.csv
+    tz = exportacao.fuso()
+    texto_ate = request.args.get("ate") or ""
+    try:
+        de = ler_instante(request.args.get("de"), None, tz)
+        if len(texto_ate) == 10 and "-" in texto_ate:
+            # "ate=2026-10-01" inclui o dia inteiro: até a meia-noite seguinte
+            seguinte = date.fromisoformat(texto_ate) + timedelta(days=1)
+            ate = ler_instante(seguinte.isoformat(), None, tz) - 1
+        else:
+            ate = ler_instante(texto_ate, None, tz)
+    except ValueError:
+        abort(400)
+    de, ate = exportacao.janela(de, ate, int(time.time()))
+    if de > ate:
+        abort(400)
+    return de, ate
+
+
+def _nome_arquivo(base, extensao):
+    return f"{base}_{datetime.now().strftime('%Y%m%d_%H%M')}.{extensao}"
+
+
+@portal_bp.route("/exportar/frota.csv")
+@login_required
+def exportar_frota():
+    """Situação atual dos ativos do cliente."""
+    cliente_id, _ = _escopo_exportacao()
+    return exportacao.resposta_exportacao(
+        exportacao.csv_frota(cliente_id), _nome_arquivo("frota", "csv"), "text/csv"
+    )
+
+
+@portal_bp.route("/exportar/amostras.csv")
+@login_required
+def exportar_amostras():
+    """Histórico de telemetria (?de=&ate=, epoch ou ISO; padrão: últimos 30 dias)."""
+    _, ativos = _escopo_exportacao()
+    de, ate = _janela()
+    return exportacao.resposta_exportacao(
+        exportacao.csv_amostras(ativos, de, ate), _nome_arquivo("amostras", "csv"), "text/csv"
+    )
+
+
+@portal_bp.route("/exportar/horas.csv")
+@login_required
+def exportar_horas():
+    """Resumo diário de horas de motor por ativo."""
+    _, ativos = _escopo_exportacao()
+    de, ate = _janela()
+    return exportacao.resposta_exportacao(
+        exportacao.csv_horas(ativos, de, ate), _nome_arquivo("horas_motor", "csv"), "text/csv"
+    )
+
+
+@portal_bp.route("/exportar/trajeto.<formato>")
+@login_required
+def exportar_trajeto(formato):
+    """Trajetos da janela em GPX ou KML, um por ativo."""
+    formatos = {
+        "gpx": (exportacao.gpx_trajeto, "application/gpx+xml"),
+        "kml": (exportacao.kml_trajeto, "application/vnd.google-earth.kml+xml"),
+    }
+    if formato not in formatos:
+        abort(404)
+
+    _, ativos = _escopo_exportacao()
+    de, ate = _janela()
+    gerar, mimetype = formatos[formato]
+    return exportacao.resposta_exportacao(
+        gerar(ativos, de, ate), _nome_arquivo("trajeto", formato), mimetype
+    )
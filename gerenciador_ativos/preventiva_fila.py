@@ -0,0 +1,198 @@
+"""
+Fila de vencimentos de preventiva, materializada em preventiva_itens.
+
+Cada item guarda onde vence (proxima_execucao, na unidade da base) e um
+campo indexado para consultar "o que vence nos próximos N":
+
+- base horas: faltam = proxima_execucao - horas do ativo, atualizado em
+  lote sempre que o horímetro anda (flush do estado, telemetria/estado.py)
+  ou o offset muda;
+- base dias: vence_em = cadastro do ativo + proxima_execucao dias (epoch),
+  fixo até a próxima execução.
+
+Marcar uma tarefa como feita (registrar_execucao) grava o log em
+preventiva_execucoes e move proxima_execucao para medição + intervalo.
+Sem execução registrada, a primeira proxima_execucao segue a regra antiga:
+primeira_execucao e depois o próximo múltiplo do intervalo.
+
+Estado do item: vencida (faltam <= 0), aviso (faltam <= avisar_antes) ou ok.
+"""
+
+import math
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, or_, select, text
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.preventiva_models import PreventivaExecucao, PreventivaItem
+from gerenciador_ativos.preventiva_motor import dias_totais, horas_totais
+
+
+def _por_dias(item) -> bool:
+    return (item.base or "horas").lower() == "dias"
+
+
+def medicao_atual(item, ativo, agora: Optional[float] = None) -> float:
+    """Horas (base horas) ou dias desde o cadastro (base dias) do ativo agora."""
+    if _por_dias(item):
+        return dias_totais(ativo.criado_em, agora)
+    return horas_totais(ativo.horas_sistema, ativo.horas_offset)
+
+
+def proxima_sem_registro(medicao: float, intervalo: float, primeira: Optional[float]) -> float:
+    """Próximo vencimento sem execução registrada (mesma regra do cálculo antigo)."""
+    primeira = float(primeira or 0.0)
+    if medicao < primeira:
+        return primeira
+    ciclos = math.floor((medicao - primeira) / intervalo) + 1
+    return primeira + ciclos * intervalo
+
+
+def estado_item(faltam: Optional[float], avisar_antes: Optional[float]) -> str:
+    if faltam is None:
+        return "ok"
+    if faltam <= 0:
+        return "vencida"
+    if faltam <= float(avisar_antes or 0.0):
+        return "aviso"
+    return "ok"
+
+
+def atualizar_item(item, ativo, agora: Optional[float] = None):
+    """Recalcula faltam / vence_em a partir de proxima_execucao (sem commit)."""
+    if item.proxima_execucao is None:
+        item.proxima_execucao = proxima_sem_registro(
+            medicao_atual(item, ativo, agora), float(item.intervalo), item.primeira_execucao
+        )
+
+    if _por_dias(item):
+        item.faltam = None
+        cadastro = ativo.criado_em.timestamp() if ativo.criado_em else (agora or time.time())
+        item.vence_em = int(cadastro + item.proxima_execucao * 86400)
+    else:
+        item.vence_em = None
+        item.faltam = item.proxima_execucao - medicao_atual(item, ativo)
+
+
+def registrar_execucao(item, ativo, medicao=None, observacao=None, usuario_id=None) -> PreventivaExecucao:
+    """Grava a execução e move o vencimento do item (o commit fica com quem chamou)."""
+    if medicao is None:
+        medicao = medicao_atual(item, ativo)
+
+    execucao = PreventivaExecucao(
+        item_id=item.id,
+        ativo_id=ativo.id,
+        medicao=float(medicao),
+        usuario_id=usuario_id,
+        observacao=observacao,
+    )
+    db.session.add(execucao)
+
+    item.ultima_execucao = float(medicao)
+    item.proxima_execucao = float(medicao) + float(item.intervalo)
+    atualizar_item(item, ativo)
+    return execucao
+
+
+def recalcular_ativo(ativo):
+    """Atualiza faltam/vence_em de todos os itens do ativo (ex.: offset mudou)."""
+    for item in PreventivaItem.query.filter_by(ativo_id=ativo.id).all():
+        atualizar_item(item, ativo)
+
+
+# ------------------------------------------------------------
+# Atualização em lote quando o horímetro anda
+# ------------------------------------------------------------
+
+# executemany com b_id: chamado no mesmo commit do UPDATE de ativos
+SQL_ATUALIZAR_FALTAM = text(
+    "UPDATE preventiva_itens SET faltam = proxima_execucao - ("
+    " SELECT COALESCE(a.horas_sistema, 0) + COALESCE(a.horas_offset, 0)"
+    " FROM ativos a WHERE a.id = preventiva_itens.ativo_id"
+    ") WHERE ativo_id = :b_id AND LOWER(base) = 'horas' AND proxima_execucao IS NOT NULL"
+)
+
+
+def atualizar_faltam(conn, ativo_ids: Iterable[int]):
+    """Recalcula faltam dos itens por horas dos ativos cujo horímetro andou."""
+    parametros = [{"b_id": ativo_id} for ativo_id in ativo_ids]
+    if parametros:
+        conn.execute(SQL_ATUALIZAR_FALTAM, parametros)
+
+
+def materializar_pendentes() -> int:
+    """Preenche proxima_execucao dos itens que ainda não têm (bancos antigos)."""
+    itens = PreventivaItem.query.filter(PreventivaItem.proxima_execucao.is_(None)).all()
+    if not itens:
+        return 0
+
+    ativos = {
+        a.id: a
+        for a in Ativo.query.filter(Ativo.id.in_({it.ativo_id for it in itens})).all()
+    }
+    agora = time.time()
+    for item in itens:
+        ativo = ativos.get(item.ativo_id)
+        if ativo is not None and (item.intervalo or 0) > 0:
+            atualizar_item(item, ativo, agora)
+
+    db.session.commit()
+    return len(itens)
+
+
+# ------------------------------------------------------------
+# Consulta: o que vence nos próximos N horas / dias
+# ------------------------------------------------------------
+
+def fila_vencimentos(horas: float, dias: float, cliente_id: Optional[int] = None, limite: int = 200):
+    """
+    Itens com faltam <= horas (base horas) ou vence_em <= agora + dias
+    (base dias), de ativos ativos. Cada lado é uma varredura de faixa no
+    índice; a ordenação é por urgência (faltam / intervalo).
+    """
+    agora = time.time()
+    limite_vence_em = int(agora + dias * 86400)
+
+    consulta = (
+        select(PreventivaItem, Ativo.nome, Ativo.cliente_id)
+        .join(Ativo, Ativo.id == PreventivaItem.ativo_id)
+        .where(Ativo.ativo.is_(True))
+        .where(
+            or_(
+                PreventivaItem.faltam <= bindparam("horas", horas),
+                PreventivaItem.vence_em <= bindparam("vence_em", limite_vence_em),
+            )
+        )
+    )
+    if cliente_id is not None:
+        consulta = consulta.where(Ativo.cliente_id == cliente_id)
+
+    itens = []
+    for item, ativo_nome, item_cliente_id in db.session.execute(consulta):
+        if item.vence_em is not None:
+            faltam = (item.vence_em - agora) / 86400.0
+        else:
+            faltam = item.faltam
+        itens.append(
+            {
+                "ativo_id": item.ativo_id,
+                "ativo_nome": ativo_nome,
+                "cliente_id": item_cliente_id,
+                "item_id": item.id,
+                "nome": item.nome,
+                "base": "dias" if _por_dias(item) else "horas",
+                "faltam": round(faltam, 1),
+                "proxima_execucao": item.proxima_execucao,
+                "ultima_execucao": item.ultima_execucao,
+                "estado": estado_item(faltam, item.avisar_antes),
+                "_urgencia": faltam / float(item.intervalo),
+            }
+        )
+
+    itens.sort(key=lambda i: i["_urgencia"])
+    for i in itens:
+        del i["_urgencia"]
+
+    return itens[:limite] if limite else itens
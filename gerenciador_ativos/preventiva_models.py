@@ -1,4 +1,5 @@
 from gerenciador_ativos.extensions import db
+from datetime import datetime
 
 
 class PreventivaItem(db.Model):
@@ -9,6 +10,12 @@ class PreventivaItem(db.Model):
     - intervalo: a cada quantas horas/dias a tarefa se repete
     - primeira_execucao: opcional (offset inicial em horas/dias)
     - avisar_antes: opcional (quanto antes avisar)
+
+    Fila de vencimentos materializada (preventiva_fila.py):
+    - ultima_execucao: medição (horas/dias) da última execução registrada
+    - proxima_execucao: medição (horas/dias) em que a tarefa vence
+    - faltam: horas até vencer (base horas), atualizado quando o horímetro anda
+    - vence_em: epoch do vencimento (base dias)
     """
     __tablename__ = "preventiva_itens"
 
@@ -24,4 +31,28 @@ class PreventivaItem(db.Model):
     primeira_execucao = db.Column(db.Float, nullable=True)   # horas ou dias
     avisar_antes = db.Column(db.Float, nullable=True)        # horas ou dias
 
+    ultima_execucao = db.Column(db.Float, nullable=True)     # horas ou dias
+    proxima_execucao = db.Column(db.Float, nullable=True)    # horas ou dias
+    faltam = db.Column(db.Float, nullable=True, index=True)  # só base horas
+    vence_em = db.Column(db.Integer, nullable=True, index=True)  # só base dias
+
     criado_em = db.Column(db.DateTime, server_default=db.func.now())
+
+
+class PreventivaExecucao(db.Model):
+    """
+    Registro de execução de um item do plano (log append-only).
+
+    - medicao: horas (base horas) ou dias desde o cadastro (base dias)
+      do ativo no momento da execução
+    """
+    __tablename__ = "preventiva_execucoes"
+
+    id = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, nullable=False, index=True)
+    ativo_id = db.Column(db.Integer, nullable=False, index=True)
+
+    medicao = db.Column(db.Float, nullable=False)
+    executado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    usuario_id = db.Column(db.Integer, nullable=True)
+    observacao = db.Column(db.Text, nullable=True)
@@ -0,0 +1,332 @@
+"""
+Motor de preventiva: quanto falta para cada item do plano, em lote (NumPy).
+
+Carrega os itens de plano e os medidores atuais de todos os ativos
+(horas = horas_sistema + horas_offset, dias = desde o cadastro) em arrays
+e calcula de uma vez, para todos os itens:
+
+- faltam: horas/dias até a próxima execução;
+- vencida: faltam <= 0;
+- aviso: faltam <= avisar_antes (e ainda não vencida);
+- urgencia: faltam / intervalo (menor = mais urgente), para ordenar
+  itens em horas e em dias na mesma lista.
+
+O vencimento vem de proxima_execucao, materializado no item
+(preventiva_fila.py). Sem ele (NaN), vale a regra antiga: primeira_execucao
+e depois cada múltiplo do intervalo. Ativos sem plano cadastrado usam
+FALLBACK_REGRAS (ids negativos no lote: -1, -2, ...).
+
+A matriz do plano (só colunas numéricas) fica em cache até invalidar_plano()
+(item criado/excluído, execução registrada, recálculo da frota); a
+quantidade e o maior id de preventiva_itens e de preventiva_execucoes
+também entram na chave, para pegar mudanças feitas por outro processo.
+A cada consulta só os medidores dos ativos são relidos. Os nomes são
+buscados apenas para os itens que vão na resposta.
+
+Itens com intervalo <= 0 são ignorados, mas contam como plano: um ativo
+cujo plano só tem itens assim fica sem tarefas (como antes), sem cair
+nas regras padrão.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.preventiva_models import PreventivaExecucao, PreventivaItem
+
+# Regras padrão (fallback) caso o ativo não tenha plano cadastrado
+FALLBACK_REGRAS = [
+    {"nome": "Drenar separador de água/combustível", "intervalo": 50.0, "base": "horas"},
+    {"nome": "Troca de óleo do motor", "intervalo": 100.0, "base": "horas"},
+    {"nome": "Troca do filtro de óleo", "intervalo": 200.0, "base": "horas"},
+]
+
+# colunas da matriz do plano
+COL_ID, COL_ATIVO, COL_DIAS, COL_INTERVALO, COL_PRIMEIRA, COL_AVISAR, COL_PROXIMA = range(7)
+
+_cache_lock = threading.Lock()
+_cache_plano = {"chave": None, "matriz": None}
+_geracao = 0
+
+
+def horas_totais(horas_sistema, horas_offset) -> float:
+    """Horímetro exibido no painel: horas de motor do sistema + ajuste manual."""
+    return float(horas_sistema or 0.0) + float(horas_offset or 0.0)
+
+
+def dias_totais(criado_em, agora: Optional[float] = None) -> float:
+    """Dias desde o cadastro do ativo (0 sem data)."""
+    if not criado_em:
+        return 0.0
+    try:
+        ts_ref = criado_em.timestamp()
+    except Exception:
+        return 0.0
+    return max(0.0, ((agora or time.time()) - ts_ref) / 86400.0)
+
+
+class LotePreventiva:
+    """Itens de plano em arrays paralelos (um índice por item)."""
+
+    def __init__(self, item_ids, ativo_ids, dias, intervalo, primeira, avisar, medicao, proxima=None):
+        self.item_ids = np.asarray(item_ids, dtype=np.int64)   # < 0 = regra padrão
+        self.ativo_ids = np.asarray(ativo_ids, dtype=np.int64)
+        self.dias = np.asarray(dias, dtype=bool)
+        self.intervalo = np.asarray(intervalo, dtype=np.float64)
+        self.primeira = np.asarray(primeira, dtype=np.float64)
+        self.avisar = np.asarray(avisar, dtype=np.float64)
+        self.medicao = np.asarray(medicao, dtype=np.float64)
+        # medição (horas/dias) do vencimento materializado; NaN = não materializado
+        self.proxima = (
+            np.full(len(self.item_ids), np.nan) if proxima is None else np.asarray(proxima, dtype=np.float64)
+        )
+
+    def __len__(self):
+        return len(self.item_ids)
+
+
+def calcular(lote: LotePreventiva) -> Dict[str, np.ndarray]:
+    """Passo vetorizado: faltam, vencida, aviso e urgência de todos os itens."""
+    intervalo = lote.intervalo
+    medicao = lote.medicao
+
+    # sem vencimento materializado: ciclo a partir da primeira execução
+    antes_da_primeira = medicao < lote.primeira
+    resto = np.mod(np.maximum(0.0, medicao - lote.primeira), intervalo)
+    ciclico = np.where(resto > 0, intervalo - resto, intervalo)
+    sem_registro = np.where(antes_da_primeira, lote.primeira - medicao, ciclico)
+
+    # materializado: não volta ao ciclo, então pode ficar vencido
+    materializado = lote.proxima - medicao
+
+    faltam = np.where(np.isnan(lote.proxima), sem_registro, materializado)
+    vencida = faltam <= 0
+    aviso = ~vencida & (faltam <= lote.avisar)
+    urgencia = faltam / intervalo
+
+    return {"faltam": faltam, "vencida": vencida, "aviso": aviso, "urgencia": urgencia}
+
+
+# ============================================================
+#   MONTAGEM DO LOTE
+# ============================================================
+
+def _matriz_plano(linhas: Sequence) -> np.ndarray:
+    """(id, ativo_id, dias, intervalo, primeira, avisar, proxima) -> matriz float (None vira NaN)."""
+    if not linhas:
+        return np.empty((0, 7))
+    # tuple(): o NumPy converte Row do SQLAlchemy bem mais devagar
+    return np.array([tuple(linha) for linha in linhas], dtype=np.float64)
+
+
+def _montar_lote(ativo_ids, horas, dias, matriz: np.ndarray) -> LotePreventiva:
+    """
+    Junta os medidores dos ativos (arrays alinhados por ativo_ids) com os
+    itens do plano; ativos sem item recebem as regras padrão.
+    """
+    ativo_ids = np.asarray(ativo_ids, dtype=np.int64)
+    ordem = np.argsort(ativo_ids)
+    ativo_ids = ativo_ids[ordem]
+    horas = np.asarray(horas, dtype=np.float64)[ordem]
+    dias = np.asarray(dias, dtype=np.float64)[ordem]
+
+    # itens só de ativos do conjunto pedido
+    itens_ativo = matriz[:, COL_ATIVO].astype(np.int64)
+    if len(ativo_ids):
+        pos = np.minimum(np.searchsorted(ativo_ids, itens_ativo), len(ativo_ids) - 1)
+        valido = ativo_ids[pos] == itens_ativo
+    else:
+        pos = np.zeros(len(matriz), dtype=np.int64)
+        valido = np.zeros(len(matriz), dtype=bool)
+
+    # regras padrão só para quem não tem nenhum item (mesmo inválido)
+    sem_plano = np.setdiff1d(np.arange(len(ativo_ids)), pos[valido])
+
+    # item com intervalo <= 0 não gera tarefa
+    valido &= np.nan_to_num(matriz[:, COL_INTERVALO]) > 0
+    matriz, pos = matriz[valido], pos[valido]
+    n_regras = len(FALLBACK_REGRAS)
+    regras = np.array(
+        [[-(k + 1), r["base"] == "dias", r["intervalo"]] for k, r in enumerate(FALLBACK_REGRAS)],
+        dtype=np.float64,
+    )
+    pos_fb = np.repeat(sem_plano, n_regras)
+    regras_fb = np.tile(regras, (len(sem_plano), 1))
+
+    pos_todos = np.concatenate([pos, pos_fb])
+    por_dias = np.concatenate([matriz[:, COL_DIAS] == 1, regras_fb[:, 1] == 1])
+    medicao = np.where(por_dias, dias[pos_todos], horas[pos_todos])
+
+    return LotePreventiva(
+        item_ids=np.concatenate([matriz[:, COL_ID], regras_fb[:, 0]]),
+        ativo_ids=ativo_ids[pos_todos],
+        dias=por_dias,
+        intervalo=np.concatenate([matriz[:, COL_INTERVALO], regras_fb[:, 2]]),
+        primeira=np.nan_to_num(np.concatenate([matriz[:, COL_PRIMEIRA], np.zeros(len(regras_fb))])),
+        avisar=np.nan_to_num(np.concatenate([matriz[:, COL_AVISAR], np.zeros(len(regras_fb))])),
+        medicao=medicao,
+        proxima=np.concatenate([matriz[:, COL_PROXIMA], np.full(len(regras_fb), np.nan)]),
+    )
+
+
+def _colunas_plano():
+    return (
+        PreventivaItem.id,
+        PreventivaItem.ativo_id,
+        func.lower(PreventivaItem.base) == "dias",
+        PreventivaItem.intervalo,
+        PreventivaItem.primeira_execucao,
+        PreventivaItem.avisar_antes,
+        PreventivaItem.proxima_execucao,
+    )
+
+
+def invalidar_plano():
+    """Descarta a matriz em cache (item criado/excluído ou vencimento movido)."""
+    global _geracao
+    with _cache_lock:
+        _geracao += 1
+        _cache_plano["chave"] = _cache_plano["matriz"] = None
+
+
+def _plano_da_frota() -> np.ndarray:
+    """Matriz de todos os itens de plano, em cache até o plano mudar."""
+    # a geração entra na chave: invalidado durante a leitura, não casa depois
+    chave = (_geracao,) + tuple(db.session.execute(
+        select(func.count(PreventivaItem.id), func.max(PreventivaItem.id))
+    ).one()) + tuple(db.session.execute(
+        select(func.count(PreventivaExecucao.id), func.max(PreventivaExecucao.id))
+    ).one())
+
+    with _cache_lock:
+        if _cache_plano["chave"] == chave:
+            return _cache_plano["matriz"]
+
+    linhas = db.session.execute(select(*_colunas_plano())).all()
+    matriz = _matriz_plano(linhas)
+
+    with _cache_lock:
+        _cache_plano["chave"] = chave
+        _cache_plano["matriz"] = matriz
+    return matriz
+
+
+def carregar_frota(cliente_id: Optional[int] = None, agora: Optional[float] = None) -> LotePreventiva:
+    """Lote com os itens de todos os ativos ativos (opcionalmente de um cliente)."""
+    agora = agora or time.time()
+
+    consulta = select(Ativo.id, Ativo.horas_sistema, Ativo.horas_offset, Ativo.criado_em).where(
+        Ativo.ativo.is_(True)
+    )
+    if cliente_id is not None:
+        consulta = consulta.where(Ativo.cliente_id == cliente_id)
+    ativos = db.session.execute(consulta).all()
+
+    return _montar_lote(
+        [a[0] for a in ativos],
+        [horas_totais(a[1], a[2]) for a in ativos],
+        [dias_totais(a[3], agora) for a in ativos],
+        _plano_da_frota(),
+    )
+
+
+# ============================================================
+#   USO: UM ATIVO / FROTA
+# ============================================================
+
+def _nome_regra(item_id: int) -> str:
+    return FALLBACK_REGRAS[-item_id - 1]["nome"]
+
+
+def tarefas_do_ativo(ativo, itens: Optional[Sequence[PreventivaItem]] = None) -> List[dict]:
+    """Tarefas de um ativo, ordenadas pelo que falta (formato do /preventiva)."""
+    if itens is None:
+        itens = PreventivaItem.query.filter_by(ativo_id=ativo.id).all()
+
+    nomes = {it.id: it.nome for it in itens}
+    lote = _montar_lote(
+        [ativo.id],
+        [horas_totais(ativo.horas_sistema, ativo.horas_offset)],
+        [dias_totais(ativo.criado_em)],
+        _matriz_plano([
+            (it.id, ativo.id, (it.base or "horas").lower() == "dias",
+             it.intervalo, it.primeira_execucao, it.avisar_antes, it.proxima_execucao)
+            for it in itens
+        ]),
+    )
+    r = calcular(lote)
+
+    tarefas = []
+    for i in range(len(lote)):
+        item_id = int(lote.item_ids[i])
+        tarefas.append(
+            {
+                "id": item_id if item_id > 0 else None,
+                "nome": nomes[item_id] if item_id > 0 else _nome_regra(item_id),
+                "base": "dias" if lote.dias[i] else "horas",
+                "faltam": round(float(r["faltam"][i]), 1),
+                "vencida": bool(r["vencida"][i]),
+                "aviso": bool(r["aviso"][i]),
+            }
+        )
+    tarefas.sort(key=lambda t: t["faltam"])
+    return tarefas
+
+
+def vencimentos_frota(
+    limite: int = 100,
+    so_alertas: bool = False,
+    cliente_id: Optional[int] = None,
+) -> dict:
+    """Itens da frota ordenados por urgência (vencidos primeiro)."""
+    lote = carregar_frota(cliente_id)
+    r = calcular(lote)
+
+    selecao = np.arange(len(lote))
+    if so_alertas:
+        selecao = selecao[r["vencida"] | r["aviso"]]
+
+    # argpartition deixa só os `limite` mais urgentes antes de ordenar
+    urgencia = r["urgencia"][selecao]
+    if limite and len(selecao) > limite:
+        parte = np.argpartition(urgencia, limite - 1)[:limite]
+        selecao, urgencia = selecao[parte], urgencia[parte]
+    selecao = selecao[np.argsort(urgencia, kind="stable")]
+
+    # nomes só dos itens/ativos que vão na resposta
+    item_ids = [int(lote.item_ids[i]) for i in selecao]
+    ativo_ids = {int(lote.ativo_ids[i]) for i in selecao}
+    nomes_itens = dict(db.session.execute(
+        select(PreventivaItem.id, PreventivaItem.nome).where(PreventivaItem.id.in_([i for i in item_ids if i > 0]))
+    ).all()) if item_ids else {}
+    nomes_ativos = dict(db.session.execute(
+        select(Ativo.id, Ativo.nome).where(Ativo.id.in_(ativo_ids))
+    ).all()) if ativo_ids else {}
+
+    itens = []
+    for i, item_id in zip(selecao, item_ids):
+        ativo_id = int(lote.ativo_ids[i])
+        itens.append(
+            {
+                "ativo_id": ativo_id,
+                "ativo_nome": nomes_ativos.get(ativo_id),
+                "item_id": item_id if item_id > 0 else None,
+                "nome": nomes_itens.get(item_id) if item_id > 0 else _nome_regra(item_id),
+                "base": "dias" if lote.dias[i] else "horas",
+                "faltam": round(float(r["faltam"][i]), 1),
+                "vencida": bool(r["vencida"][i]),
+                "aviso": bool(r["aviso"][i]),
+            }
+        )
+
+    return {
+        "total_itens": len(lote),
+        "vencidas": int(r["vencida"].sum()),
+        "avisos": int(r["aviso"].sum()),
+        "itens": itens,
+    }
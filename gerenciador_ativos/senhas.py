@@ -0,0 +1,137 @@
+"""
+Hash de senha configurável, com pool limitado para o cálculo.
+
+- SENHA_HASH: método no formato do Werkzeug, com o custo junto
+  ("scrypt:32768:8:1", "pbkdf2:sha256:600000", ...). Padrão: o do Werkzeug.
+- SENHA_WORKERS: quantos hashes podem ser calculados ao mesmo tempo.
+- SENHA_FILA: quantos logins podem esperar na fila do pool; acima disso
+  o login falha na hora (SenhasOcupadas, 503) em vez de segurar mais
+  threads do waitress, que continuam livres para a telemetria.
+
+Cada login no pool (calculando ou na fila) prende uma thread do waitress
+esperando o resultado. Por isso SENHA_WORKERS + SENHA_FILA é limitado às
+threads que os streams do painel não ocupam (WAITRESS_THREADS -
+PAINEL_STREAM_MAX) menos uma: mesmo numa rajada de logins com todos os
+streams abertos, sobra thread para o resto. Valores acima disso são
+reduzidos na subida, com aviso.
+
+Login com senha correta e hash em parâmetros antigos: o hash é refeito
+com os parâmetros atuais (precisa_rehash), sem o usuário perceber.
+
+scripts/benchmark_senhas.py mede logins/s de cada configuração.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from flask import current_app, flash, has_app_context, redirect, request, url_for
+from werkzeug.security import check_password_hash, generate_password_hash
+
+SENHA_HASH_PADRAO = "scrypt:32768:8:1"
+
+
+class SenhasOcupadas(Exception):
+    """Fila do pool de hash cheia (rajada de logins)."""
+
+
+def metodo_configurado() -> str:
+    if has_app_context():
+        return current_app.config.get("SENHA_HASH") or SENHA_HASH_PADRAO
+    return SENHA_HASH_PADRAO
+
+
+@lru_cache(maxsize=8)
+def _prefixo(metodo: str) -> str:
+    """Método completo como o Werkzeug grava ("pbkdf2:sha256" -> "...:600000")."""
+    return generate_password_hash("", method=metodo).split("$", 1)[0]
+
+
+def precisa_rehash(senha_hash: str, metodo: Optional[str] = None) -> bool:
+    return senha_hash.split("$", 1)[0] != _prefixo(metodo or metodo_configurado())
+
+
+class PoolSenhas:
+    def __init__(self, workers: int, fila: int):
+        self.workers = max(1, workers)
+        self.fila = max(0, fila)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="senhas")
+        # em execução + esperando
+        self._vagas = threading.BoundedSemaphore(self.workers + max(0, fila))
+
+    def executar(self, funcao, *args):
+        if not self._vagas.acquire(blocking=False):
+            raise SenhasOcupadas()
+        try:
+            return self._executor.submit(funcao, *args).result()
+        finally:
+            self._vagas.release()
+
+
+_pool: Optional[PoolSenhas] = None
+_pool_lock = threading.Lock()
+
+
+def limites_pool(config) -> tuple:
+    """(workers, fila) da configuração, cabendo nas threads livres do waitress."""
+    workers = max(1, int(config.get("SENHA_WORKERS", 2)))
+    fila = max(0, int(config.get("SENHA_FILA", 1)))
+
+    threads = int(config.get("WAITRESS_THREADS", 16))
+    streams = int(config.get("PAINEL_STREAM_MAX", 0))
+    # uma thread livre fica sempre de fora
+    teto = max(1, threads - streams - 1)
+
+    workers = min(workers, teto)
+    return workers, min(fila, teto - workers)
+
+
+def _pool_atual() -> PoolSenhas:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config if has_app_context() else {}
+                _pool = PoolSenhas(*limites_pool(config))
+    return _pool
+
+
+MENSAGEM_OCUPADAS = "Muitos acessos neste momento. Tente novamente em alguns segundos."
+
+
+def _resposta_ocupadas(exc):
+    """Rota que esbarrou no pool cheio sem tratar: 503 na API, aviso nas telas."""
+    if request.path.startswith("/api/"):
+        return {"erro": MENSAGEM_OCUPADAS}, 503, {"Retry-After": "5"}
+    flash(MENSAGEM_OCUPADAS, "warning")
+    return redirect(request.referrer or url_for("auth.login"))
+
+
+def iniciar_senhas(app):
+    """Monta o pool com os limites da configuração e trata SenhasOcupadas."""
+    app.register_error_handler(SenhasOcupadas, _resposta_ocupadas)
+
+    pedidos = (int(app.config.get("SENHA_WORKERS", 2)), int(app.config.get("SENHA_FILA", 1)))
+    with app.app_context():
+        pool = _pool_atual()
+
+    if (pool.workers, pool.fila) != pedidos:
+        print(
+            f">>> SENHA_WORKERS + SENHA_FILA ({pedidos[0]} + {pedidos[1]}) não cabem nas threads "
+            f"livres do waitress; usando {pool.workers} + {pool.fila}."
+        )
+    print(
+        f">>> Hash de senha: {app.config.get('SENHA_HASH') or SENHA_HASH_PADRAO}, "
+        f"{pool.workers} em paralelo, {pool.fila} na fila."
+    )
+    return pool
+
+
+def gerar_hash(senha: str, metodo: Optional[str] = None) -> str:
+    metodo = metodo or metodo_configurado()
+    return _pool_atual().executar(generate_password_hash, senha, metodo)
+
+
+def verificar_senha(senha_hash: str, senha: str) -> bool:
+    return _pool_atual().executar(check_password_hash, senha_hash, senha)
@@ -0,0 +1,10 @@
+from flask import Blueprint
+
+tarefas_bp = Blueprint(
+    "tarefas",
+    __name__,
+    url_prefix="/tarefas",
+    template_folder="../../templates/tarefas"
+)
+
+from gerenciador_ativos.tarefas import routes  # noqa
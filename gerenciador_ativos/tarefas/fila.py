@@ -0,0 +1,404 @@
+"""
+Fila de tarefas em segundo plano, guardada no banco (tabela tarefas).
+
+Operações demoradas (importação de CSV, recálculo da preventiva,
+atualização da frota) não rodam na thread do waitress: a rota chama
+enfileirar(tipo, **parametros), responde na hora com o id da tarefa e um
+pool de TAREFAS_WORKERS threads, iniciado no create_app, executa.
+
+- Registro: @tarefa("tipo") numa função f(ctx, **parametros) que
+  devolve um resultado serializável em JSON. ctx.progresso(fração,
+  mensagem) atualiza a página /tarefas e é onde um cancelamento pedido
+  pela página interrompe a tarefa.
+- Retentativas: exceção na tarefa -> nova tentativa depois de
+  TAREFAS_BACKOFF_S * 2^(tentativa-1), até max_tentativas; depois disso
+  fica "falhou" com o traceback guardado.
+- Reserva: um UPDATE ... WHERE status='pendente' RETURNING escolhe a
+  próxima tarefa, então só um trabalhador fica com ela (no Postgres a
+  subconsulta usa FOR UPDATE SKIP LOCKED).
+- Processo que parou no meio (deploy, restart do dyno): o vigia renova o
+  heartbeat das tarefas em execução; "executando" sem heartbeat há
+  TAREFAS_ORFA_S segundos volta para a fila (ou falha, sem tentativas).
+
+Sem broker externo: a tabela funciona em SQLite e Postgres, e o processo
+web do Procfile é o trabalhador.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.tarefas_models import Tarefa
+
+logger = logging.getLogger(__name__)
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+CANCELADA = "cancelada"
+STATUS = (PENDENTE, EXECUTANDO, CONCLUIDA, FALHOU, CANCELADA)
+
+# intervalo mínimo entre duas gravações de progresso da mesma tarefa
+_PROGRESSO_MIN_S = 1.0
+
+_REGISTRO: Dict[str, Tuple[Callable, int]] = {}
+_fila = None
+
+
+class TarefaCancelada(Exception):
+    """Levantada em ctx.progresso() quando a tarefa foi cancelada pela página."""
+
+
+def tarefa(tipo: str, max_tentativas: int = 3):
+    """Registra a função que executa as tarefas do `tipo`."""
+    def decorador(funcao):
+        _REGISTRO[tipo] = (funcao, max_tentativas)
+        return funcao
+    return decorador
+
+
+def tipos_registrados():
+    return sorted(_REGISTRO)
+
+
+def _agora() -> datetime:
+    return datetime.utcnow()
+
+
+class ContextoTarefa:
+    """Passado para a função da tarefa: id, tentativa e progresso."""
+
+    def __init__(self, tarefa_id: int, tentativa: int):
+        self.tarefa_id = tarefa_id
+        self.tentativa = tentativa
+        self._ultimo = 0.0
+
+    def progresso(self, fracao: float, mensagem: Optional[str] = None, forcar: bool = False):
+        agora = time.monotonic()
+        if not forcar and agora - self._ultimo < _PROGRESSO_MIN_S:
+            return
+        self._ultimo = agora
+
+        valores = {"progresso": max(0.0, min(1.0, float(fracao))), "heartbeat_em": _agora()}
+        if mensagem is not None:
+            valores["mensagem"] = mensagem[:255]
+
+        # conexão própria: não mistura com a transação da tarefa
+        with db.engine.begin() as conn:
+            linhas = conn.execute(
+                update(Tarefa)
+                .where(Tarefa.id == self.tarefa_id, Tarefa.status == EXECUTANDO)
+                .values(**valores)
+            ).rowcount
+        if linhas == 0:
+            raise TarefaCancelada()
+
+
+# ============================================================
+# ENFILEIRAR / CONTROLAR
+# ============================================================
+
+def enfileirar(tipo: str, usuario_id: Optional[int] = None, **parametros) -> int:
+    """Grava a tarefa e acorda os trabalhadores. Retorna o id."""
+    if tipo not in _REGISTRO:
+        raise ValueError(f"tipo de tarefa desconhecido: {tipo}")
+
+    nova = Tarefa(
+        tipo=tipo,
+        parametros=json.dumps(parametros, default=str),
+        status=PENDENTE,
+        max_tentativas=_REGISTRO[tipo][1],
+        usuario_id=usuario_id,
+        mensagem="na fila",
+        criada_em=_agora(),
+        agendada_para=_agora(),
+    )
+    db.session.add(nova)
+    db.session.commit()
+
+    if _fila is not None:
+        _fila.acordar()
+    return nova.id
+
+
+def cancelar(tarefa_id: int) -> bool:
+    """Pendente sai da fila; em execução para no próximo ctx.progresso()."""
+    linhas = db.session.execute(
+        update(Tarefa)
+        .where(Tarefa.id == tarefa_id, Tarefa.status.in_((PENDENTE, EXECUTANDO)))
+        .values(status=CANCELADA, concluida_em=_agora(), mensagem="cancelada")
+    ).rowcount
+    db.session.commit()
+    return linhas == 1
+
+
+def reexecutar(tarefa_id: int) -> bool:
+    """Volta para a fila uma tarefa que falhou ou foi cancelada (tentativas zeradas)."""
+    linhas = db.session.execute(
+        update(Tarefa)
+        .where(Tarefa.id == tarefa_id, Tarefa.status.in_((FALHOU, CANCELADA)))
+        .values(
+            status=PENDENTE, tentativas=0, progresso=0.0, erro=None, resultado=None,
+            mensagem="na fila", agendada_para=_agora(), concluida_em=None, trabalhador=None,
+        )
+    ).rowcount
+    db.session.commit()
+    if linhas and _fila is not None:
+        _fila.acordar()
+    return linhas == 1
+
+
+def contagem_por_status() -> Dict[str, int]:
+    linhas = db.session.execute(select(Tarefa.status, func.count()).group_by(Tarefa.status))
+    contagem = {s: 0 for s in STATUS}
+    contagem.update({status: total for status, total in linhas})
+    return contagem
+
+
+# ============================================================
+# TRABALHADORES
+# ============================================================
+
+class FilaTarefas:
+    def __init__(self, app, workers: int, intervalo: float, backoff: float,
+                 orfa_s: float, reter_dias: float):
+        self.app = app
+        self.workers = max(1, workers)
+        self.intervalo = max(0.2, intervalo)
+        self.backoff = max(0.0, backoff)
+        self.orfa_s = max(10.0, orfa_s)
+        self.reter_dias = reter_dias
+        self.nome = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._sinal = threading.Event()
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._em_execucao = set()
+        self._threads = []
+
+        self.executadas = 0
+        self.falhas = 0
+
+    def iniciar(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop_trabalhador, name=f"tarefas-{i + 1}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._loop_vigia, name="tarefas-vigia", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def acordar(self):
+        self._sinal.set()
+
+    def parar(self):
+        self._parar.set()
+        self._sinal.set()
+
+    # -------------------------------------------------- reserva
+
+    def _reservar(self):
+        agora = _agora()
+        proxima = (
+            select(Tarefa.id)
+            .where(Tarefa.status == PENDENTE, Tarefa.agendada_para <= agora)
+            .order_by(Tarefa.agendada_para, Tarefa.id)
+            .limit(1)
+        )
+        if db.engine.dialect.name == "postgresql":
+            proxima = proxima.with_for_update(skip_locked=True)
+
+        with db.engine.begin() as conn:
+            return conn.execute(
+                update(Tarefa)
+                .where(Tarefa.id == proxima.scalar_subquery(), Tarefa.status == PENDENTE)
+                .values(
+                    status=EXECUTANDO,
+                    tentativas=Tarefa.tentativas + 1,
+                    trabalhador=self.nome,
+                    iniciada_em=agora,
+                    heartbeat_em=agora,
+                    mensagem="executando",
+                )
+                .returning(Tarefa.id, Tarefa.tipo, Tarefa.parametros, Tarefa.tentativas, Tarefa.max_tentativas)
+            ).first()
+
+    def _finalizar(self, tarefa_id: int, **valores):
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(Tarefa)
+                .where(Tarefa.id == tarefa_id, Tarefa.status == EXECUTANDO)
+                .values(concluida_em=_agora(), **valores)
+            )
+
+    # -------------------------------------------------- execução
+
+    def _executar(self, linha):
+        registro = _REGISTRO.get(linha.tipo)
+        if registro is None:
+            self._finalizar(linha.id, status=FALHOU, erro=f"tipo desconhecido: {linha.tipo}")
+            return
+
+        funcao, _ = registro
+        ctx = ContextoTarefa(linha.id, linha.tentativas)
+        try:
+            parametros = json.loads(linha.parametros or "{}")
+            resultado = funcao(ctx, **parametros)
+        except TarefaCancelada:
+            db.session.rollback()
+            logger.info(f"[TAREFAS] {linha.tipo} #{linha.id} cancelada")
+        except Exception:
+            db.session.rollback()
+            self.falhas += 1
+            self._registrar_falha(linha, traceback.format_exc())
+        else:
+            self.executadas += 1
+            self._finalizar(
+                linha.id,
+                status=CONCLUIDA,
+                progresso=1.0,
+                mensagem="concluída",
+                resultado=json.dumps(resultado, default=str),
+            )
+
+    def _registrar_falha(self, linha, erro: str):
+        ultima = erro.strip().splitlines()[-1][:200]
+        if linha.tentativas < linha.max_tentativas:
+            espera = self.backoff * 2 ** (linha.tentativas - 1)
+            logger.warning(f"[TAREFAS] {linha.tipo} #{linha.id} falhou ({ultima}); nova tentativa em {espera:.0f}s")
+            with db.engine.begin() as conn:
+                conn.execute(
+                    update(Tarefa)
+                    .where(Tarefa.id == linha.id, Tarefa.status == EXECUTANDO)
+                    .values(
+                        status=PENDENTE,
+                        erro=erro,
+                        mensagem=f"tentativa {linha.tentativas} falhou: {ultima}"[:255],
+                        agendada_para=_agora() + timedelta(seconds=espera),
+                        trabalhador=None,
+                    )
+                )
+        else:
+            logger.error(f"[TAREFAS] {linha.tipo} #{linha.id} falhou de vez: {ultima}")
+            self._finalizar(linha.id, status=FALHOU, erro=erro, mensagem=f"falhou: {ultima}"[:255])
+
+    def _loop_trabalhador(self):
+        while not self._parar.is_set():
+            try:
+                with self.app.app_context():
+                    linha = self._reservar()
+                    if linha is not None:
+                        with self._lock:
+                            self._em_execucao.add(linha.id)
+                        try:
+                            self._executar(linha)
+                        finally:
+                            with self._lock:
+                                self._em_execucao.discard(linha.id)
+            except Exception:
+                linha = None
+                logger.exception("[TAREFAS] erro inesperado no trabalhador")
+
+            if linha is None:
+                # fila vazia: espera uma tarefa nova (acordar) ou o intervalo
+                self._sinal.wait(self.intervalo)
+                self._sinal.clear()
+
+    # -------------------------------------------------- vigia
+
+    def _vigiar(self):
+        agora = _agora()
+        with self._lock:
+            minhas = list(self._em_execucao)
+
+        with db.engine.begin() as conn:
+            if minhas:
+                conn.execute(update(Tarefa).where(Tarefa.id.in_(minhas)).values(heartbeat_em=agora))
+
+            limite = agora - timedelta(seconds=self.orfa_s)
+            orfa = (Tarefa.status == EXECUTANDO) & (Tarefa.heartbeat_em < limite)
+            retomadas = conn.execute(
+                update(Tarefa)
+                .where(orfa, Tarefa.tentativas < Tarefa.max_tentativas)
+                .values(status=PENDENTE, trabalhador=None, agendada_para=agora,
+                        mensagem="retomada: o processo anterior parou")
+            ).rowcount
+            conn.execute(
+                update(Tarefa)
+                .where(orfa)
+                .values(status=FALHOU, concluida_em=agora,
+                        mensagem="o processo parou durante a última tentativa")
+            )
+
+            if self.reter_dias > 0:
+                conn.execute(
+                    delete(Tarefa).where(
+                        Tarefa.status.in_((CONCLUIDA, CANCELADA)),
+                        Tarefa.concluida_em < agora - timedelta(days=self.reter_dias),
+                    )
+                )
+
+        if retomadas:
+            logger.info(f"[TAREFAS] {retomadas} tarefa(s) órfã(s) de volta à fila")
+            self.acordar()
+
+    def _loop_vigia(self):
+        espera = max(2.0, self.orfa_s / 4)
+        while not self._parar.is_set():
+            try:
+                with self.app.app_context():
+                    self._vigiar()
+            except Exception:
+                logger.exception("[TAREFAS] erro no vigia da fila")
+            self._parar.wait(espera)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            em_execucao = len(self._em_execucao)
+        return {
+            "workers": self.workers,
+            "em_execucao": em_execucao,
+            "executadas": self.executadas,
+            "falhas": self.falhas,
+        }
+
+
+def iniciar_tarefas(app):
+    """Inicia (uma vez por processo) os trabalhadores da fila."""
+    global _fila
+
+    if _fila is not None:
+        return _fila
+
+    # registra os tipos de tarefa
+    from gerenciador_ativos.tarefas import tipos  # noqa
+
+    if not app.config.get("TAREFAS", True):
+        print(">>> Tarefas em segundo plano desativadas (TAREFAS=0).")
+        return None
+
+    _fila = FilaTarefas(
+        app,
+        workers=int(app.config.get("TAREFAS_WORKERS", 2)),
+        intervalo=float(app.config.get("TAREFAS_INTERVALO", 2)),
+        backoff=float(app.config.get("TAREFAS_BACKOFF_S", 30)),
+        orfa_s=float(app.config.get("TAREFAS_ORFA_S", 120)),
+        reter_dias=float(app.config.get("TAREFAS_RETER_DIAS", 7)),
+    )
+    _fila.iniciar()
+    print(f">>> Tarefas em segundo plano: {_fila.workers} trabalhador(es).")
+    return _fila
+
+
+def estatisticas_tarefas():
+    return _fila.estatisticas() if _fila else None
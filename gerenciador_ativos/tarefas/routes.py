@@ -0,0 +1,155 @@
+import json
+
+from flask import abort, flash, jsonify, redirect, render_template, request, url_for
+from sqlalchemy.orm import load_only
+
+from gerenciador_ativos.auth.decorators import login_required, role_required
+from gerenciador_ativos.auth.principal import principal_atual
+from gerenciador_ativos.paginacao import paginar
+from gerenciador_ativos.tarefas import tarefas_bp
+from gerenciador_ativos.tarefas.fila import (
+    STATUS,
+    cancelar,
+    contagem_por_status,
+    enfileirar,
+    estatisticas_tarefas,
+    reexecutar,
+    tipos_registrados,
+)
+from gerenciador_ativos.tarefas_models import Tarefa
+
+# tipos que a página deixa disparar direto (os demais nascem de outras telas)
+TIPOS_MANUAIS = {
+    "recalcular_preventiva": "Recalcular preventiva da frota",
+    "atualizar_frota": "Atualizar telemetria da frota",
+}
+
+
+def _como_dict(tarefa):
+    return {
+        "id": tarefa.id,
+        "tipo": tarefa.tipo,
+        "status": tarefa.status,
+        "progresso": round(tarefa.progresso or 0.0, 3),
+        "mensagem": tarefa.mensagem,
+        "tentativas": tarefa.tentativas,
+        "max_tentativas": tarefa.max_tentativas,
+        "criada_em": tarefa.criada_em.isoformat() if tarefa.criada_em else None,
+        "iniciada_em": tarefa.iniciada_em.isoformat() if tarefa.iniciada_em else None,
+        "concluida_em": tarefa.concluida_em.isoformat() if tarefa.concluida_em else None,
+        "resultado": json.loads(tarefa.resultado) if tarefa.resultado else None,
+        "erro": tarefa.erro,
+    }
+
+
+def _tarefa_visivel(id):
+    """Equipe interna vê todas; os demais, só as que criaram."""
+    tarefa = Tarefa.query.get_or_404(id)
+    principal = principal_atual()
+    if not principal.is_interno() and tarefa.usuario_id != principal.user_id:
+        abort(403)
+    return tarefa
+
+
+# ============================================================
+# LISTA
+# ============================================================
+
+@tarefas_bp.route("/")
+@login_required
+@role_required(["admin", "gerente"])
+def lista():
+    """
+    Lista paginada (keyset) das tarefas.
+
+    ?status=pendente|executando|concluida|falhou|cancelada
+    ?tipo=importar_ativos|...
+    """
+    consulta = Tarefa.query.options(
+        # sem resultado / traceback na lista
+        load_only(
+            Tarefa.id, Tarefa.tipo, Tarefa.status, Tarefa.progresso, Tarefa.mensagem,
+            Tarefa.tentativas, Tarefa.max_tentativas, Tarefa.criada_em, Tarefa.concluida_em,
+        )
+    )
+
+    status = request.args.get("status")
+    if status in STATUS:
+        consulta = consulta.filter(Tarefa.status == status)
+
+    tipo = request.args.get("tipo")
+    if tipo:
+        consulta = consulta.filter(Tarefa.tipo == tipo)
+
+    pagina = paginar(consulta, Tarefa.id, ordens={"id": Tarefa.id}, ordem_padrao="-id")
+    return render_template(
+        "tarefas/lista.html",
+        tarefas=pagina,
+        pagina=pagina,
+        contagem=contagem_por_status(),
+        estatisticas=estatisticas_tarefas(),
+        status_opcoes=STATUS,
+        tipos=tipos_registrados(),
+        tipos_manuais=TIPOS_MANUAIS,
+    )
+
+
+# ============================================================
+# DETALHE / STATUS
+# ============================================================
+
+@tarefas_bp.route("/<int:id>")
+@login_required
+def detalhe(id):
+    tarefa = _tarefa_visivel(id)
+    return render_template("tarefas/detalhe.html", tarefa=_como_dict(tarefa))
+
+
+@tarefas_bp.route("/<int:id>/status")
+@login_required
+def status_tarefa(id):
+    """JSON para acompanhar a tarefa (a página de detalhe consulta aqui)."""
+    return jsonify(_como_dict(_tarefa_visivel(id)))
+
+
+# ============================================================
+# AÇÕES
+# ============================================================
+
+@tarefas_bp.route("/enfileirar", methods=["POST"])
+@login_required
+@role_required(["admin", "gerente"])
+def enfileirar_manual():
+    tipo = request.form.get("tipo")
+    if tipo not in TIPOS_MANUAIS:
+        abort(400)
+
+    tarefa_id = enfileirar(tipo, usuario_id=principal_atual().user_id)
+    flash(f"{TIPOS_MANUAIS[tipo]}: tarefa #{tarefa_id} na fila.", "success")
+    return redirect(url_for("tarefas.detalhe", id=tarefa_id))
+
+
+@tarefas_bp.route("/<int:id>/cancelar", methods=["POST"])
+@login_required
+@role_required(["admin", "gerente"])
+def cancelar_tarefa(id):
+    if cancelar(id):
+        flash("Tarefa cancelada.", "success")
+    else:
+        flash("A tarefa já terminou.", "warning")
+    return redirect(url_for("tarefas.detalhe", id=id))
+
+
+@tarefas_bp.route("/<int:id>/reexecutar", methods=["POST"])
+@login_required
+@role_required(["admin", "gerente"])
+def reexecutar_tarefa(id):
+    tarefa = Tarefa.query.get_or_404(id)
+    # o CSV da importação é apagado ao final da execução
+    if tarefa.tipo == "importar_ativos":
+        flash("Importações não podem ser reexecutadas; envie o arquivo de novo.", "warning")
+    elif reexecutar(id):
+        flash("Tarefa de volta na fila.", "success")
+    else:
+        flash("Só tarefas que falharam ou foram canceladas podem ser reexecutadas.", "warning")
+    return redirect(url_for("tarefas.detalhe", id=id))
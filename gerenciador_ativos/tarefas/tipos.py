@@ -0,0 +1,91 @@
+"""
+Tipos de tarefa executados pela fila (tarefas/fila.py).
+
+- importar_ativos: CSV salvo pelo upload de /ativos/importar
+- recalcular_preventiva: faltam / vence_em de todos os itens da frota
+- atualizar_frota: um ciclo do poller (BrasilSat em lote) sob demanda
+"""
+
+import os
+
+from flask import current_app
+
+from gerenciador_ativos.ativos.importacao import abrir_texto, importar_ativos as importar
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.preventiva_models import PreventivaItem
+from gerenciador_ativos.preventiva_fila import recalcular_ativo
+from gerenciador_ativos.preventiva_motor import invalidar_plano
+from gerenciador_ativos.dashboards.kpis import invalidar_kpis
+from gerenciador_ativos.tarefas.fila import tarefa
+from gerenciador_ativos.telemetria.eventos import notificador, canal_plano
+from gerenciador_ativos.telemetria.poller import PollerTelemetria
+
+# ativos por commit no recálculo da preventiva
+_LOTE_PREVENTIVA = 200
+
+# erros de linha guardados no resultado da importação
+_ERROS_MAX = 1000
+
+
+# importação parcial não pode ser repetida (ativos sem IMEI duplicariam)
+@tarefa("importar_ativos", max_tentativas=1)
+def importar_ativos(ctx, caminho, tamanho_lote=None, verificar_brasilsat=False, simular=False):
+    tamanho = os.path.getsize(caminho) or 1
+    try:
+        with open(caminho, "rb") as bruto:
+            def _ao_lote(resultado):
+                # bytes consumidos do arquivo ~ fração lida
+                ctx.progresso(
+                    bruto.tell() / tamanho,
+                    f"{resultado.lidas} linha(s) lida(s), {resultado.criados} ativo(s)",
+                )
+
+            resultado = importar(
+                abrir_texto(bruto),
+                tamanho_lote=tamanho_lote,
+                verificar_brasilsat=verificar_brasilsat,
+                simular=simular,
+                ao_lote=_ao_lote,
+            )
+    finally:
+        os.remove(caminho)
+
+    return resultado.como_dict(erros_max=_ERROS_MAX)
+
+
+@tarefa("recalcular_preventiva")
+def recalcular_preventiva(ctx):
+    ids = [
+        id_ for (id_,) in
+        db.session.query(PreventivaItem.ativo_id).distinct().order_by(PreventivaItem.ativo_id)
+    ]
+    total = len(ids)
+
+    for inicio in range(0, total, _LOTE_PREVENTIVA):
+        bloco = ids[inicio:inicio + _LOTE_PREVENTIVA]
+        for ativo in Ativo.query.filter(Ativo.id.in_(bloco)).all():
+            recalcular_ativo(ativo)
+        db.session.commit()
+        for ativo_id in bloco:
+            notificador.publicar(canal_plano(ativo_id))
+        feitos = inicio + len(bloco)
+        ctx.progresso(feitos / total, f"{feitos} de {total} ativo(s)")
+
+    invalidar_kpis()
+    invalidar_plano()
+    return {"ativos": total}
+
+
+@tarefa("atualizar_frota")
+def atualizar_frota(ctx):
+    app = current_app._get_current_object()
+    ctx.progresso(0.0, "consultando a BrasilSat", forcar=True)
+    poller = PollerTelemetria(
+        app,
+        app.config.get("TELEMETRIA_INTERVALO", 30),
+        usar_async=app.config.get("TELEMETRIA_POLLER_ASYNC", False),
+        concorrencia=app.config.get("TELEMETRIA_POLLER_CONCORRENCIA", 10),
+    )
+    poller.executar_ciclo()
+    return {"duracao_s": round(poller.ultimo_ciclo_duracao or 0.0, 2)}
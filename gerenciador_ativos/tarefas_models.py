@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from gerenciador_ativos.extensions import db
+
+
+class Tarefa(db.Model):
+    """
+    Tarefa em segundo plano (fila em tarefas/fila.py).
+
+    - status: pendente -> executando -> concluida | falhou | cancelada
+      (uma falha com tentativas sobrando volta para pendente, agendada
+      para depois do backoff)
+    - parametros / resultado: JSON
+    - progresso: 0..1, com mensagem, atualizado pela própria tarefa
+    - heartbeat_em: o processo que executa renova periodicamente; tarefa
+      "executando" sem heartbeat recente é de um processo que morreu e
+      volta para a fila
+    """
+    __tablename__ = "tarefas"
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(60), nullable=False)
+    parametros = db.Column(db.Text, nullable=True)
+
+    status = db.Column(db.String(20), nullable=False, default="pendente")
+    tentativas = db.Column(db.Integer, nullable=False, default=0)
+    max_tentativas = db.Column(db.Integer, nullable=False, default=3)
+
+    progresso = db.Column(db.Float, nullable=False, default=0.0)
+    mensagem = db.Column(db.String(255), nullable=True)
+    resultado = db.Column(db.Text, nullable=True)
+    erro = db.Column(db.Text, nullable=True)
+
+    usuario_id = db.Column(db.Integer, nullable=True)
+    trabalhador = db.Column(db.String(80), nullable=True)
+
+    criada_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    agendada_para = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    iniciada_em = db.Column(db.DateTime, nullable=True)
+    concluida_em = db.Column(db.DateTime, nullable=True)
+    heartbeat_em = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # próxima tarefa a executar: status + horário
+        db.Index("ix_tarefas_fila", "status", "agendada_para"),
+    )
+
+    def __repr__(self):
+        return f"<Tarefa {self.id} {self.tipo} {self.status}>"
@@ -0,0 +1,11 @@
+"""
+Telemetria dos ativos desacoplada das requisições HTTP.
+
+- snapshot: última amostra normalizada de cada IMEI, em memória
+- poller: thread que atualiza a frota inteira em segundo plano
+- horimetro: horas de motor / paradas a partir de acctime e servertime
+- historico: buffer que grava as amostras em telemetria_amostras em lote
+- estado: estado dos ativos com gravação write-behind em lote
+- eventos: notificações em processo para os streams SSE do painel
+- service: leitura única por ativo (estado + formatos v1/v2/monitoramento)
+"""
@@ -0,0 +1,269 @@
+"""
+Estado dos ativos (horímetro, posição, tensão) com gravação write-behind.
+
+As requisições GET não gravam mais no banco: a amostra é aplicada numa
+cópia do estado (EstadoAtivo), o resultado mais recente de cada ativo fica
+num buffer em memória e uma thread grava tudo num UPDATE em lote a cada
+TELEMETRIA_ESTADO_FLUSH segundos (e uma última vez no desligamento).
+
+- amostra com servertime igual ou anterior ao já processado: nada muda e
+  nada entra no buffer;
+- várias amostras do mesmo ativo entre dois flushes viram uma linha só;
+- quem lê o ativo enquanto o estado está no buffer recebe o estado do
+  buffer (set_committed_value, sem marcar o objeto como alterado);
+- o UPDATE só vale se o servertime gravado for anterior ao novo, então um
+  flush atrasado nunca volta o horímetro para trás;
+- no mesmo commit, o "faltam" dos itens de preventiva por horas desses
+  ativos é recalculado (preventiva_fila.py).
+
+Com TELEMETRIA_ESTADO=0 o estado é aplicado direto no Ativo e gravado por
+confirmar_estado(), como antes.
+"""
+
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.preventiva_fila import atualizar_faltam
+from gerenciador_ativos.telemetria.horimetro import aplicar_amostra
+
+logger = logging.getLogger(__name__)
+
+_buffer = None
+
+CAMPOS_ESTADO = (
+    "horas_sistema",
+    "horas_paradas",
+    "ultimo_estado_motor",
+    "total_ignicoes",
+    "ultima_atualizacao",
+    "ultimo_acctime_s",
+    "motor_desligado_em",
+    "latitude",
+    "longitude",
+    "tensao_bateria",
+)
+
+
+class EstadoAtivo:
+    """Cópia das colunas de estado de um Ativo, fora da sessão."""
+
+    __slots__ = ("ativo_id",) + CAMPOS_ESTADO
+
+    def __init__(self, ativo_id: int, **valores):
+        self.ativo_id = ativo_id
+        for campo in CAMPOS_ESTADO:
+            setattr(self, campo, valores.get(campo))
+
+    @classmethod
+    def do_ativo(cls, ativo) -> "EstadoAtivo":
+        return cls(ativo.id, **{c: getattr(ativo, c) for c in CAMPOS_ESTADO})
+
+    def copia(self) -> "EstadoAtivo":
+        return EstadoAtivo(self.ativo_id, **self.como_dict())
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {c: getattr(self, c) for c in CAMPOS_ESTADO}
+
+    def sobrepor(self, ativo):
+        """Mostra o estado no objeto do ORM sem gerar UPDATE."""
+        for campo in CAMPOS_ESTADO:
+            set_committed_value(ativo, campo, getattr(self, campo))
+
+
+def _aplicar_posicao(alvo, telemetria: Dict[str, Any]):
+    alvo.latitude = telemetria.get("latitude")
+    alvo.longitude = telemetria.get("longitude")
+    alvo.tensao_bateria = telemetria.get("tensao_bateria")
+
+
+def _mais_novo(a: Optional[EstadoAtivo], b: Optional[EstadoAtivo]) -> Optional[EstadoAtivo]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return b if (b.ultima_atualizacao or 0) > (a.ultima_atualizacao or 0) else a
+
+
+def _update_em_lote():
+    tabela = Ativo.__table__
+    return (
+        update(tabela)
+        .where(tabela.c.id == bindparam("b_id"))
+        .where(
+            or_(
+                tabela.c.ultima_atualizacao.is_(None),
+                tabela.c.ultima_atualizacao < bindparam("b_servertime"),
+            )
+        )
+        .values({campo: bindparam(campo) for campo in CAMPOS_ESTADO})
+    )
+
+
+class BufferEstado:
+    def __init__(self, app, intervalo_flush: float):
+        self.app = app
+        self.intervalo_flush = max(0.2, float(intervalo_flush))
+
+        self._lock = threading.Lock()
+        self._pendentes: Dict[int, EstadoAtivo] = {}
+        # estados do flush em andamento: continuam visíveis até o commit
+        self._gravando: Dict[int, EstadoAtivo] = {}
+        self._parar = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+        self.recebidas = 0
+        self.repetidas = 0
+        self.coalescidas = 0
+        self.gravadas = 0
+        self.flushes = 0
+        self.falhas = 0
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._loop, name="telemetria-estado", daemon=True)
+        self._thread.start()
+        atexit.register(self.encerrar)
+
+    def _estado_base(self, ativo) -> EstadoAtivo:
+        with self._lock:
+            guardado = _mais_novo(self._gravando.get(ativo.id), self._pendentes.get(ativo.id))
+
+        atual = EstadoAtivo.do_ativo(ativo)
+        if guardado is None or (guardado.ultima_atualizacao or 0) <= (atual.ultima_atualizacao or 0):
+            return atual
+        return guardado.copia()
+
+    def aplicar(self, ativo, telemetria: Dict[str, Any]) -> bool:
+        """Aplica a amostra sobre o estado mais recente do ativo (banco ou buffer)."""
+        estado = self._estado_base(ativo)
+
+        self.recebidas += 1
+        alterado = aplicar_amostra(estado, telemetria)
+        if alterado:
+            _aplicar_posicao(estado, telemetria)
+            with self._lock:
+                anterior = self._pendentes.get(ativo.id)
+                if anterior is not None:
+                    self.coalescidas += 1
+                self._pendentes[ativo.id] = _mais_novo(anterior, estado)
+        else:
+            self.repetidas += 1
+
+        estado.sobrepor(ativo)
+        return alterado
+
+    def flush(self) -> int:
+        """Grava os estados pendentes num UPDATE executemany."""
+        with self._flush_lock:
+            with self._lock:
+                lote, self._pendentes = self._pendentes, {}
+                self._gravando = lote
+
+            if not lote:
+                return 0
+
+            parametros = []
+            for ativo_id, estado in lote.items():
+                linha = estado.como_dict()
+                linha["b_id"] = ativo_id
+                linha["b_servertime"] = estado.ultima_atualizacao
+                parametros.append(linha)
+
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as conn:
+                        conn.execute(_update_em_lote(), parametros)
+                        # fila de preventiva: faltam dos itens por horas
+                        atualizar_faltam(conn, lote.keys())
+            except Exception:
+                self.falhas += 1
+                logger.exception(f"[ESTADO] falha ao gravar {len(lote)} ativos")
+                # volta para o buffer o que não foi substituído por algo mais novo
+                with self._lock:
+                    for ativo_id, estado in lote.items():
+                        self._pendentes[ativo_id] = _mais_novo(estado, self._pendentes.get(ativo_id))
+                return 0
+            finally:
+                with self._lock:
+                    self._gravando = {}
+
+            self.flushes += 1
+            self.gravadas += len(lote)
+            return len(lote)
+
+    def _loop(self):
+        while not self._parar.is_set():
+            self._parar.wait(self.intervalo_flush)
+            self.flush()
+
+    def encerrar(self):
+        self._parar.set()
+        self.flush()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "pendentes": len(self._pendentes),
+            "recebidas": self.recebidas,
+            "repetidas": self.repetidas,
+            "coalescidas": self.coalescidas,
+            "gravadas": self.gravadas,
+            "flushes": self.flushes,
+            "falhas": self.falhas,
+        }
+
+
+def iniciar_estado(app):
+    """Inicia (uma vez por processo) o buffer write-behind do estado dos ativos."""
+    global _buffer
+
+    if _buffer is not None:
+        return _buffer
+
+    if not app.config.get("TELEMETRIA_ESTADO", True):
+        print(">>> Estado dos ativos gravado direto (TELEMETRIA_ESTADO=0).")
+        return None
+
+    _buffer = BufferEstado(app, intervalo_flush=app.config.get("TELEMETRIA_ESTADO_FLUSH", 2))
+    _buffer.iniciar()
+    return _buffer
+
+
+def atualizar_estado(ativo, telemetria: Dict[str, Any]) -> bool:
+    """
+    Aplica a amostra no estado do ativo. Retorna False quando a amostra já
+    foi processada (mesmo servertime). Com o buffer ativo não há I/O no
+    banco; sem ele, o Ativo fica alterado na sessão até confirmar_estado().
+    """
+    if _buffer is not None:
+        return _buffer.aplicar(ativo, telemetria)
+
+    alterado = aplicar_amostra(ativo, telemetria)
+    if alterado:
+        _aplicar_posicao(ativo, telemetria)
+    return alterado
+
+
+def confirmar_estado():
+    """Sem write-behind, grava o que atualizar_estado() alterou na sessão."""
+    if _buffer is not None or not db.session.dirty:
+        return
+
+    ativo_ids = [obj.id for obj in db.session.dirty if isinstance(obj, Ativo)]
+    try:
+        db.session.flush()
+        atualizar_faltam(db.session, ativo_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def estatisticas_estado():
+    return _buffer.estatisticas() if _buffer else None
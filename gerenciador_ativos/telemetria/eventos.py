@@ -0,0 +1,72 @@
+"""
+Notificações em processo para os streams (SSE) do painel.
+
+Cada "canal" tem um número de versão que sobe a cada mudança:
+
+- ("telemetria", imei): nova amostra (servertime diferente) no snapshot
+- ("plano", ativo_id): item do plano criado/excluído ou offset alterado
+
+Cada espera registra um Event só nos canais que lhe interessam; publicar
+num canal acorda apenas quem espera nele (um painel não é acordado pela
+telemetria de outro barco). A BrasilSat continua sendo consultada só
+pelo poller, não importa quantas telas estejam abertas.
+"""
+
+import threading
+from typing import Dict, Hashable, Optional, Set
+
+
+class Notificador:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versoes: Dict[Hashable, int] = {}
+        self._esperas: Dict[Hashable, Set[threading.Event]] = {}
+
+    def publicar(self, canal: Hashable) -> None:
+        with self._lock:
+            self._versoes[canal] = self._versoes.get(canal, 0) + 1
+            for evento in self._esperas.get(canal, ()):
+                evento.set()
+
+    def versao(self, canal: Hashable) -> int:
+        return self._versoes.get(canal, 0)
+
+    def _mudou(self, conhecidas: Dict[Hashable, int]) -> bool:
+        return any(self._versoes.get(c, 0) != v for c, v in conhecidas.items())
+
+    def aguardar(self, conhecidas: Dict[Hashable, int], timeout: float) -> bool:
+        """
+        Bloqueia até algum canal de `conhecidas` mudar de versão ou o
+        timeout acabar. Retorna True se houve mudança.
+        """
+        evento = threading.Event()
+        with self._lock:
+            if self._mudou(conhecidas):
+                return True
+            for canal in conhecidas:
+                self._esperas.setdefault(canal, set()).add(evento)
+
+        try:
+            # só publicar() num destes canais seta o Event
+            evento.wait(timeout)
+        finally:
+            with self._lock:
+                for canal in conhecidas:
+                    esperas = self._esperas.get(canal)
+                    if esperas is not None:
+                        esperas.discard(evento)
+                        if not esperas:
+                            del self._esperas[canal]
+
+        return self._mudou(conhecidas)
+
+
+notificador = Notificador()
+
+
+def canal_telemetria(imei: Optional[str]):
+    return ("telemetria", imei)
+
+
+def canal_plano(ativo_id: int):
+    return ("plano", ativo_id)
@@ -0,0 +1,204 @@
+"""
+Gravação do histórico de telemetria (tabela telemetria_amostras).
+
+As amostras não são gravadas dentro das requisições: entram em um buffer
+em memória e uma thread descarrega o buffer em INSERTs de várias linhas
+a cada TELEMETRIA_HISTORICO_FLUSH segundos (ou quando o buffer atinge
+TELEMETRIA_HISTORICO_LOTE linhas), além de uma última vez no desligamento.
+
+Amostras com o mesmo servertime de um ativo são descartadas no buffer e,
+se mesmo assim chegarem ao banco, pelo ON CONFLICT DO NOTHING da chave
+(ativo_id, servertime).
+"""
+
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from gerenciador_ativos.extensions import db
+from gerenciador_ativos.telemetria_models import TelemetriaAmostra
+
+logger = logging.getLogger(__name__)
+
+_buffer = None
+
+
+def _to_float_or_none(v):
+    try:
+        return float(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def ler_instante(valor, padrao, fuso=timezone.utc):
+    """de/ate das consultas ao histórico: epoch (s) ou data ISO (em `fuso` se sem fuso)."""
+    if not valor:
+        return padrao
+    try:
+        return int(float(valor))
+    except ValueError:
+        pass
+    dt = datetime.fromisoformat(valor)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=fuso)
+    return int(dt.timestamp())
+
+
+def amostra_para_linha(ativo_id: int, telemetria: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Converte a telemetria normalizada em linha de telemetria_amostras."""
+    servertime = _to_float_or_none(telemetria.get("servertime"))
+    if servertime is None:
+        return None
+
+    return {
+        "ativo_id": ativo_id,
+        "servertime": int(servertime),
+        "motor_ligado": bool(telemetria.get("motor_ligado")),
+        "acctime_s": _to_float_or_none(telemetria.get("acctime_s")),
+        "tensao_bateria": _to_float_or_none(telemetria.get("tensao_bateria")),
+        "latitude": _to_float_or_none(telemetria.get("latitude")),
+        "longitude": _to_float_or_none(telemetria.get("longitude")),
+        "velocidade": _to_float_or_none(telemetria.get("velocidade")),
+        "direcao": _to_float_or_none(telemetria.get("direcao")),
+    }
+
+
+def _insert_ignorando_duplicados(engine):
+    tabela = TelemetriaAmostra.__table__
+
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(tabela).on_conflict_do_nothing(
+            index_elements=["ativo_id", "servertime"]
+        )
+    if engine.dialect.name == "sqlite":
+        return sqlite.insert(tabela).on_conflict_do_nothing(
+            index_elements=["ativo_id", "servertime"]
+        )
+
+    return tabela.insert()
+
+
+class BufferHistorico:
+    def __init__(self, app, tamanho_lote: int, intervalo_flush: float):
+        self.app = app
+        self.tamanho_lote = max(1, int(tamanho_lote))
+        self.intervalo_flush = max(0.5, float(intervalo_flush))
+
+        self._lock = threading.Lock()
+        self._linhas: List[Dict[str, Any]] = []
+        # último servertime visto por ativo (descarta repetidos sem ir ao banco)
+        self._ultimo_servertime: Dict[int, int] = {}
+        self._cheio = threading.Event()
+        self._parar = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+        self.recebidas = 0
+        self.duplicadas = 0
+        self.enviadas = 0
+        self.flushes = 0
+        self.falhas = 0
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._loop, name="telemetria-historico", daemon=True)
+        self._thread.start()
+        atexit.register(self.encerrar)
+
+    def adicionar(self, ativo_id: int, telemetria: Dict[str, Any]) -> bool:
+        linha = amostra_para_linha(ativo_id, telemetria)
+        if linha is None:
+            return False
+
+        with self._lock:
+            self.recebidas += 1
+            ultimo = self._ultimo_servertime.get(ativo_id)
+            if ultimo is not None and linha["servertime"] <= ultimo:
+                self.duplicadas += 1
+                return False
+
+            self._ultimo_servertime[ativo_id] = linha["servertime"]
+            self._linhas.append(linha)
+            if len(self._linhas) >= self.tamanho_lote:
+                self._cheio.set()
+
+        return True
+
+    def flush(self) -> int:
+        """Grava o conteúdo do buffer em lotes de INSERT multi-linha."""
+        with self._flush_lock:
+            with self._lock:
+                linhas, self._linhas = self._linhas, []
+                self._cheio.clear()
+
+            if not linhas:
+                return 0
+
+            with self.app.app_context():
+                stmt = _insert_ignorando_duplicados(db.engine)
+                try:
+                    with db.engine.begin() as conn:
+                        for i in range(0, len(linhas), self.tamanho_lote):
+                            conn.execute(stmt, linhas[i:i + self.tamanho_lote])
+                except Exception:
+                    self.falhas += 1
+                    logger.exception(f"[HISTORICO] falha ao gravar {len(linhas)} amostras")
+                    return 0
+
+            self.flushes += 1
+            self.enviadas += len(linhas)
+            return len(linhas)
+
+    def _loop(self):
+        while not self._parar.is_set():
+            self._cheio.wait(self.intervalo_flush)
+            self.flush()
+
+    def encerrar(self):
+        self._parar.set()
+        self._cheio.set()
+        self.flush()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "pendentes": len(self._linhas),
+            "recebidas": self.recebidas,
+            "duplicadas": self.duplicadas,
+            "enviadas": self.enviadas,
+            "flushes": self.flushes,
+            "falhas": self.falhas,
+        }
+
+
+def iniciar_historico(app):
+    """Inicia (uma vez por processo) o buffer do histórico de telemetria."""
+    global _buffer
+
+    if _buffer is not None:
+        return _buffer
+
+    if not app.config.get("TELEMETRIA_HISTORICO", True):
+        print(">>> Histórico de telemetria desativado (TELEMETRIA_HISTORICO=0).")
+        return None
+
+    _buffer = BufferHistorico(
+        app,
+        tamanho_lote=app.config.get("TELEMETRIA_HISTORICO_LOTE", 500),
+        intervalo_flush=app.config.get("TELEMETRIA_HISTORICO_FLUSH", 5),
+    )
+    _buffer.iniciar()
+    return _buffer
+
+
+def registrar_amostra(ativo_id: int, telemetria: Dict[str, Any]) -> bool:
+    """Enfileira a amostra para o histórico (não faz I/O no banco)."""
+    if _buffer is None:
+        return False
+    return _buffer.adicionar(ativo_id, telemetria)
+
+
+def estatisticas_historico():
+    return _buffer.estatisticas() if _buffer else None
@@ -0,0 +1,110 @@
+"""
+Motor de horímetro: horas de motor e horas paradas a partir das amostras.
+
+O resultado não depende de quantas vezes a telemetria é consultada:
+
+- horas de motor: soma dos deltas do contador acumulado `acctime` da
+  BrasilSat entre duas amostras (com detecção de reset do contador);
+- horas paradas: tempo de relógio (servertime) desde que o motor
+  desligou. O instante do desligamento é estimado pelo próprio acctime:
+  se o motor rodou N segundos depois da amostra anterior, ele desligou
+  em servertime_anterior + N.
+
+Uma amostra com servertime igual ou anterior ao último processado é
+ignorada, então consultar de 10 em 10 segundos ou de 10 em 10 minutos
+leva ao mesmo horímetro.
+
+Estado guardado no Ativo:
+  horas_sistema, horas_paradas, ultimo_estado_motor, total_ignicoes,
+  ultima_atualizacao (servertime), ultimo_acctime_s, motor_desligado_em
+"""
+
+from typing import Any, Dict, Optional
+
+
+def _to_float_or_none(v) -> Optional[float]:
+    try:
+        return float(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def delta_acctime(anterior: Optional[float], atual: float, decorrido: Optional[float]) -> float:
+    """
+    Segundos de motor ligado entre duas leituras do contador acctime.
+
+    - primeira leitura (anterior None): 0, apenas vira referência
+    - contador voltou (reset do rastreador): conta o valor atual,
+      que é o que rodou desde o reset
+    - nunca mais que o tempo de relógio decorrido entre as amostras
+    """
+    if anterior is None:
+        return 0.0
+
+    if atual >= anterior:
+        delta = atual - anterior
+    else:
+        delta = atual
+
+    if decorrido is not None:
+        delta = min(delta, max(0.0, decorrido))
+
+    return max(0.0, delta)
+
+
+def aplicar_amostra(ativo, telemetria: Dict[str, Any]) -> bool:
+    """
+    Atualiza o estado de horímetro do `ativo` com a amostra normalizada.
+
+    Retorna False (sem alterar nada) quando a amostra não tem servertime
+    ou já foi processada; o commit fica a cargo de quem chamou.
+    """
+    servertime = _to_float_or_none(telemetria.get("servertime"))
+    if servertime is None:
+        return False
+
+    st_anterior = _to_float_or_none(ativo.ultima_atualizacao)
+    if st_anterior is not None and servertime <= st_anterior:
+        return False
+
+    motor_ligado = bool(telemetria.get("motor_ligado"))
+    estado_ant = ativo.ultimo_estado_motor or 0
+    acctime = _to_float_or_none(telemetria.get("acctime_s")) or 0.0
+
+    decorrido = (servertime - st_anterior) if st_anterior is not None else None
+    delta = delta_acctime(_to_float_or_none(ativo.ultimo_acctime_s), acctime, decorrido)
+
+    # -------------------------
+    # HORAS MOTOR
+    # -------------------------
+    ativo.horas_sistema = float(ativo.horas_sistema or 0.0) + delta / 3600.0
+
+    # -------------------------
+    # IGNIÇÕES
+    # (também conta o liga/desliga ocorrido inteiro entre duas amostras)
+    # -------------------------
+    if estado_ant == 0 and (motor_ligado or delta > 0):
+        ativo.total_ignicoes = (ativo.total_ignicoes or 0) + 1
+
+    # -------------------------
+    # HORAS PARADAS
+    # -------------------------
+    if motor_ligado:
+        ativo.motor_desligado_em = None
+        ativo.horas_paradas = 0.0
+    else:
+        if ativo.motor_desligado_em is None or delta > 0:
+            if st_anterior is None:
+                # sem histórico: começa a contar a partir desta amostra
+                desligou_em = servertime
+            else:
+                # desligou depois de rodar `delta` segundos desde a amostra anterior
+                desligou_em = min(servertime, st_anterior + delta)
+            ativo.motor_desligado_em = int(desligou_em)
+
+        ativo.horas_paradas = max(0.0, servertime - ativo.motor_desligado_em) / 3600.0
+
+    ativo.ultimo_estado_motor = 1 if motor_ligado else 0
+    ativo.ultimo_acctime_s = acctime
+    ativo.ultima_atualizacao = int(servertime)
+    return True
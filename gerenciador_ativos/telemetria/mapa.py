@@ -0,0 +1,221 @@
+"""
+Posições da frota para o mapa do gerente.
+
+Nada aqui chama a BrasilSat: a posição de cada ativo monitorado vem do
+banco (latitude/longitude gravadas pelo estado) e, quando há amostra mais
+nova no snapshot do poller, do snapshot.
+
+As posições ficam num índice em grade (células de GRADE_GRAUS graus) que
+é refeito no máximo a cada MAPA_FROTA_TTL segundos. Uma consulta percorre
+só as células que cruzam o retângulo visível (bbox) e agrupa os pontos:
+
+- zoom < MAPA_ZOOM_PONTOS: um cluster por célula de tela (~CLUSTER_PX
+  pixels no zoom pedido), com contagem e quantos estão com motor ligado;
+- zoom >= MAPA_ZOOM_PONTOS (ou cluster de um ativo só): o ponto do ativo.
+
+A resposta é um GeoJSON enxuto: coordenadas com 5 casas e propriedades
+de uma letra (ver feature_ponto / feature_cluster).
+"""
+
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from gerenciador_ativos.banco import executar_leitura
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.telemetria.snapshot import snapshot
+
+# lado das células do índice, em graus
+GRADE_GRAUS = 1.0
+# tamanho aproximado (px) de um cluster na tela
+CLUSTER_PX = 64
+
+
+class Posicao:
+    __slots__ = ("ativo_id", "nome", "lat", "lon", "motor", "servertime")
+
+    def __init__(self, ativo_id, nome, lat, lon, motor, servertime):
+        self.ativo_id = ativo_id
+        self.nome = nome
+        self.lat = lat
+        self.lon = lon
+        self.motor = motor
+        self.servertime = servertime
+
+
+def _celula(lat: float, lon: float, lado: float) -> Tuple[int, int]:
+    return int(math.floor(lon / lado)), int(math.floor(lat / lado))
+
+
+def _coordenada_valida(lat, lon) -> bool:
+    if lat is None or lon is None:
+        return False
+    # 0,0 é o que o rastreador manda antes do primeiro fix de GPS
+    if lat == 0 and lon == 0:
+        return False
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+class IndiceFrota:
+    """Grade lat/lon -> posições, refeita a partir do banco + snapshot."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._celulas: Dict[Tuple[int, int], List[Posicao]] = {}
+        self._total = 0
+        self._montado_em = 0.0
+
+    def _montar(self):
+        linhas = executar_leitura(
+            select(
+                Ativo.id, Ativo.nome, Ativo.imei,
+                Ativo.latitude, Ativo.longitude,
+                Ativo.ultimo_estado_motor, Ativo.ultima_atualizacao,
+            )
+            .where(Ativo.ativo.is_(True))
+        ).all()
+
+        celulas: Dict[Tuple[int, int], List[Posicao]] = {}
+        total = 0
+        for ativo_id, nome, imei, lat, lon, motor, servertime in linhas:
+            amostra = snapshot.obter(imei.strip()) if imei else None
+            if amostra is not None:
+                tele = amostra.telemetria
+                st = tele.get("servertime")
+                if st is not None and (servertime is None or st >= servertime):
+                    lat = tele.get("latitude")
+                    lon = tele.get("longitude")
+                    motor = 1 if tele.get("motor_ligado") else 0
+                    servertime = st
+
+            if not _coordenada_valida(lat, lon):
+                continue
+
+            pos = Posicao(ativo_id, nome, float(lat), float(lon), int(motor or 0), servertime)
+            celulas.setdefault(_celula(pos.lat, pos.lon, GRADE_GRAUS), []).append(pos)
+            total += 1
+
+        self._celulas = celulas
+        self._total = total
+        self._montado_em = time.time()
+
+    def _atualizar(self):
+        if time.time() - self._montado_em < self.ttl:
+            return
+        with self._lock:
+            if time.time() - self._montado_em >= self.ttl:
+                self._montar()
+
+    def invalidar(self):
+        self._montado_em = 0.0
+
+    def consultar(self, bbox: Optional[Tuple[float, float, float, float]]) -> List[Posicao]:
+        """Posições dentro de bbox = (oeste, sul, leste, norte); None = todas."""
+        self._atualizar()
+        celulas = self._celulas
+
+        if bbox is None:
+            return [p for lista in celulas.values() for p in lista]
+
+        oeste, sul, leste, norte = bbox
+        # bbox que cruza o antimeridiano: duas faixas de longitude
+        faixas = [(oeste, leste)] if oeste <= leste else [(oeste, 180.0), (-180.0, leste)]
+
+        resultado = []
+        for lon_min, lon_max in faixas:
+            x0, y0 = _celula(sul, lon_min, GRADE_GRAUS)
+            x1, y1 = _celula(norte, lon_max, GRADE_GRAUS)
+
+            if (x1 - x0 + 1) * (y1 - y0 + 1) > len(celulas):
+                # viewport maior que a frota: mais barato varrer as células existentes
+                chaves = [c for c in celulas if x0 <= c[0] <= x1 and y0 <= c[1] <= y1]
+            else:
+                chaves = [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+            for chave in chaves:
+                for p in celulas.get(chave, ()):
+                    if sul <= p.lat <= norte and lon_min <= p.lon <= lon_max:
+                        resultado.append(p)
+
+        return resultado
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+
+def _lado_cluster(zoom: int) -> float:
+    """Graus de longitude equivalentes a CLUSTER_PX pixels no zoom (tiles de 256px)."""
+    return 360.0 / (256 * 2 ** zoom) * CLUSTER_PX
+
+
+def feature_ponto(p: Posicao) -> dict:
+    # i = id do ativo, n = nome, m = motor ligado (0/1), t = servertime
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(p.lon, 5), round(p.lat, 5)]},
+        "properties": {"i": p.ativo_id, "n": p.nome, "m": p.motor, "t": p.servertime},
+    }
+
+
+def feature_cluster(lat: float, lon: float, qtd: int, ligados: int) -> dict:
+    # c = quantidade de ativos, m = quantos com motor ligado
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(lon, 5), round(lat, 5)]},
+        "properties": {"c": qtd, "m": ligados},
+    }
+
+
+def agrupar(posicoes: List[Posicao], zoom: int, zoom_pontos: int) -> List[dict]:
+    """Features do GeoJSON: pontos no zoom alto, clusters por célula no zoom baixo."""
+    if zoom >= zoom_pontos:
+        return [feature_ponto(p) for p in posicoes]
+
+    lado = _lado_cluster(zoom)
+    grupos: Dict[Tuple[int, int], List[Posicao]] = {}
+    for p in posicoes:
+        grupos.setdefault(_celula(p.lat, p.lon, lado), []).append(p)
+
+    features = []
+    for membros in grupos.values():
+        if len(membros) == 1:
+            features.append(feature_ponto(membros[0]))
+            continue
+
+        # centro do cluster = média das posições (o marcador fica sobre os barcos)
+        lat = sum(p.lat for p in membros) / len(membros)
+        lon = sum(p.lon for p in membros) / len(membros)
+        ligados = sum(p.motor for p in membros)
+        features.append(feature_cluster(lat, lon, len(membros), ligados))
+
+    return features
+
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def indice_frota(ttl: float) -> IndiceFrota:
+    global _indice
+    if _indice is None:
+        with _indice_lock:
+            if _indice is None:
+                _indice = IndiceFrota(ttl)
+    return _indice
+
+
+def posicoes_frota(bbox, zoom: int, ttl: float, zoom_pontos: int) -> dict:
+    """FeatureCollection da frota dentro do bbox, agrupada para o zoom."""
+    indice = indice_frota(ttl)
+    visiveis = indice.consultar(bbox)
+    return {
+        "type": "FeatureCollection",
+        "features": agrupar(visiveis, zoom, zoom_pontos),
+        "total": indice.total,
+        "visiveis": len(visiveis),
+    }
@@ -0,0 +1,160 @@
+"""
+Poller de telemetria: atualiza a frota ativa em segundo plano.
+
+A cada TELEMETRIA_INTERVALO segundos busca todos os ativos com
+`ativo == True` e IMEI cadastrado, consulta a BrasilSat em lote
+(get_telemetria_por_imeis), grava o resultado no snapshot, enfileira
+as amostras para o histórico e avança o horímetro de cada ativo
+(gravado em lote pelo buffer de estado).
+"""
+
+import logging
+import threading
+import time
+
+from gerenciador_ativos.api.monitoramento import brasilsat
+from gerenciador_ativos.api.monitoramento.brasilsat import (
+    get_telemetria_por_imeis,
+    BrasilSatError,
+)
+from gerenciador_ativos.api.monitoramento.brasilsat_async import (
+    aiohttp_disponivel,
+    buscar_frota,
+)
+from gerenciador_ativos.models import Ativo
+from gerenciador_ativos.telemetria.snapshot import snapshot
+from gerenciador_ativos.telemetria.historico import registrar_amostra
+from gerenciador_ativos.telemetria.estado import atualizar_estado, confirmar_estado
+
+logger = logging.getLogger(__name__)
+
+_poller = None
+
+
+class PollerTelemetria:
+    def __init__(self, app, intervalo: float, usar_async: bool = False, concorrencia: int = 10):
+        self.app = app
+        self.intervalo = max(1.0, float(intervalo))
+        # lotes em paralelo num event loop (aiohttp) em vez de um a um
+        self.usar_async = usar_async and aiohttp_disponivel()
+        self.concorrencia = concorrencia
+        self._parar = threading.Event()
+        self._thread = None
+
+        self.ciclos = 0
+        self.falhas = 0
+        self.ultimo_ciclo_em = None
+        self.ultimo_ciclo_duracao = None
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._loop, name="telemetria-poller", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _frota_ativa(self):
+        """Pares (ativo_id, imei) dos ativos monitorados."""
+        with self.app.app_context():
+            linhas = (
+                Ativo.query
+                .with_entities(Ativo.id, Ativo.imei)
+                .filter(Ativo.ativo.is_(True), Ativo.imei.isnot(None), Ativo.imei != "")
+                .all()
+            )
+        return [(ativo_id, imei.strip()) for ativo_id, imei in linhas]
+
+    def executar_ciclo(self):
+        inicio = time.time()
+
+        frota = self._frota_ativa()
+        if frota:
+            imeis = [imei for _, imei in frota]
+            if self.usar_async:
+                telemetrias, ausentes = buscar_frota(imeis, concorrencia=self.concorrencia)
+            else:
+                telemetrias, ausentes = get_telemetria_por_imeis(imeis)
+            for imei, telemetria in telemetrias.items():
+                snapshot.registrar(imei, telemetria)
+
+            por_ativo = {}
+            for ativo_id, imei in frota:
+                telemetria = telemetrias.get(imei)
+                if telemetria:
+                    registrar_amostra(ativo_id, telemetria)
+                    por_ativo[ativo_id] = telemetria
+
+            self._atualizar_horimetros(por_ativo)
+
+            if ausentes:
+                logger.info(f"[POLLER] {len(ausentes)} IMEIs sem telemetria neste ciclo")
+
+        self.ciclos += 1
+        self.ultimo_ciclo_em = inicio
+        self.ultimo_ciclo_duracao = time.time() - inicio
+
+    def _atualizar_horimetros(self, por_ativo):
+        """Aplica as amostras no horímetro dos ativos (gravação pelo buffer de estado)."""
+        if not por_ativo:
+            return
+
+        with self.app.app_context():
+            ativos = Ativo.query.filter(Ativo.id.in_(list(por_ativo))).all()
+
+            for ativo in ativos:
+                atualizar_estado(ativo, por_ativo[ativo.id])
+
+            confirmar_estado()
+
+    def _loop(self):
+        while not self._parar.is_set():
+            try:
+                self.executar_ciclo()
+            except BrasilSatError as exc:
+                self.falhas += 1
+                logger.warning(f"[POLLER] falha ao atualizar a frota: {exc}")
+            except Exception:
+                self.falhas += 1
+                logger.exception("[POLLER] erro inesperado no ciclo de telemetria")
+
+            self._parar.wait(self.intervalo)
+
+    def estatisticas(self):
+        return {
+            "intervalo_s": self.intervalo,
+            "async": self.usar_async,
+            "ciclos": self.ciclos,
+            "falhas": self.falhas,
+            "ultimo_ciclo_em": self.ultimo_ciclo_em,
+            "ultimo_ciclo_duracao_s": self.ultimo_ciclo_duracao,
+        }
+
+
+def iniciar_poller(app):
+    """Inicia (uma vez por processo) o poller configurado em `app.config`."""
+    global _poller
+
+    if _poller is not None:
+        return _poller
+
+    if not app.config.get("TELEMETRIA_POLLER", True):
+        print(">>> Poller de telemetria desativado (TELEMETRIA_POLLER=0).")
+        return None
+
+    if not brasilsat.ACCOUNT or not brasilsat.PASSWORD:
+        print(">>> Poller de telemetria não iniciado: credenciais BrasilSat ausentes.")
+        return None
+
+    _poller = PollerTelemetria(
+        app,
+        app.config.get("TELEMETRIA_INTERVALO", 30),
+        usar_async=app.config.get("TELEMETRIA_POLLER_ASYNC", False),
+        concorrencia=app.config.get("TELEMETRIA_POLLER_CONCORRENCIA", 10),
+    )
+    _poller.iniciar()
+    print(f">>> Poller de telemetria iniciado (intervalo {_poller.intervalo:.0f}s).")
+    return _poller
+
+
+def estatisticas_poller():
+    return _poller.estatisticas() if _poller else None
@@ -0,0 +1,207 @@
+"""
+Serviço único de telemetria por ativo.
+
+Todas as URLs que entregam telemetria de um ativo passam por aqui:
+
+- /api/ativos/<id>/dados                 -> formato "v2" (painel) ou ?formato=
+- /api/ativos/<id>/dados-v2              -> formato "v1" (URL antiga, formato fixo)
+- /api/ativos/<id>/painel e o stream SSE -> formato "v2"
+- /api/monitoramento/<id>/dados          -> formato "monitoramento"
+
+ler_ativo() faz a busca (snapshot, single-flight), registra a amostra no
+histórico e aplica o horímetro uma vez só (a gravação é write-behind); o
+resultado fica em flask.g, então vários formatos na mesma requisição
+reaproveitam a mesma leitura. Os formatos são só serialização.
+"""
+
+import logging
+import time
+
+from flask import g, has_app_context
+
+from gerenciador_ativos.telemetria.estado import atualizar_estado, confirmar_estado
+from gerenciador_ativos.telemetria.historico import registrar_amostra
+from gerenciador_ativos.telemetria.snapshot import obter_telemetria
+
+logger = logging.getLogger(__name__)
+
+FORMATO_PADRAO = "v2"
+
+
+class LeituraAtivo:
+    """Amostra aplicada ao ativo: base comum de todos os formatos."""
+
+    __slots__ = ("ativo", "amostra", "alterado")
+
+    def __init__(self, ativo, amostra, alterado):
+        self.ativo = ativo
+        self.amostra = amostra
+        self.alterado = alterado
+
+    @property
+    def telemetria(self):
+        return self.amostra.telemetria if self.amostra else {}
+
+
+# ============================================================
+#   LEITURA (busca + normalização + estado)
+# ============================================================
+
+def aplicar_leitura(ativo, amostra):
+    """
+    Registra a amostra no histórico e aplica no estado do ativo
+    (horímetro, posição, tensão). A gravação fica com o buffer
+    write-behind (telemetria/estado.py); amostra repetida não grava nada.
+    """
+    tele = amostra.telemetria
+    registrar_amostra(ativo.id, tele)
+
+    alterado = atualizar_estado(ativo, tele)
+
+    if alterado:
+        try:
+            confirmar_estado()
+        except Exception as e:
+            logger.error(f"[TELEMETRIA] erro ao salvar ativo {ativo.id}: {e}")
+
+    return LeituraAtivo(ativo, amostra, alterado)
+
+
+def ler_ativo(ativo, forcar=False):
+    """
+    Leitura do ativo, uma por requisição. Levanta BrasilSatError se a
+    busca ao vivo falhar; sem IMEI devolve leitura sem amostra.
+    """
+    cache = g.setdefault("_leituras_telemetria", {}) if has_app_context() else {}
+    leitura = cache.get(ativo.id)
+    if leitura is not None and not forcar:
+        return leitura
+
+    if not ativo.imei:
+        leitura = LeituraAtivo(ativo, None, False)
+    else:
+        leitura = aplicar_leitura(ativo, obter_telemetria(ativo.imei, forcar=forcar))
+
+    cache[ativo.id] = leitura
+    return leitura
+
+
+# ============================================================
+#   FORMATOS DE RESPOSTA
+# ============================================================
+
+def _amostra_meta(leitura, agora):
+    amostra = leitura.amostra
+    return {
+        # idade da amostra no snapshot (s) e de onde ela veio
+        "amostra_idade_s": round(amostra.idade(agora), 1) if amostra else None,
+        "amostra_origem": amostra.origem if amostra else None,
+    }
+
+
+def formato_v1(leitura):
+    """Formato antigo do horímetro (lancha): horas já somadas ao offset."""
+    ativo = leitura.ativo
+    tele = leitura.telemetria
+    agora = time.time()
+
+    offset = float(ativo.horas_offset or 0.0)
+    horas_totais = float(ativo.horas_sistema or 0.0) + offset
+
+    resposta = {
+        "id": ativo.id,
+        "nome": ativo.nome,
+        "imei": ativo.imei,
+
+        "monitor_online": leitura.amostra is not None,
+        "motor_ligado": bool(tele.get("motor_ligado")),
+
+        "tensao_bateria": tele.get("tensao_bateria"),
+        "servertime": tele.get("servertime") or agora,
+
+        "latitude": tele.get("latitude"),
+        "longitude": tele.get("longitude"),
+
+        # HORÍMETRO FORMATO ANTIGO
+        "horas_totais": round(horas_totais, 2),
+        "offset": round(offset, 2),
+        "horimetro": round(horas_totais, 2),
+
+        # PARADAS
+        "horas_paradas": round(float(ativo.horas_paradas or 0.0), 2),
+
+        # CAMPOS USADOS NA V1
+        "unidade_base": "horas",
+        "medida_base": "h",
+    }
+    resposta.update(_amostra_meta(leitura, agora))
+    return resposta
+
+
+def formato_v2(leitura):
+    """Formato do painel (/dados, /painel e stream SSE)."""
+    ativo = leitura.ativo
+    tele = leitura.telemetria
+
+    horas_motor = ativo.horas_sistema or 0.0
+    offset = ativo.horas_offset or 0
+
+    resposta = {
+        "ativo_id": ativo.id,
+        "nome": ativo.nome,
+        "categoria": ativo.categoria,
+        "imei": ativo.imei,
+
+        "motor_ligado": bool(tele.get("motor_ligado")),
+        "tensao_bateria": tele.get("tensao_bateria"),
+        "servertime": tele.get("servertime"),
+
+        "horas_motor": horas_motor,
+        "offset": offset,
+        "horas_embarcacao": offset + horas_motor,
+        "horas_paradas": ativo.horas_paradas or 0.0,
+        "horas_totais": horas_motor,
+
+        "latitude": tele.get("latitude"),
+        "longitude": tele.get("longitude"),
+        "velocidade": tele.get("velocidade"),
+        "direcao": tele.get("direcao"),
+
+        "ignicoes": ativo.total_ignicoes or 0,
+        "unidade_base": ativo.categoria or "h",
+    }
+    resposta.update(_amostra_meta(leitura, time.time()))
+    return resposta
+
+
+def formato_monitoramento(leitura):
+    """Formato de /api/monitoramento/<id>/dados (telemetria do rastreador)."""
+    tele = leitura.telemetria
+
+    return {
+        "imei": tele.get("imei") or leitura.ativo.imei,
+        "motor_ligado": tele.get("motor_ligado") or False,
+        # horas do contador do rastreador (acctime), sem o horímetro do sistema
+        "horas_motor": round(tele.get("horas_motor") or 0, 2),
+        "tensao_bateria": tele.get("tensao_bateria"),
+        "latitude": tele.get("latitude"),
+        "longitude": tele.get("longitude"),
+        "velocidade": tele.get("velocidade"),
+        "direcao": tele.get("direcao"),
+        "servertime": tele.get("servertime"),
+    }
+
+
+FORMATOS = {
+    "v1": formato_v1,
+    "v2": formato_v2,
+    "monitoramento": formato_monitoramento,
+}
+
+
+def serializar(leitura, formato=FORMATO_PADRAO):
+    """Serializa a leitura no formato pedido (ValueError se não existir)."""
+    try:
+        return FORMATOS[formato](leitura)
+    except KeyError:
+        raise ValueError(f"formato desconhecido: {formato}") from None
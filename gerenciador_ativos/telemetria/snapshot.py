@@ -0,0 +1,108 @@
+"""
+Snapshot em memória da última telemetria de cada IMEI.
+
+Os endpoints /dados leem daqui (milissegundos) em vez de chamar a BrasilSat
+dentro da thread do waitress. O poller (telemetria/poller.py) mantém o
+snapshot atualizado; quando a amostra não existe ou está velha demais, a
+busca ao vivo é feita uma única vez por IMEI, mesmo com vários painéis
+abertos no mesmo ativo.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from gerenciador_ativos.api.monitoramento.brasilsat import get_telemetria_por_imei
+from gerenciador_ativos.telemetria.eventos import notificador, canal_telemetria
+
+
+class Amostra:
+    """Telemetria normalizada + momento em que foi coletada localmente."""
+
+    __slots__ = ("imei", "telemetria", "coletado_em", "origem")
+
+    def __init__(self, imei: str, telemetria: Dict[str, Any], coletado_em: float, origem: str):
+        self.imei = imei
+        self.telemetria = telemetria
+        self.coletado_em = coletado_em
+        self.origem = origem
+
+    def idade(self, agora: Optional[float] = None) -> float:
+        return max(0.0, (agora or time.time()) - self.coletado_em)
+
+
+class SnapshotTelemetria:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._amostras: Dict[str, Amostra] = {}
+        # um lock por IMEI para a busca ao vivo (single-flight)
+        self._locks_busca: Dict[str, threading.Lock] = {}
+        # mantido a cada registro, para o painel gerencial não varrer a frota
+        self.motores_ligados = 0
+
+    def registrar(self, imei: str, telemetria: Dict[str, Any], origem: str = "poller") -> Amostra:
+        amostra = Amostra(imei, telemetria, time.time(), origem)
+        with self._lock:
+            anterior = self._amostras.get(imei)
+            self._amostras[imei] = amostra
+            self.motores_ligados += bool(telemetria.get("motor_ligado")) - bool(
+                anterior is not None and anterior.telemetria.get("motor_ligado")
+            )
+
+        # avisa os streams do painel só quando a amostra é realmente nova
+        if anterior is None or anterior.telemetria.get("servertime") != telemetria.get("servertime"):
+            notificador.publicar(canal_telemetria(imei))
+
+        return amostra
+
+    def obter(self, imei: str) -> Optional[Amostra]:
+        return self._amostras.get(imei)
+
+    def resumo(self) -> Dict[str, int]:
+        return {"imeis": len(self._amostras), "motores_ligados": self.motores_ligados}
+
+    def _lock_busca(self, imei: str) -> threading.Lock:
+        with self._lock:
+            lock = self._locks_busca.get(imei)
+            if lock is None:
+                lock = self._locks_busca[imei] = threading.Lock()
+            return lock
+
+    def obter_ou_buscar(self, imei: str, idade_max: float, forcar: bool = False) -> Amostra:
+        """
+        Devolve a amostra do snapshot se ela tiver no máximo `idade_max`
+        segundos; senão (ou com forcar=True) busca ao vivo na BrasilSat.
+
+        Lança BrasilSatError se a busca ao vivo falhar.
+        """
+        pedido_em = time.time()
+
+        if not forcar:
+            amostra = self.obter(imei)
+            if amostra and amostra.idade(pedido_em) <= idade_max:
+                return amostra
+
+        with self._lock_busca(imei):
+            # outra requisição pode ter buscado enquanto esperávamos
+            amostra = self.obter(imei)
+            if amostra and amostra.coletado_em >= pedido_em:
+                return amostra
+            if amostra and not forcar and amostra.idade() <= idade_max:
+                return amostra
+
+            telemetria = get_telemetria_por_imei(imei)
+            return self.registrar(imei, telemetria, origem="brasilsat")
+
+
+snapshot = SnapshotTelemetria()
+
+
+def obter_telemetria(imei: str, forcar: bool = False) -> Amostra:
+    """
+    Atalho usado pelos endpoints: lê o snapshot respeitando a idade
+    máxima configurada em TELEMETRIA_IDADE_MAX.
+    """
+    from flask import current_app
+
+    idade_max = float(current_app.config.get("TELEMETRIA_IDADE_MAX", 90))
+    return snapshot.obter_ou_buscar(imei, idade_max=idade_max, forcar=forcar)
@@ -0,0 +1,110 @@
+"""
+Trajeto de um ativo a partir do histórico (telemetria_amostras).
+
+Semanas de amostras de 30s não cabem no navegador ponto a ponto, então o
+caminho é simplificado com Douglas-Peucker numa tolerância que depende do
+zoom do mapa (TOLERANCIA_PX pixels na tela) e sai como polyline
+codificada no formato do Google (precisão 1e-5), que o Leaflet desenha
+direto depois de decodificar.
+
+Pontos repetidos (barco parado) são descartados antes da simplificação.
+"""
+
+import math
+from typing import Iterable, List, Tuple
+
+# desvio máximo aceito, em pixels de tela no zoom pedido
+TOLERANCIA_PX = 1.0
+
+Ponto = Tuple[float, float]  # (lat, lon)
+
+
+def tolerancia_graus(zoom: int) -> float:
+    """Graus de longitude equivalentes a TOLERANCIA_PX no zoom (tiles de 256px)."""
+    return 360.0 / (256 * 2 ** zoom) * TOLERANCIA_PX
+
+
+def _distancia_segmento(p: Ponto, a: Ponto, b: Ponto, escala_lon: float) -> float:
+    """Distância (graus) de p ao segmento ab, com a longitude corrigida pela latitude."""
+    px, py = p[1] * escala_lon, p[0]
+    ax, ay = a[1] * escala_lon, a[0]
+    bx, by = b[1] * escala_lon, b[0]
+
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return math.hypot(px - ax, py - ay)
+
+    t = ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def douglas_peucker(pontos: List[Ponto], tolerancia: float) -> List[Ponto]:
+    """Simplificação Douglas-Peucker iterativa (sem recursão em trajetos longos)."""
+    n = len(pontos)
+    if n < 3 or tolerancia <= 0:
+        return list(pontos)
+
+    lat_media = sum(p[0] for p in pontos) / n
+    escala_lon = math.cos(math.radians(lat_media))
+
+    manter = [False] * n
+    manter[0] = manter[-1] = True
+    pilha = [(0, n - 1)]
+
+    while pilha:
+        ini, fim = pilha.pop()
+        a, b = pontos[ini], pontos[fim]
+
+        maior, indice = 0.0, -1
+        for i in range(ini + 1, fim):
+            d = _distancia_segmento(pontos[i], a, b, escala_lon)
+            if d > maior:
+                maior, indice = d, i
+
+        if indice >= 0 and maior > tolerancia:
+            manter[indice] = True
+            pilha.append((ini, indice))
+            pilha.append((indice, fim))
+
+    return [p for p, m in zip(pontos, manter) if m]
+
+
+def _codificar_valor(valor: int) -> str:
+    valor = ~(valor << 1) if valor < 0 else (valor << 1)
+    partes = []
+    while valor >= 0x20:
+        partes.append(chr((0x20 | (valor & 0x1F)) + 63))
+        valor >>= 5
+    partes.append(chr(valor + 63))
+    return "".join(partes)
+
+
+def codificar_polyline(pontos: Iterable[Ponto], precisao: int = 5) -> str:
+    """Encoded polyline (Google) de uma sequência de (lat, lon)."""
+    fator = 10 ** precisao
+    saida = []
+    lat_ant = lon_ant = 0
+    for lat, lon in pontos:
+        lat_i = int(round(lat * fator))
+        lon_i = int(round(lon * fator))
+        saida.append(_codificar_valor(lat_i - lat_ant))
+        saida.append(_codificar_valor(lon_i - lon_ant))
+        lat_ant, lon_ant = lat_i, lon_i
+    return "".join(saida)
+
+
+def sem_repetidos(pontos: Iterable[Ponto], precisao: int = 5) -> List[Ponto]:
+    """Descarta pontos iguais ao anterior na precisão da polyline."""
+    saida: List[Ponto] = []
+    ultimo = None
+    for lat, lon in pontos:
+        chave = (round(lat, precisao), round(lon, precisao))
+        if chave != ultimo:
+            saida.append((lat, lon))
+            ultimo = chave
+    return saida
+
+
+def simplificar_trajeto(pontos: Iterable[Ponto], zoom: int) -> List[Ponto]:
+    return douglas_peucker(sem_repetidos(pontos), tolerancia_graus(zoom))
@@ -0,0 +1,27 @@
+from gerenciador_ativos.extensions import db
+
+
+class TelemetriaAmostra(db.Model):
+    """
+    Histórico append-only das amostras de telemetria da BrasilSat.
+
+    Chave primária composta (ativo_id, servertime): uma linha por amostra
+    do rastreador, já ordenada para consultas por ativo + janela de tempo,
+    e a própria chave descarta amostras repetidas.
+
+    - servertime: epoch (s) informado pela BrasilSat
+    - acctime_s: contador acumulado de ignição ligada (s)
+    """
+    __tablename__ = "telemetria_amostras"
+
+    ativo_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    servertime = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    motor_ligado = db.Column(db.Boolean, nullable=False, default=False)
+    acctime_s = db.Column(db.Float, nullable=True)
+    tensao_bateria = db.Column(db.Float, nullable=True)
+
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    velocidade = db.Column(db.Float, nullable=True)
+    direcao = db.Column(db.Float, nullable=True)
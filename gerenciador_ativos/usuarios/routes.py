@@ -1,8 +1,14 @@
 from flask import render_template, request, redirect, url_for, flash, session
+from sqlalchemy import func, or_
+from sqlalchemy.orm import load_only
 from gerenciador_ativos.auth.decorators import login_required, role_required
 from gerenciador_ativos.usuarios import usuarios_bp
 from gerenciador_ativos.extensions import db
 from gerenciador_ativos.models import Usuario, Cliente
+from gerenciador_ativos.paginacao import paginar
+from gerenciador_ativos.dashboards.kpis import invalidar_kpis
+from gerenciador_ativos.auth.principal import invalidar_principal
+from gerenciador_ativos.senhas import MENSAGEM_OCUPADAS, SenhasOcupadas
 
 
 # ============================================================
@@ -13,8 +19,45 @@ from gerenciador_ativos.models import Usuario, Cliente
 @login_required
 @role_required(["admin", "gerente"])
 def lista():
-    usuarios = Usuario.query.order_by(Usuario.nome.asc()).all()
-    return render_template("usuarios/lista.html", usuarios=usuarios)
+    """
+    Lista paginada (keyset), sem carregar o hash de senha.
+
+    ?q=texto          nome ou e-mail
+    ?tipo=admin|gerente|cliente
+    ?status=ativo|inativo
+    ?ordem=nome|-nome|email|tipo|id
+    """
+    consulta = Usuario.query.options(
+        load_only(Usuario.id, Usuario.nome, Usuario.email, Usuario.tipo, Usuario.ativo)
+    )
+
+    q = (request.args.get("q") or "").strip()
+    if q:
+        termo = f"%{q.lower()}%"
+        consulta = consulta.filter(
+            or_(func.lower(Usuario.nome).like(termo), func.lower(Usuario.email).like(termo))
+        )
+
+    tipo = request.args.get("tipo")
+    if tipo:
+        consulta = consulta.filter(Usuario.tipo == tipo)
+
+    status = request.args.get("status")
+    if status in ("ativo", "inativo"):
+        consulta = consulta.filter(Usuario.ativo.is_(status == "ativo"))
+
+    pagina = paginar(
+        consulta,
+        Usuario.id,
+        ordens={
+            "nome": Usuario.nome,
+            "email": Usuario.email,
+            "tipo": func.coalesce(Usuario.tipo, ""),
+            "id": Usuario.id,
+        },
+        ordem_padrao="nome",
+    )
+    return render_template("usuarios/lista.html", usuarios=pagina, pagina=pagina)
 
 
 # ============================================================
@@ -48,7 +91,11 @@ def novo():
             tipo=tipo,
             ativo=True
         )
-        usuario.set_password(senha)
+        try:
+            usuario.set_password(senha)
+        except SenhasOcupadas:
+            flash(MENSAGEM_OCUPADAS, "warning")
+            return redirect(url_for("usuarios.novo"))
 
         db.session.add(usuario)
         db.session.flush()  # permite pegar o ID sem commit
@@ -70,6 +117,8 @@ def novo():
             usuario.cliente_id = cliente.id
 
         db.session.commit()
+        if tipo == "cliente":
+            invalidar_kpis()
 
         flash("Usuário criado com sucesso!", "success")
         return redirect(url_for("usuarios.lista"))
@@ -100,6 +149,7 @@ def editar(id):
                 cliente.email = usuario.email
 
         db.session.commit()
+        invalidar_principal(usuario.id)
 
         flash("Usuário atualizado com sucesso!", "success")
         return redirect(url_for("usuarios.lista"))
@@ -118,6 +168,7 @@ def toggle(id):
     usuario = Usuario.query.get_or_404(id)
     usuario.ativo = not usuario.ativo
     db.session.commit()
+    invalidar_principal(usuario.id)
 
     flash("Status atualizado.", "info")
     return redirect(url_for("usuarios.lista"))
@@ -149,8 +200,10 @@ def excluir(id):
         return redirect(url_for("usuarios.lista"))
 
     # Remove usuário (não remove cliente!)
+    usuario_id = usuario.id
     db.session.delete(usuario)
     db.session.commit()
+    invalidar_principal(usuario_id)
 
     flash("Usuário excluído permanentemente.", "danger")
     return redirect(url_for("usuarios.lista"))
@@ -3,6 +3,7 @@ from gerenciador_ativos.models import Usuario
 
 
 def criar_usuario(nome, email, senha, tipo, cliente_id=None):
+    """Lança SenhasOcupadas (nada é gravado) se o pool de hash estiver cheio."""
     usuario = Usuario(
         nome=nome,
         email=email.lower(),
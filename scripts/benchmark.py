@@ -0,0 +1,196 @@
+"""
+Benchmark de carga dos endpoints do painel.
+
+Simula N usuários simultâneos, cada um abrindo painéis de ativos
+aleatórios em sequência, e mede vazão e latências p50/p95/p99 por
+endpoint. Rode contra o simulador (scripts/simulador_brasilsat.py) para
+não consumir a BrasilSat real.
+
+    # 1) cria cliente + ativos com IMEIs sintéticos no banco configurado
+    python scripts/benchmark.py semear --ativos 200
+
+    # 2) mede (app já rodando apontando para o simulador)
+    python scripts/benchmark.py medir --url http://127.0.0.1:5000 \\
+        --usuarios 20 --duracao 60 --ativos 1-200
+
+Endpoints padrão: /api/ativos/<id>/dados, /preventiva e /plano
+(acrescente outros com --endpoint, usando {id} no caminho).
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+ENDPOINTS_PADRAO = [
+    "/api/ativos/{id}/dados",
+    "/api/ativos/{id}/preventiva",
+    "/api/ativos/{id}/plano",
+]
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = (len(ordenados) - 1) * p / 100.0
+    f = int(k)
+    c = min(f + 1, len(ordenados) - 1)
+    return ordenados[f] + (ordenados[c] - ordenados[f]) * (k - f)
+
+
+def _faixa_ids(texto):
+    ids = []
+    for parte in texto.split(","):
+        parte = parte.strip()
+        if "-" in parte:
+            ini, fim = parte.split("-", 1)
+            ids.extend(range(int(ini), int(fim) + 1))
+        elif parte:
+            ids.append(int(parte))
+    return ids
+
+
+# --------------------------------------------------
+# semear
+# --------------------------------------------------
+
+def semear(args):
+    """Cria um cliente de benchmark e `--ativos` ativos com IMEIs sintéticos."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault("TELEMETRIA_POLLER", "0")
+
+    from server import app
+    from gerenciador_ativos.extensions import db
+    from gerenciador_ativos.models import Ativo, Cliente
+
+    with app.app_context():
+        cliente = Cliente(tipo="PJ", nome="Benchmark", ativo=True)
+        db.session.add(cliente)
+        db.session.flush()
+
+        for i in range(args.ativos):
+            db.session.add(Ativo(
+                cliente_id=cliente.id,
+                nome=f"Bench {i + 1:04d}",
+                categoria="Lancha",
+                imei=str(args.imei_base + i),
+                ativo=True,
+            ))
+        db.session.commit()
+
+        ids = [a.id for a in Ativo.query.filter_by(cliente_id=cliente.id).order_by(Ativo.id)]
+
+    print(f">>> {len(ids)} ativos criados (ids {ids[0]}-{ids[-1]}) para o cliente #{cliente.id}")
+
+
+# --------------------------------------------------
+# medir
+# --------------------------------------------------
+
+def medir(args):
+    ids = _faixa_ids(args.ativos)
+    endpoints = args.endpoint or ENDPOINTS_PADRAO
+    url_base = args.url.rstrip("/")
+
+    latencias = defaultdict(list)
+    erros = defaultdict(int)
+    lock = threading.Lock()
+    fim = time.perf_counter() + args.aquecimento + args.duracao
+    inicio_medicao = time.perf_counter() + args.aquecimento
+
+    def usuario():
+        sessao = requests.Session()
+        while True:
+            ativo_id = random.choice(ids)
+            for caminho in endpoints:
+                agora = time.perf_counter()
+                if agora >= fim:
+                    return
+
+                url = url_base + caminho.format(id=ativo_id)
+                t0 = time.perf_counter()
+                try:
+                    resp = sessao.get(url, timeout=args.timeout)
+                    ok = resp.status_code < 400
+                except requests.RequestException:
+                    ok = False
+                dt = time.perf_counter() - t0
+
+                if t0 < inicio_medicao:
+                    continue
+
+                with lock:
+                    latencias[caminho].append(dt)
+                    if not ok:
+                        erros[caminho] += 1
+
+            if args.pausa:
+                time.sleep(args.pausa)
+
+    threads = [threading.Thread(target=usuario, daemon=True) for _ in range(args.usuarios)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    total = sum(len(v) for v in latencias.values())
+    print(f"\nUsuários: {args.usuarios} | duração: {args.duracao}s | ativos: {len(ids)}")
+    print(f"{'endpoint':40} {'req':>7} {'req/s':>8} {'erros':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'média':>8}")
+
+    for caminho in endpoints:
+        valores = latencias.get(caminho, [])
+        if not valores:
+            continue
+        ms = [v * 1000 for v in valores]
+        print(
+            f"{caminho:40} {len(ms):7d} {len(ms) / args.duracao:8.1f} {erros[caminho]:6d} "
+            f"{_percentil(ms, 50):8.1f} {_percentil(ms, 95):8.1f} {_percentil(ms, 99):8.1f} "
+            f"{statistics.mean(ms):8.1f}"
+        )
+
+    print(f"{'TOTAL':40} {total:7d} {total / args.duracao:8.1f} {sum(erros.values()):6d}")
+
+    if args.estatisticas:
+        try:
+            est = requests.get(url_base + "/api/monitoramento/estatisticas", timeout=args.timeout).json()
+            print("\nEstatísticas da integração:", est)
+        except (requests.RequestException, ValueError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos endpoints do painel")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_semear = sub.add_parser("semear", help="cria ativos sintéticos no banco")
+    p_semear.add_argument("--ativos", type=int, default=100)
+    p_semear.add_argument("--imei-base", type=int, default=860000000000000)
+
+    p_medir = sub.add_parser("medir", help="executa a carga e mostra as latências")
+    p_medir.add_argument("--url", default="http://127.0.0.1:5000")
+    p_medir.add_argument("--usuarios", type=int, default=10)
+    p_medir.add_argument("--duracao", type=float, default=30.0, help="segundos medidos")
+    p_medir.add_argument("--aquecimento", type=float, default=5.0, help="segundos descartados")
+    p_medir.add_argument("--ativos", default="1-10", help="ids: '1-50' ou '1,4,9'")
+    p_medir.add_argument("--endpoint", action="append", help="caminho com {id}; repetível")
+    p_medir.add_argument("--pausa", type=float, default=0.0, help="espera entre painéis (s)")
+    p_medir.add_argument("--timeout", type=float, default=30.0)
+    p_medir.add_argument("--estatisticas", action="store_true",
+                         help="mostra /api/monitoramento/estatisticas ao final")
+
+    args = parser.parse_args()
+    if args.comando == "semear":
+        semear(args)
+    else:
+        medir(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark do hash de senha: logins/s por configuração de SENHA_HASH.
+
+Mede, sem servidor, o custo de cada método (gerar + verificar) e a vazão
+de verificações com o pool de senhas.py sob N logins simultâneos, para
+escolher SENHA_HASH e SENHA_WORKERS conscientemente.
+
+    python scripts/benchmark_senhas.py
+    python scripts/benchmark_senhas.py --metodos scrypt:16384:8:1 pbkdf2:sha256:300000 \\
+        --workers 1 2 4 --simultaneos 16 --duracao 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from gerenciador_ativos.senhas import PoolSenhas, SenhasOcupadas  # noqa: E402
+
+METODOS_PADRAO = [
+    "scrypt:32768:8:1",
+    "scrypt:16384:8:1",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:260000",
+]
+
+
+def _latencia_ms(senha_hash, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        ini = time.perf_counter()
+        check_password_hash(senha_hash, "senha-do-benchmark")
+        tempos.append((time.perf_counter() - ini) * 1000)
+    return statistics.median(tempos)
+
+
+def _vazao(senha_hash, workers, simultaneos, duracao):
+    pool = PoolSenhas(workers=workers, fila=simultaneos)
+    ok = [0]
+    recusados = [0]
+    lock = threading.Lock()
+    fim = time.time() + duracao
+
+    def usuario():
+        while time.time() < fim:
+            try:
+                pool.executar(check_password_hash, senha_hash, "senha-do-benchmark")
+                with lock:
+                    ok[0] += 1
+            except SenhasOcupadas:
+                with lock:
+                    recusados[0] += 1
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=usuario) for _ in range(simultaneos)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return ok[0] / duracao, recusados[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do hash de senha (logins/s)")
+    parser.add_argument("--metodos", nargs="+", default=METODOS_PADRAO)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--simultaneos", type=int, default=8, help="logins ao mesmo tempo")
+    parser.add_argument("--duracao", type=float, default=3.0, help="segundos por medição")
+    parser.add_argument("--repeticoes", type=int, default=5, help="amostras da latência")
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()} | simultâneos: {args.simultaneos} | duração: {args.duracao}s\n")
+    cab = "".join(f"{f'w={w} login/s':>14}" for w in args.workers)
+    print(f"{'SENHA_HASH':26} {'gerar ms':>9} {'verif. ms':>10}{cab}")
+
+    for metodo in args.metodos:
+        ini = time.perf_counter()
+        senha_hash = generate_password_hash("senha-do-benchmark", method=metodo)
+        gerar_ms = (time.perf_counter() - ini) * 1000
+        verificar_ms = _latencia_ms(senha_hash, args.repeticoes)
+
+        colunas = ""
+        for w in args.workers:
+            por_s, _ = _vazao(senha_hash, w, args.simultaneos, args.duracao)
+            colunas += f"{por_s:14.1f}"
+
+        print(f"{metodo:26} {gerar_ms:9.1f} {verificar_ms:10.1f}{colunas}")
+
+    print("\nlogin/s = verificações concluídas por segundo com SENHA_WORKERS=w.")
+    print("Escolha o maior custo cuja vazão cubra o pico de logins sem usar todos os núcleos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Simulador local da API BrasilSat para testes de carga.
+
+Implementa /api/authorization e /api/track com o mesmo formato de JSON
+que api/monitoramento/brasilsat.py interpreta (code, record, access_token,
+expire_time, imei, accstatus, acctime, externalpower, servertime,
+latitude, longitude, speed, course). Qualquer IMEI consultado vira um
+barco sintético que navega pela Baía de Todos os Santos, liga e desliga
+o motor e acumula acctime.
+
+Uso:
+
+    python scripts/simulador_brasilsat.py --porta 8099 --latencia-ms 120 \\
+        --jitter-ms 80 --taxa-erro 0.02
+
+    BRASILSAT_BASE_URL=http://127.0.0.1:8099 BRASILSAT_ACCOUNT=sim \\
+        BRASILSAT_PASSWORD=sim waitress-serve --port=5000 server:app
+"""
+
+import argparse
+import math
+import random
+import secrets
+import threading
+import time
+
+from flask import Flask, jsonify, request
+
+# centro da Baía de Todos os Santos
+LAT_BASE = -12.85
+LON_BASE = -38.60
+
+
+class Barco:
+    def __init__(self, imei: str):
+        rnd = random.Random(imei)
+        self.imei = imei
+        self.lat = LAT_BASE + rnd.uniform(-0.15, 0.15)
+        self.lon = LON_BASE + rnd.uniform(-0.15, 0.15)
+        self.rumo = rnd.uniform(0, 360)
+        self.motor = rnd.random() < 0.5
+        self.acctime = rnd.randint(0, 2_000_000)
+        self.tensao = rnd.uniform(12.1, 13.8)
+        self.velocidade = 0.0
+        self.atualizado_em = time.time()
+        self.proxima_troca = self.atualizado_em + rnd.uniform(300, 3600)
+
+    def avancar(self, agora: float):
+        dt = max(0.0, agora - self.atualizado_em)
+        self.atualizado_em = agora
+
+        if agora >= self.proxima_troca:
+            self.motor = not self.motor
+            self.proxima_troca = agora + random.uniform(300, 3600)
+
+        if self.motor:
+            self.acctime += int(dt)
+            velocidade_nos = random.uniform(8, 22)
+            self.rumo = (self.rumo + random.uniform(-15, 15)) % 360
+            distancia_graus = velocidade_nos * 1.852 * dt / 3600 / 111.0
+            self.lat += distancia_graus * math.cos(math.radians(self.rumo))
+            self.lon += distancia_graus * math.sin(math.radians(self.rumo))
+            self.tensao = min(14.2, self.tensao + 0.001 * dt)
+            self.velocidade = round(velocidade_nos * 1.852, 1)
+        else:
+            self.tensao = max(11.5, self.tensao - 0.0001 * dt)
+            self.velocidade = 0.0
+
+    def record(self) -> dict:
+        return {
+            "imei": self.imei,
+            "accstatus": 1 if self.motor else 0,
+            "acctime": self.acctime,
+            "externalpower": f"{self.tensao:.2f}",
+            "servertime": int(self.atualizado_em),
+            "latitude": f"{self.lat:.6f}",
+            "longitude": f"{self.lon:.6f}",
+            "speed": self.velocidade,
+            "course": int(self.rumo),
+        }
+
+
+def criar_simulador(latencia_ms=0.0, jitter_ms=0.0, taxa_erro=0.0, taxa_erro_api=0.0,
+                    token_ttl=7200, lote_max=100):
+    app = Flask("simulador_brasilsat")
+
+    lock = threading.Lock()
+    barcos = {}
+    tokens = {}
+    contadores = {"authorization": 0, "track": 0, "erros": 0}
+
+    def _atrasar():
+        espera = latencia_ms + random.uniform(0, jitter_ms)
+        if espera > 0:
+            time.sleep(espera / 1000.0)
+
+    def _falhar():
+        if taxa_erro and random.random() < taxa_erro:
+            contadores["erros"] += 1
+            return ("Service Unavailable", 503)
+        if taxa_erro_api and random.random() < taxa_erro_api:
+            contadores["erros"] += 1
+            return jsonify({"code": 1006, "message": "erro simulado"})
+        return None
+
+    @app.get("/api/authorization")
+    def authorization():
+        contadores["authorization"] += 1
+        _atrasar()
+        falha = _falhar()
+        if falha:
+            return falha
+
+        if not request.args.get("account") or not request.args.get("signature"):
+            return jsonify({"code": 1001, "message": "parâmetros inválidos"})
+
+        token = secrets.token_hex(16)
+        expira = int(time.time()) + token_ttl
+        with lock:
+            tokens[token] = expira
+
+        return jsonify({
+            "code": 0,
+            "record": {"access_token": token, "expire_time": expira},
+        })
+
+    @app.get("/api/track")
+    def track():
+        contadores["track"] += 1
+        _atrasar()
+        falha = _falhar()
+        if falha:
+            return falha
+
+        agora = time.time()
+        token = request.args.get("access_token")
+        if tokens.get(token, 0) < agora:
+            return jsonify({"code": 10012, "message": "access_token inválido"})
+
+        imeis = [i.strip() for i in (request.args.get("imeis") or "").split(",") if i.strip()]
+        if not imeis:
+            return jsonify({"code": 1001, "message": "imeis obrigatório"})
+        if len(imeis) > lote_max:
+            return jsonify({"code": 1002, "message": f"máximo de {lote_max} imeis"})
+
+        records = []
+        with lock:
+            for imei in imeis:
+                barco = barcos.get(imei)
+                if barco is None:
+                    barco = barcos[imei] = Barco(imei)
+                barco.avancar(agora)
+                records.append(barco.record())
+
+        return jsonify({"code": 0, "record": records})
+
+    @app.get("/_simulador")
+    def estado():
+        return jsonify({**contadores, "barcos": len(barcos), "tokens": len(tokens)})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador local da API BrasilSat")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8099)
+    parser.add_argument("--latencia-ms", type=float, default=100.0, help="latência fixa por chamada")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="latência aleatória adicional")
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas HTTP 503")
+    parser.add_argument("--taxa-erro-api", type=float, default=0.0, help="fração de respostas code != 0")
+    parser.add_argument("--token-ttl", type=int, default=7200, help="validade do access_token (s)")
+    parser.add_argument("--lote-max", type=int, default=100, help="máximo de IMEIs por /track")
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    app = criar_simulador(
+        latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms,
+        taxa_erro=args.taxa_erro,
+        taxa_erro_api=args.taxa_erro_api,
+        token_ttl=args.token_ttl,
+        lote_max=args.lote_max,
+    )
+
+    from waitress import serve
+
+    print(f">>> Simulador BrasilSat em http://{args.host}:{args.porta}")
+    serve(app, host=args.host, port=args.porta, threads=args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
 import os
 from flask import Flask
+from sqlalchemy import inspect
 from gerenciador_ativos.config import Config
 from gerenciador_ativos.extensions import db
+from gerenciador_ativos.banco import iniciar_banco
+from gerenciador_ativos.migracoes import aplicar_migracoes, marcar_todas, pendentes, registrar_cli
 from gerenciador_ativos.models import Usuario
+from gerenciador_ativos.ativos import importacao
+from gerenciador_ativos.senhas import iniciar_senhas
 
 # importa modelos de preventiva para aparecer nas tabelas
 from gerenciador_ativos import preventiva_models  # noqa
+from gerenciador_ativos import telemetria_models  # noqa
+from gerenciador_ativos import tarefas_models  # noqa
+from gerenciador_ativos.preventiva_fila import materializar_pendentes
 
 # Blueprints existentes
 from gerenciador_ativos.auth.routes import auth_bp
@@ -15,19 +23,27 @@ from gerenciador_ativos.clientes.routes import clientes_bp
 from gerenciador_ativos.ativos.routes import ativos_bp
 from gerenciador_ativos.portal.routes import portal_bp
 from gerenciador_ativos.ativos.painel import painel_bp
-from gerenciador_ativos.api.ativos.routes_dados import api_ativos_dados_bp
 
 # novos blueprints
 from gerenciador_ativos.api.monitoramento.routes import monitoramento_bp
 from gerenciador_ativos.api.ativos import api_ativos_bp
+from gerenciador_ativos.tarefas import tarefas_bp
+
+from gerenciador_ativos.telemetria.poller import iniciar_poller
+from gerenciador_ativos.telemetria.historico import iniciar_historico
+from gerenciador_ativos.telemetria.estado import iniciar_estado
+from gerenciador_ativos.tarefas.fila import iniciar_tarefas
 
 
 def create_app():
     app = Flask(__name__, static_folder="static", template_folder="templates")
     app.config.from_object(Config)
 
-    # extensão do banco
-    db.init_app(app)
+    # extensão do banco, com o perfil do engine (DB_PERFIL)
+    iniciar_banco(app)
+
+    # pool de hash de senha limitado pelas threads do waitress
+    iniciar_senhas(app)
 
     # registra blueprints
     app.register_blueprint(auth_bp)
@@ -38,17 +54,19 @@ def create_app():
     app.register_blueprint(portal_bp)
     app.register_blueprint(painel_bp)
     app.register_blueprint(monitoramento_bp)
-    app.register_blueprint(api_ativos_dados_bp)
     app.register_blueprint(api_ativos_bp)
+    app.register_blueprint(tarefas_bp)
 
     # cria banco apenas se não existir
     with app.app_context():
         instance_path = os.path.join(os.getcwd(), "instance")
         os.makedirs(instance_path, exist_ok=True)
 
-        db_path = os.path.join(instance_path, "gerenciador_ativos.db")
+        # o banco é "novo" quando ainda não tem a tabela de usuários
+        # (vale para o SQLite local e para o DATABASE_URL do Railway)
+        banco_novo = not inspect(db.engine).has_table(Usuario.__tablename__)
 
-        if not os.path.exists(db_path):
+        if banco_novo:
             print(">>> Banco não encontrado — criando novo banco...")
             db.create_all()
 
@@ -63,27 +81,38 @@ def create_app():
             db.session.add(admin)
             db.session.commit()
             print(">>> Usuário admin criado: email=admin@admin.com | senha=admin123")
+
+            # já nasce no formato dos modelos
+            marcar_todas(db.engine)
         else:
             print(">>> Banco já existe — não será recriado.")
+            # cria apenas tabelas novas (ex: telemetria_amostras)
+            db.create_all()
+            # colunas e índices novos em tabelas existentes: migrações versionadas
+            if app.config.get("MIGRAR_NA_SUBIDA", True):
+                aplicar_migracoes(db.engine)
 
-    # ----------------------------------------------------------------------
-    # 🔥 ROTA PARA CRIAR A COLUNA horas_offset NO RAILWAY (UMA VEZ SÓ)
-    # ----------------------------------------------------------------------
-    @app.route("/fix-db")
-    def fix_db():
-        import sqlite3
-
-        db_path = os.path.join(os.getcwd(), "instance", "gerenciador_ativos.db")
-
-        try:
-            conn = sqlite3.connect(db_path)
-            cur = conn.cursor()
-            cur.execute("ALTER TABLE ativos ADD COLUMN horas_offset REAL DEFAULT 0;")
-            conn.commit()
-            conn.close()
-            return "Coluna horas_offset criada com sucesso!"
-        except Exception as e:
-            return f"Erro ao criar coluna: {e}"
+        faltando = pendentes(db.engine)
+        if faltando:
+            print(f">>> Migrações pendentes: {faltando} — rode: flask --app server migrar")
+        else:
+            # itens de preventiva de antes da fila materializada
+            materializados = materializar_pendentes()
+            if materializados:
+                print(f">>> Preventiva: {materializados} itens entraram na fila de vencimentos.")
+
+    # flask --app server migrar [--status]
+    registrar_cli(app)
+    # flask --app server importar-ativos arquivo.csv
+    importacao.registrar_cli(app)
+
+    # telemetria da frota em segundo plano
+    iniciar_historico(app)
+    iniciar_estado(app)
+    iniciar_poller(app)
+
+    # fila de tarefas demoradas (importação, recálculos, atualização da frota)
+    iniciar_tarefas(app)
 
     return app
 